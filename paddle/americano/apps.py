@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AmericanoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "americano"
+
+    def ready(self):
+        # Registers the standings job handler for `manage.py run_jobs`.
+        from . import jobs  # noqa: F401
@@ -1,30 +1,70 @@
 # absolute path: /workspaces/paddle/paddle/americano/context_processors.py
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
 from .models import AmericanoTournament
 from frontend.view_modules.common import get_user_group
 
+NAV_CACHE_KEY_PREFIX = "americano_nav"
+NAV_FINISHED_LIMIT = 10
 
-def americano_nav(request):
+
+def _nav_cache_key(group_id, today) -> str:
+    return f"{NAV_CACHE_KEY_PREFIX}:{group_id or 'all'}:{today.isoformat()}"
+
+
+def get_nav_tournaments(group) -> dict:
+    """
+    Returns `{"ongoing": [...], "finished": [...]}` navbar entries (`pk`, `name`)
+    for `group` (all groups when None), cached per group and day.
+    """
     today = timezone.localdate()
-    user_group = get_user_group(request)
+    group_id = group.pk if group is not None else None
+    key = _nav_cache_key(group_id, today)
+    nav = cache.get(key)
+    if nav is not None:
+        return nav
+
     queryset = AmericanoTournament.objects.all()
-    if user_group is not None:
-        queryset = queryset.filter(group=user_group)
+    if group_id is not None:
+        queryset = queryset.filter(group_id=group_id)
+    nav = {
+        "ongoing": list(
+            queryset
+            .filter(is_active=True, play_date__gte=today)
+            .order_by("play_date", "name")
+            .values("pk", "name")
+        ),
+        "finished": list(
+            queryset
+            .filter(play_date__lt=today)
+            .order_by("-play_date", "name")
+            .values("pk", "name")[:NAV_FINISHED_LIMIT]
+        ),
+    }
+    cache.set(key, nav, timeout=settings.AMERICANO_NAV_CACHE_TIMEOUT)
+    return nav
+
 
-    ongoing = (
-        queryset
-        .filter(is_active=True, play_date__gte=today)
-        .order_by("play_date", "name")
-    )
+def invalidate_nav_tournaments(*group_ids) -> None:
+    """
+    Drops today's cached navbar entries of `group_ids` (None entries are
+    skipped) and of the aggregate context.
+    """
+    today = timezone.localdate()
+    keys = {_nav_cache_key(group_id, today) for group_id in group_ids if group_id is not None}
+    cache.delete_many([*keys, _nav_cache_key(None, today)])
 
-    finished = (
-        queryset
-        .filter(play_date__lt=today)
-        .order_by("-play_date", "name")[:10]
-    )
 
+def americano_nav(request):
+    """
+    Navbar tournaments, resolved only when a template iterates them (login and
+    password reset pages run no queries).
+    """
+    nav = SimpleLazyObject(lambda: get_nav_tournaments(get_user_group(request)))
     return {
-        "americano_ongoing_tournaments": ongoing,
-        "americano_finished_tournaments": finished,
+        "americano_ongoing_tournaments": SimpleLazyObject(lambda: nav["ongoing"]),
+        "americano_finished_tournaments": SimpleLazyObject(lambda: nav["finished"]),
     }
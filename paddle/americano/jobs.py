@@ -0,0 +1,34 @@
+"""Background jobs of the americano app (see `games.jobs`).
+
+Imported from `AmericanoConfig.ready()` so `manage.py run_jobs` knows the
+handlers without loading the views.
+"""
+
+from games.jobs import background_jobs_enabled, enqueue_job, register_job_handler
+
+from .models import AmericanoTournament
+
+JOB_AMERICANO_STANDINGS = "americano_standings"
+
+
+def schedule_americano_standings(tournament: AmericanoTournament) -> None:
+    """
+    Recomputes the standings now, or enqueues it when background jobs are enabled.
+    """
+    if background_jobs_enabled():
+        enqueue_job(JOB_AMERICANO_STANDINGS, tournament.pk)
+        return
+    from .views import recompute_americano_standings
+
+    recompute_americano_standings(tournament)
+
+
+def _recompute_standings_job(key: str) -> None:
+    from .views import recompute_americano_standings
+
+    tournament = AmericanoTournament.objects.filter(pk=int(key)).first()
+    if tournament is not None:
+        recompute_americano_standings(tournament)
+
+
+register_job_handler(JOB_AMERICANO_STANDINGS, _recompute_standings_job)
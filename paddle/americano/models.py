@@ -34,7 +34,22 @@ class AmericanoTournament(models.Model):
     def save(self, *args, **kwargs):
         if not self.group_id:
             self.group_id = get_default_group_id()
+        # A tournament moved to another group also leaves the old group's navbar.
+        previous_group_id = None
+        if not self._state.adding:
+            previous_group_id = AmericanoTournament.objects.filter(pk=self.pk).values_list("group_id", flat=True).first()
         super().save(*args, **kwargs)
+        self._invalidate_nav_tournaments(previous_group_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._invalidate_nav_tournaments()
+        return result
+
+    def _invalidate_nav_tournaments(self, previous_group_id=None):
+        from .context_processors import invalidate_nav_tournaments
+
+        invalidate_nav_tournaments(self.group_id, previous_group_id)
 
     @property
     def is_open_for_edit(self) -> bool:
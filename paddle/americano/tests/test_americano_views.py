@@ -815,3 +815,54 @@ def test_americano_detail_query_count_is_bounded_with_round_matches_and_players(
 
     assert res.status_code == 200
     assert len(captured) <= 12
+
+
+# -----------------------
+# Tests: navbar tournaments
+# -----------------------
+
+def test_americano_nav_runs_no_queries_when_template_does_not_read_it(rf):
+    from django.contrib.auth.models import AnonymousUser
+
+    from americano.context_processors import americano_nav
+
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    with CaptureQueriesContext(connection) as queries:
+        americano_nav(request)
+    assert len(queries) == 0
+
+
+def test_americano_nav_is_cached_and_invalidated_on_tournament_changes(client, user, players_pool):
+    t = _create_tournament(creator=user, name="Nav Cup", players=players_pool[:4])
+
+    first = client.get(reverse("login"))
+    assert "Nav Cup" in first.content.decode("utf-8")
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse("login"))
+    assert not any("americano_americanotournament" in query["sql"] for query in queries)
+
+    t.name = "Nav Cup Renamed"
+    t.save()
+    assert "Nav Cup Renamed" in client.get(reverse("login")).content.decode("utf-8")
+
+    t.delete()
+    assert "Nav Cup" not in client.get(reverse("login")).content.decode("utf-8")
+
+
+def test_americano_nav_drops_a_tournament_moved_to_another_group_from_both_navbars(user, players_pool):
+    from americano.context_processors import get_nav_tournaments
+    from games.models import Group
+
+    t = _create_tournament(creator=user, name="Moving Cup", players=players_pool[:4])
+    old_group = t.group
+    new_group = Group.objects.create(name="Nav New Group")
+    assert [row["name"] for row in get_nav_tournaments(old_group)["ongoing"]] == ["Moving Cup"]
+    assert get_nav_tournaments(new_group)["ongoing"] == []
+
+    t.group = new_group
+    t.save()
+
+    assert get_nav_tournaments(old_group)["ongoing"] == []
+    assert [row["name"] for row in get_nav_tournaments(new_group)["ongoing"]] == ["Moving Cup"]
@@ -9,6 +9,7 @@ from django.db.models.functions import Lower
 from django.db.models import F
 
 from .forms import AmericanoTournamentForm
+from .jobs import schedule_americano_standings
 from .models import AmericanoTournament, AmericanoRound, AmericanoMatch, AmericanoPlayerStats
 from games.models import Player
 from frontend.view_modules.common import get_request_group_context, get_user_group, get_user_player
@@ -251,7 +252,7 @@ def _save_americano_round_assignment(tournament: AmericanoTournament, updates, *
             match.team2_points = update["team2_points"]
             match.save()
 
-        recompute_americano_standings(tournament)
+        schedule_americano_standings(tournament)
 
         if create_next_round:
             americano_create_next_round(tournament)
@@ -480,7 +481,7 @@ def americano_delete_round(request, round_id):
             r.number = i
             r.save(update_fields=["number"])
 
-    recompute_americano_standings(tournament)
+    schedule_americano_standings(tournament)
     
     request.session.pop("americano_round_error", None)
     return redirect("americano_detail", pk=tournament.pk)
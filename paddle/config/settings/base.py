@@ -130,3 +130,41 @@ EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="")
 DEFAULT_FROM_EMAIL = f"{config('FROM_NAME', default='Ranking de Pádel')} <{config('DEFAULT_FROM_EMAIL', default='no-reply@rankingdepadel.club')}>"
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
+
+# --- Rankings ---
+# "stats": read materialized PlayerScopeStats rows; "sql": grouped SQL aggregation over matches;
+# "columnar": aggregate the per-worker in-memory match store (frontend.services.match_store);
+# "numpy": same store with vectorized NumPy aggregation (optional dependency, falls back to "columnar").
+RANKING_ENGINE = config("RANKING_ENGINE", default="stats")
+
+# --- Background jobs (games.jobs, run with `manage.py run_jobs`) ---
+# When enabled, match and americano writes enqueue coalesced ranking/standings
+# recomputations instead of updating them inside the request.
+BACKGROUND_JOBS_ENABLED = config("BACKGROUND_JOBS_ENABLED", default=False, cast=bool)
+JOBS_MAX_ATTEMPTS = config("JOBS_MAX_ATTEMPTS", default=5, cast=int)
+# Seconds before the first retry; doubled after each failed attempt.
+JOBS_RETRY_DELAY = config("JOBS_RETRY_DELAY", default=10, cast=int)
+# Running jobs not finished after this many seconds are requeued (crashed worker).
+JOBS_LOCK_TIMEOUT = config("JOBS_LOCK_TIMEOUT", default=300, cast=int)
+JOBS_POLL_INTERVAL = config("JOBS_POLL_INTERVAL", default=2.0, cast=float)
+
+# --- Cache (shared by every worker process) ---
+# FileBasedCache has no atomic `add`, so ranking single-flight locks are then
+# taken in the database (games.CacheLock); Redis/Memcached/DB caches lock in the cache.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": config("CACHE_LOCATION", default="/var/tmp/paddle_cache"),
+    }
+}
+# Ranking results are keyed by group data version, so entries never go stale.
+RANKING_CACHE_ENABLED = config("RANKING_CACHE_ENABLED", default=True, cast=bool)
+RANKING_CACHE_TIMEOUT = config("RANKING_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int)
+# Single-flight: one worker recomputes a missing ranking key while the others
+# serve the previous version (stale) or wait up to RANKING_CACHE_LOCK_WAIT seconds.
+RANKING_CACHE_SINGLE_FLIGHT = config("RANKING_CACHE_SINGLE_FLIGHT", default=True, cast=bool)
+RANKING_CACHE_SERVE_STALE = config("RANKING_CACHE_SERVE_STALE", default=True, cast=bool)
+RANKING_CACHE_LOCK_TIMEOUT = config("RANKING_CACHE_LOCK_TIMEOUT", default=30, cast=int)
+RANKING_CACHE_LOCK_WAIT = config("RANKING_CACHE_LOCK_WAIT", default=5.0, cast=float)
+# Navbar tournament lists, invalidated on tournament save/delete.
+AMERICANO_NAV_CACHE_TIMEOUT = config("AMERICANO_NAV_CACHE_TIMEOUT", default=60 * 60, cast=int)
@@ -20,3 +20,17 @@ def _abort_if_pytest_uses_dev_db(django_db_setup, django_db_blocker):
             "Unsafe test configuration: pytest is targeting development db.sqlite3. "
             "Use config.test_settings so tests run on an isolated test database."
         )
+
+
+@pytest.fixture(autouse=True)
+def _clear_ranking_cache():
+    """Cache keys reuse group ids and versions across rolled-back tests."""
+    from django.core.cache import cache
+
+    from frontend.services.match_store import clear_match_stores
+    from frontend.services.rank_index import clear_rank_indexes
+
+    cache.clear()
+    clear_match_stores()
+    clear_rank_indexes()
+    yield
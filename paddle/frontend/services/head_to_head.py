@@ -0,0 +1,95 @@
+"""Group-wide head-to-head and partnership matrices.
+
+Sparse player x player matrices built in one pass over the columnar match store
+of a group (or of every group for the aggregate Hall of Fame context):
+
+- together[a][b] = (matches together, wins together, last date)
+- against[a][b] = (matches against, wins of a against b, last date)
+
+Both are stored symmetrically (against[b][a] holds b's wins), so per-player
+rows are dict lookups. Results are cached by group data version like rankings.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+
+class HeadToHeadMatrices:
+    def __init__(self):
+        self.together: dict[int, dict[int, tuple[int, int, date]]] = {}
+        self.against: dict[int, dict[int, tuple[int, int, date]]] = {}
+
+    @staticmethod
+    def _add(matrix, player_id, other_id, win: int, date_played: date) -> None:
+        row = matrix.setdefault(player_id, {}).get(other_id)
+        if row is None:
+            matrix[player_id][other_id] = (1, win, date_played)
+        else:
+            matrix[player_id][other_id] = (row[0] + 1, row[1] + win, max(row[2], date_played))
+
+    def add_match(self, slots, winning_team: int, date_played: date) -> None:
+        """
+        Adds one match given its four slot player ids (team 1 first).
+        """
+        teams = ((slots[0], slots[1]), (slots[2], slots[3]))
+        for team_index, (player_id, partner_id) in enumerate(teams):
+            win = 1 if winning_team == team_index + 1 else 0
+            self._add(self.together, player_id, partner_id, win, date_played)
+            if partner_id != player_id:
+                self._add(self.together, partner_id, player_id, win, date_played)
+            for own_id in dict.fromkeys((player_id, partner_id)):
+                for rival_id in teams[1 - team_index]:
+                    self._add(self.against, own_id, rival_id, win, date_played)
+
+    def matches_together(self, player_id: int, other_id: int) -> int:
+        return self.together.get(player_id, {}).get(other_id, (0, 0, None))[0]
+
+    def wins_together(self, player_id: int, other_id: int) -> int:
+        return self.together.get(player_id, {}).get(other_id, (0, 0, None))[1]
+
+    def matches_against(self, player_id: int, other_id: int) -> int:
+        return self.against.get(player_id, {}).get(other_id, (0, 0, None))[0]
+
+    def wins_against(self, player_id: int, other_id: int) -> int:
+        return self.against.get(player_id, {}).get(other_id, (0, 0, None))[1]
+
+    def last_together(self, player_id: int, other_id: int) -> date | None:
+        return self.together.get(player_id, {}).get(other_id, (0, 0, None))[2]
+
+    def last_against(self, player_id: int, other_id: int) -> date | None:
+        return self.against.get(player_id, {}).get(other_id, (0, 0, None))[2]
+
+    def partners_of(self, player_id: int) -> dict[int, tuple[int, int, date]]:
+        return self.together.get(player_id, {})
+
+    def opponents_of(self, player_id: int) -> dict[int, tuple[int, int, date]]:
+        return self.against.get(player_id, {})
+
+    def pairs(self):
+        """
+        Yields `(low_id, high_id, matches, wins, last_date)` once per pair.
+        """
+        for player_id, partners in self.together.items():
+            for partner_id, (matches, wins, last_date) in partners.items():
+                if player_id <= partner_id:
+                    yield player_id, partner_id, matches, wins, last_date
+
+
+def _build_head_to_head(*, group=None) -> HeadToHeadMatrices:
+    from .match_store import get_match_store
+
+    matrices = HeadToHeadMatrices()
+    for t1p1, t1p2, t2p1, t2p2, winning_team, _, date_ordinal in get_match_store(group).iter_matches():
+        matrices.add_match((t1p1, t1p2, t2p1, t2p2), winning_team, date.fromordinal(date_ordinal))
+    return matrices
+
+
+def build_head_to_head(*, group=None) -> HeadToHeadMatrices:
+    """
+    Head-to-head matrices of `group` (every group when None), served from the
+    versioned ranking cache.
+    """
+    from .ranking_cache import cached_ranking_value
+
+    return cached_ranking_value("head_to_head", group, lambda: _build_head_to_head(group=group))
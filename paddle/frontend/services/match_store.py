@@ -0,0 +1,241 @@
+"""Columnar in-memory match store per group.
+
+Keeps the match history of a group (or of every group for the aggregate Hall
+of Fame context) as parallel typed arrays instead of model instances:
+
+- slot player ids, winning team, match gender type code and date ordinal;
+- a player table of id -> (name, gender).
+
+Stores are cached per worker process and keyed by the group data version. When
+only appends happened since the store was loaded (same `history_version`), the
+new matches and players are fetched by id and appended in place; any other
+change (edits, deletes, renames, gender changes) reloads the store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from array import array
+
+from .ranking_sql import SCOPE_KEYS
+
+GENDER_TYPE_CODES = {None: 0, "U": 1, "M": 2, "F": 3, "X": 4}
+SCOPE_BY_GENDER_TYPE_CODE = {2: "male", 3: "female", 4: "mixed"}
+
+_MATCH_FIELDS = (
+    "pk",
+    "team1_player1_id",
+    "team1_player2_id",
+    "team2_player1_id",
+    "team2_player2_id",
+    "winning_team",
+    "match_gender_type",
+    "date_played",
+)
+
+_stores: dict[object, "MatchStore"] = {}
+_stores_lock = threading.Lock()
+
+
+class MatchStore:
+    def __init__(self, *, version: str, history_version: str):
+        self.version = version
+        self.history_version = history_version
+        self.match_ids = array("q")
+        self.team1_player1 = array("q")
+        self.team1_player2 = array("q")
+        self.team2_player1 = array("q")
+        self.team2_player2 = array("q")
+        self.winning_team = array("b")
+        self.gender_type = array("b")
+        self.date_ordinal = array("l")
+        self.player_ids = array("q")
+        self.player_names: list[str] = []
+        self.player_genders: list[str | None] = []
+        self.player_index: dict[int, int] = {}
+        # Readers only look at the first `count` matches, so appends are safe.
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def max_match_id(self) -> int:
+        return self.match_ids[self.count - 1] if self.count else 0
+
+    @property
+    def max_player_id(self) -> int:
+        return max(self.player_ids) if self.player_ids else 0
+
+    def nbytes(self) -> int:
+        """
+        Approximate size of the match columns in bytes.
+        """
+        columns = (
+            self.match_ids,
+            self.team1_player1,
+            self.team1_player2,
+            self.team2_player1,
+            self.team2_player2,
+            self.winning_team,
+            self.gender_type,
+            self.date_ordinal,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def append_matches(self, rows) -> None:
+        """
+        Appends `_MATCH_FIELDS` value rows ordered by id.
+        """
+        for match_id, t1p1, t1p2, t2p1, t2p2, winning_team, gender_type, date_played in rows:
+            self.match_ids.append(match_id)
+            self.team1_player1.append(t1p1)
+            self.team1_player2.append(t1p2)
+            self.team2_player1.append(t2p1)
+            self.team2_player2.append(t2p2)
+            self.winning_team.append(winning_team)
+            self.gender_type.append(GENDER_TYPE_CODES.get(gender_type, 0))
+            self.date_ordinal.append(date_played.toordinal())
+        self.count = len(self.match_ids)
+
+    def append_players(self, rows) -> None:
+        for player_id, name, gender in rows:
+            if player_id in self.player_index:
+                continue
+            self.player_index[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+            self.player_names.append(name)
+            self.player_genders.append(gender)
+
+    def player_name(self, player_id: int) -> str:
+        return self.player_names[self.player_index[player_id]]
+
+    def player_gender(self, player_id: int) -> str | None:
+        return self.player_genders[self.player_index[player_id]]
+
+    def iter_matches(self):
+        """
+        Yields `(t1p1, t1p2, t2p1, t2p2, winning_team, gender_type_code, date_ordinal)`.
+        """
+        count = self.count
+        return zip(
+            self.team1_player1[:count],
+            self.team1_player2[:count],
+            self.team2_player1[:count],
+            self.team2_player2[:count],
+            self.winning_team[:count],
+            self.gender_type[:count],
+            self.date_ordinal[:count],
+        )
+
+    def scope_stats(self) -> dict[str, dict[int, dict[str, int]]]:
+        """
+        `{scope: {player_id: {"matches", "wins"}}}` for the four ranking scopes,
+        same shape as `ranking_sql.aggregate_player_scope_stats`.
+        """
+        stats_by_scope: dict[str, dict[int, dict[str, int]]] = {scope: {} for scope in SCOPE_KEYS}
+        all_stats = stats_by_scope["all"]
+        for t1p1, t1p2, t2p1, t2p2, winning_team, gender_code, _ in self.iter_matches():
+            gender_stats = stats_by_scope.get(SCOPE_BY_GENDER_TYPE_CODE.get(gender_code))
+            for player_id, team_number in ((t1p1, 1), (t1p2, 1), (t2p1, 2), (t2p2, 2)):
+                win = 1 if winning_team == team_number else 0
+                for scope_stats in (all_stats, gender_stats):
+                    if scope_stats is None:
+                        continue
+                    row = scope_stats.get(player_id)
+                    if row is None:
+                        scope_stats[player_id] = {"matches": 1, "wins": win}
+                    else:
+                        row["matches"] += 1
+                        row["wins"] += win
+        return stats_by_scope
+
+    def pair_stats(self) -> dict[tuple[int, int], dict[str, int]]:
+        """
+        `{(low_player_id, high_player_id): {"matches", "wins"}}`, same shape as
+        `ranking_sql.aggregate_pair_stats`.
+        """
+        stats: dict[tuple[int, int], dict[str, int]] = {}
+        for t1p1, t1p2, t2p1, t2p2, winning_team, _, _ in self.iter_matches():
+            for first, second, team_number in ((t1p1, t1p2, 1), (t2p1, t2p2, 2)):
+                pair_key = (first, second) if first <= second else (second, first)
+                win = 1 if winning_team == team_number else 0
+                row = stats.get(pair_key)
+                if row is None:
+                    stats[pair_key] = {"matches": 1, "wins": win}
+                else:
+                    row["matches"] += 1
+                    row["wins"] += win
+        return stats
+
+
+def _store_versions(group) -> tuple[str, str]:
+    from games.models import GroupDataVersion
+
+    if group is not None:
+        version, history_version = (
+            GroupDataVersion.objects.filter(group_id=group.pk).values_list("version", "history_version").first()
+            or (0, 0)
+        )
+        return str(version), str(history_version)
+    rows = list(GroupDataVersion.objects.order_by("group_id").values_list("group_id", "version", "history_version"))
+    version = hashlib.md5(repr([(group_id, v) for group_id, v, _ in rows]).encode()).hexdigest()
+    history_version = hashlib.md5(repr([(group_id, h) for group_id, _, h in rows]).encode()).hexdigest()
+    return version, history_version
+
+
+def _group_querysets(group):
+    from games.models import Match, Player
+
+    matches_qs = Match.objects.all()
+    players_qs = Player.objects.all()
+    if group is not None:
+        matches_qs = matches_qs.filter(group=group)
+        players_qs = players_qs.filter(group=group)
+    return matches_qs, players_qs
+
+
+def _load_store(group, version: str, history_version: str) -> MatchStore:
+    matches_qs, players_qs = _group_querysets(group)
+    store = MatchStore(version=version, history_version=history_version)
+    store.append_matches(matches_qs.order_by("pk").values_list(*_MATCH_FIELDS).iterator())
+    store.append_players(players_qs.order_by("pk").values_list("pk", "name", "gender"))
+    return store
+
+
+def _extend_store(store: MatchStore, group, version: str) -> bool:
+    """
+    Appends matches and players created since the store was loaded. False when
+    the store cannot be brought up to date by appending (reload instead).
+    """
+    matches_qs, players_qs = _group_querysets(group)
+    new_matches = list(matches_qs.filter(pk__gt=store.max_match_id).order_by("pk").values_list(*_MATCH_FIELDS))
+    # A match committed with a lower id than one already loaded would be missed.
+    if matches_qs.count() != store.count + len(new_matches):
+        return False
+    store.append_players(players_qs.filter(pk__gt=store.max_player_id).order_by("pk").values_list("pk", "name", "gender"))
+    store.append_matches(new_matches)
+    store.version = version
+    return True
+
+
+def get_match_store(group=None) -> MatchStore:
+    """
+    Match store of `group` (every group when None) for the current data version.
+    """
+    version, history_version = _store_versions(group)
+    key = group.pk if group is not None else None
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and store.version == version:
+            return store
+        if store is None or store.history_version != history_version or not _extend_store(store, group, version):
+            store = _load_store(group, version, history_version)
+            _stores[key] = store
+        return store
+
+
+def clear_match_stores() -> None:
+    with _stores_lock:
+        _stores.clear()
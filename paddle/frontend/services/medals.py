@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
 from frontend.medals.config import MEDAL_DEFINITIONS, SCOPE_CONFIG
-from frontend.services.ranking import build_pairs_ranking_sections, canonical_rounded_win_rate, compute_rankings_for_scopes
+from frontend.services.ranking import RankingContext, canonical_rounded_win_rate
+from frontend.services.ranking_cache import cached_ranking_value
 
 MEDAL_BY_KEY = {medal["key"]: medal for medal in MEDAL_DEFINITIONS}
 MEDAL_SCOPE_KEYS = list(SCOPE_CONFIG.keys())
@@ -9,24 +13,64 @@ INDIVIDUAL_RANKING_SCOPE_KEYS = [scope for scope in MEDAL_SCOPE_KEYS if scope !=
 TOP_PAGE_POSITION = 12
 
 
-def _medal_instance(medal_key: str, scope: str) -> dict:
+@dataclass(frozen=True, slots=True)
+class Medal:
+    """
+    One awarded medal: its definition, the ranking scope it was won in and,
+    once a view resolves it (`with_medal_hrefs`), the ranking page it links to.
+    """
+
+    key: str
+    name: str
+    icon: str
+    description: str
+    category: str
+    order: int
+    scope: str
+    scope_label: str
+    scope_css_class: str
+    progress_color_class: str
+    href: str | None = None
+
+
+def _medal_instance(medal_key: str, scope: str) -> Medal:
     medal = MEDAL_BY_KEY[medal_key]
     scope_config = SCOPE_CONFIG[scope]
-    return {
-        "key": medal["key"],
-        "name": medal["name"],
-        "icon": medal["icon"],
-        "description": medal["description"],
-        "category": medal["category"],
-        "order": medal["order"],
-        "scope": scope,
-        "scope_label": scope_config["label"],
-        "scope_css_class": scope_config["css_class"],
-        "progress_color_class": scope_config["progress_color_class"],
-    }
+    return Medal(
+        key=medal["key"],
+        name=medal["name"],
+        icon=medal["icon"],
+        description=medal["description"],
+        category=medal["category"],
+        order=medal["order"],
+        scope=scope,
+        scope_label=scope_config["label"],
+        scope_css_class=scope_config["css_class"],
+        progress_color_class=scope_config["progress_color_class"],
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class MedalRow:
+    """
+    Medallero row of one player: the awarded medals (in display order), the
+    per-category counters and the medals padded into rows of three.
+
+    Rows are cached and shared between requests, so they are immutable all
+    the way down; views derive linked copies with `with_medal_hrefs`.
+    """
+
+    player: object
+    medals: tuple[Medal, ...]
+    total_medals: int
+    first_place_medals: int
+    position_medals: int
+    performance_medals: int
+    medal_rows: tuple[tuple[Medal | None, ...], ...]
 
 
 def _ensure_player_row(players_by_id: dict[int, dict], player) -> dict:
+    # Mutable accumulator while awarding; frozen into a `MedalRow` at the end.
     row = players_by_id.setdefault(
         player.id,
         {
@@ -36,7 +80,6 @@ def _ensure_player_row(players_by_id: dict[int, dict], player) -> dict:
             "first_place_medals": 0,
             "position_medals": 0,
             "performance_medals": 0,
-            "medal_rows": [],
         },
     )
     return row
@@ -49,9 +92,9 @@ def _award(players_by_id: dict[int, dict], player, medal_key: str, scope: str) -
     row["total_medals"] += 1
     if medal_key == "first_place":
         row["first_place_medals"] += 1
-    if medal["category"] == "position":
+    if medal.category == "position":
         row["position_medals"] += 1
-    if medal["category"] == "performance":
+    if medal.category == "performance":
         row["performance_medals"] += 1
 
 
@@ -67,44 +110,57 @@ def _players_at_or_above_third_metric_row(players: list, metric_fn) -> list:
     return [player for player in sorted_players if metric_fn(player) >= cutoff_value]
 
 
-def _pad_medal_rows(medals: list[dict]) -> list[list[dict | None]]:
+def _pad_medal_rows(medals: tuple[Medal, ...]) -> tuple[tuple[Medal | None, ...], ...]:
     rows = []
     for index in range(0, len(medals), 3):
         row = medals[index:index + 3]
-        rows.append(row + [None] * (3 - len(row)))
-    return rows
+        rows.append(row + (None,) * (3 - len(row)))
+    return tuple(rows)
 
 
-def _finalize_rows(players_by_id: dict[int, dict]) -> list[dict]:
-    rows = list(players_by_id.values())
-    for row in rows:
-        row["medals"].sort(key=lambda medal: (medal["order"], medal["scope"]))
-        row["medal_rows"] = _pad_medal_rows(row["medals"])
+def _finalize_rows(players_by_id: dict[int, dict]) -> list[MedalRow]:
+    rows = []
+    for row in players_by_id.values():
+        medals = tuple(sorted(row.pop("medals"), key=lambda medal: (medal.order, medal.scope)))
+        rows.append(MedalRow(**row, medals=medals, medal_rows=_pad_medal_rows(medals)))
 
     rows.sort(
         key=lambda row: (
-            -row["total_medals"],
-            -row["first_place_medals"],
-            -row["position_medals"],
-            -row["performance_medals"],
-            row["player"].name.lower(),
-            row["player"].id,
+            -row.total_medals,
+            -row.first_place_medals,
+            -row.position_medals,
+            -row.performance_medals,
+            row.player.name.lower(),
+            row.player.id,
         )
     )
     return rows
 
 
-def build_medallero_rows(*, group=None) -> list[dict]:
-    ranking_results = compute_rankings_for_scopes(INDIVIDUAL_RANKING_SCOPE_KEYS, group=group)
+def with_medal_hrefs(row: MedalRow, href_for: Callable[[Medal], str | None]) -> MedalRow:
+    """
+    Copy of `row` whose medals link to `href_for(medal)`; `row` itself may be
+    a cached value and is left untouched.
+    """
+    medals = tuple(replace(medal, href=href_for(medal)) for medal in row.medals)
+    return replace(row, medals=medals, medal_rows=_pad_medal_rows(medals))
+
+
+def build_medallero_rows(*, group=None, ranking_context: RankingContext | None = None) -> list[MedalRow]:
+    return cached_ranking_value(
+        "medallero",
+        group,
+        lambda: _build_medallero_rows(ranking_context or RankingContext(group=group)),
+    )
+
+
+def _build_medallero_rows(ranking_context: RankingContext) -> list[MedalRow]:
+    ranking_results = ranking_context.rankings(INDIVIDUAL_RANKING_SCOPE_KEYS)
     players_by_id: dict[int, dict] = {}
 
     for scope in INDIVIDUAL_RANKING_SCOPE_KEYS:
         ranked_players, _, _ = ranking_results[scope]
-        eligible_players = [
-            player for player in ranked_players
-            if getattr(player, "display_position", None) is not None
-            and player.display_position <= TOP_PAGE_POSITION
-        ]
+        eligible_players = [player for player in ranked_players if player.display_position <= TOP_PAGE_POSITION]
 
         for player in eligible_players:
             _award(players_by_id, player, "cuadro_honor", scope)
@@ -127,7 +183,7 @@ def build_medallero_rows(*, group=None) -> list[dict]:
         ):
             _award(players_by_id, player, "top3_matches", scope)
 
-    pair_sections = build_pairs_ranking_sections(group=group)
+    pair_sections = ranking_context.pairs_sections()
     pair_awards = (
         (
             "top_pairs",
@@ -148,14 +204,14 @@ def build_medallero_rows(*, group=None) -> list[dict]:
             if position > len(medal_keys):
                 break
             medal_key = medal_keys[position - 1]
-            for player in (row["player1"], row["player2"]):
+            for player in (row.player1, row.player2):
                 _award(players_by_id, player, medal_key, "pairs")
 
     return _finalize_rows(players_by_id)
 
 
-def build_player_medallero_row(player, *, group=None) -> dict | None:
-    for row in build_medallero_rows(group=group):
-        if row["player"].id == player.id:
+def build_player_medallero_row(player, *, group=None, ranking_context: RankingContext | None = None) -> MedalRow | None:
+    for row in build_medallero_rows(group=group, ranking_context=ranking_context):
+        if row.player.id == player.id:
             return row
     return None
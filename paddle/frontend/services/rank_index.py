@@ -0,0 +1,225 @@
+"""Ordered rank index per (group, scope) for live updates and what-if queries.
+
+Keeps the canonical sort keys of a scope ranking in a sorted list (`bisect`):
+
+- key = `canonical_ranking_sort_key(...) + (player_id,)`, unique per player;
+- competition position = 1 + number of keys whose tie prefix
+  (`-wins, -rate, matches`) sorts before the player's, found with one
+  `bisect_left` on the prefix.
+
+Indexes are built once from the columnar match store and kept per worker
+process. When only appends happened (same store history), the new matches are
+applied one by one with `update_player`; any other change rebuilds the index.
+What-if queries never mutate the index: the positions of the four players
+after a hypothetical match are read from the unchanged keys and corrected for
+the four keys that would move.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+
+from .match_store import SCOPE_BY_GENDER_TYPE_CODE
+from .ranking import canonical_ranking_sort_key, normalize_ranking_scope
+
+_indexes: dict[tuple[object, str], "RankIndex"] = {}
+_indexes_lock = threading.RLock()
+
+
+def _sort_key(player_id: int, wins: int, matches: int, name: str) -> tuple:
+    win_rate = (wins / matches) * 100 if matches else 0.0
+    return canonical_ranking_sort_key(wins=wins, win_rate=win_rate, matches=matches, name=name) + (player_id,)
+
+
+def _tie_prefix(sort_key: tuple) -> tuple:
+    # Shorter tuples sort before longer ones with the same prefix, so
+    # bisect_left on the prefix lands on the first row of the tie group.
+    return sort_key[:3]
+
+
+def _in_population(scope: str, gender) -> bool:
+    from games.models import Player
+
+    if scope == "male":
+        return gender == Player.GENDER_MALE
+    if scope == "female":
+        return gender == Player.GENDER_FEMALE
+    return True
+
+
+def _match_scopes(genders) -> tuple[str, ...]:
+    """
+    Ranking scopes a match of players with `genders` counts in.
+    """
+    from games.models import Match, PlayerScopeStats
+
+    return tuple(PlayerScopeStats.scopes_for_match_gender_type(Match.gender_type_for_genders(genders)))
+
+
+class RankIndex:
+    def __init__(self, scope: str, *, history_version: str = "", match_count: int = 0):
+        self.scope = scope
+        self.history_version = history_version
+        # Number of store matches already applied to the index.
+        self.match_count = match_count
+        self.keys: list[tuple] = []
+        self.rows: dict[int, tuple[int, int, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_store(cls, scope: str, store) -> RankIndex:
+        """
+        Builds the index of `scope` from a `MatchStore` in one sort.
+        """
+        index = cls(scope, history_version=store.history_version, match_count=len(store))
+        for player_id, row in store.scope_stats()[scope].items():
+            if player_id in store.player_index and _in_population(scope, store.player_gender(player_id)):
+                index.rows[player_id] = (row["wins"], row["matches"], store.player_name(player_id))
+        index.keys = sorted(
+            _sort_key(player_id, wins, matches, name) for player_id, (wins, matches, name) in index.rows.items()
+        )
+        return index
+
+    def _key_of(self, player_id: int) -> tuple | None:
+        row = self.rows.get(player_id)
+        return _sort_key(player_id, *row) if row else None
+
+    def stats_of(self, player_id: int) -> tuple[int, int]:
+        """
+        `(wins, matches)` of a player in this scope ((0, 0) when unranked).
+        """
+        wins, matches, _ = self.rows.get(player_id, (0, 0, ""))
+        return wins, matches
+
+    def position_of(self, player_id: int) -> int | None:
+        """
+        Competition position of a ranked player, None when unranked. O(log n).
+        """
+        key = self._key_of(player_id)
+        return bisect_left(self.keys, _tie_prefix(key)) + 1 if key else None
+
+    def update_player(self, player_id: int, wins: int, matches: int, name: str) -> None:
+        """
+        Moves a player to its new key in O(log n) searches.
+        """
+        old_key = self._key_of(player_id)
+        if old_key is not None:
+            del self.keys[bisect_left(self.keys, old_key)]
+        if matches > 0:
+            self.rows[player_id] = (wins, matches, name)
+            insort(self.keys, _sort_key(player_id, wins, matches, name))
+        else:
+            self.rows.pop(player_id, None)
+
+    def apply_store_matches(self, store) -> None:
+        """
+        Applies the store matches appended since the index was built.
+        """
+        rows = zip(
+            store.team1_player1[self.match_count:len(store)],
+            store.team1_player2[self.match_count:len(store)],
+            store.team2_player1[self.match_count:len(store)],
+            store.team2_player2[self.match_count:len(store)],
+            store.winning_team[self.match_count:len(store)],
+            store.gender_type[self.match_count:len(store)],
+        )
+        for t1p1, t1p2, t2p1, t2p2, winning_team, gender_code in rows:
+            if self.scope != "all" and SCOPE_BY_GENDER_TYPE_CODE.get(gender_code) != self.scope:
+                continue
+            for player_id, team_number in ((t1p1, 1), (t1p2, 1), (t2p1, 2), (t2p2, 2)):
+                if not _in_population(self.scope, store.player_gender(player_id)):
+                    continue
+                wins, matches = self.stats_of(player_id)
+                win = 1 if winning_team == team_number else 0
+                self.update_player(player_id, wins + win, matches + 1, store.player_name(player_id))
+        self.match_count = len(store)
+
+    def what_if(self, changes: dict[int, tuple[int, int, str]]) -> dict[int, dict]:
+        """
+        Positions after hypothetical `{player_id: (wins, matches, name)}` changes,
+        without mutating the index: `{player_id: {"before", "after"}}`.
+        """
+        old_keys = {player_id: self._key_of(player_id) for player_id in changes}
+        new_keys = {
+            player_id: _sort_key(player_id, wins, matches, name) if matches > 0 else None
+            for player_id, (wins, matches, name) in changes.items()
+        }
+        results = {}
+        for player_id in changes:
+            new_key = new_keys[player_id]
+            after = None
+            if new_key is not None:
+                prefix = _tie_prefix(new_key)
+                after = bisect_left(self.keys, prefix) + 1
+                # Correct for the changed keys: drop their old places, add their new ones.
+                after -= sum(1 for key in old_keys.values() if key is not None and key < prefix)
+                after += sum(1 for key in new_keys.values() if key is not None and key < prefix)
+            results[player_id] = {"before": self.position_of(player_id), "after": after}
+        return results
+
+
+def get_rank_index(scope: str, *, group=None) -> RankIndex:
+    """
+    Rank index of `scope` in `group` (every group when None), brought up to
+    date with the group's match store.
+    """
+    from .match_store import get_match_store
+
+    scope = normalize_ranking_scope(scope)
+    store = get_match_store(group)
+    key = (group.pk if group is not None else None, scope)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None or index.history_version != store.history_version or index.match_count > len(store):
+            index = _indexes[key] = RankIndex.from_store(scope, store)
+        elif index.match_count < len(store):
+            index.apply_store_matches(store)
+        return index
+
+
+def clear_rank_indexes() -> None:
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def what_if_match(team1: tuple[int, int], team2: tuple[int, int], winning_team: int, *, group=None) -> dict:
+    """
+    Position changes of the four players if `team1` and `team2` played a match
+    won by `winning_team`, for every scope the match would count in:
+    `{scope: [{"player_id", "name", "before", "after", "wins", "matches"}, ...]}`.
+    """
+    from .match_store import get_match_store
+
+    store = get_match_store(group)
+    slots = ((team1[0], 1), (team1[1], 1), (team2[0], 2), (team2[1], 2))
+    results = {}
+    with _indexes_lock:
+        # Held so no other request applies new matches to an index mid-query.
+        for scope in _match_scopes(store.player_gender(player_id) for player_id, _ in slots):
+            results[scope] = _what_if_scope(get_rank_index(scope, group=group), store, slots, winning_team)
+    return results
+
+
+def _what_if_scope(index: RankIndex, store, slots, winning_team: int) -> list[dict]:
+    changes = {}
+    for player_id, team_number in slots:
+        if not _in_population(index.scope, store.player_gender(player_id)):
+            continue
+        wins, matches = index.stats_of(player_id)
+        win = 1 if winning_team == team_number else 0
+        changes[player_id] = (wins + win, matches + 1, store.player_name(player_id))
+    positions = index.what_if(changes)
+    return [
+        {
+            "player_id": player_id,
+            "name": name,
+            "before": positions[player_id]["before"],
+            "after": positions[player_id]["after"],
+            "wins": wins,
+            "matches": matches,
+        }
+        for player_id, (wins, matches, name) in changes.items()
+    ]
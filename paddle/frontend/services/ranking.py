@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from copy import copy
+from dataclasses import dataclass, replace
 from typing import TYPE_CHECKING, Callable
 
+from django.conf import settings
+
 if TYPE_CHECKING:
     from games.models import Player
 
@@ -12,6 +14,125 @@ if TYPE_CHECKING:
 # - Position style: competition ranking ("1224"), with one displayed row per tie group.
 
 
+@dataclass(frozen=True, slots=True)
+class PlayerRef:
+    """
+    Compact, immutable player reference carried by ranking rows instead of a
+    model instance.
+    """
+
+    id: int
+    name: str
+    gender: str | None
+    group_id: int | None
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @classmethod
+    def from_player(cls, player) -> PlayerRef:
+        return cls(player.id, player.name, player.gender, player.group_id)
+
+
+@dataclass(frozen=True, slots=True)
+class RankedPlayer(PlayerRef):
+    """
+    One row of a scope ranking: the player reference plus the display metrics.
+    """
+
+    display_position: int
+    show_position: bool
+    display_ordinal: int
+    display_wins: int
+    display_matches: int
+    display_win_rate: float
+
+
+class RankingResult:
+    """
+    Ranked rows of one scope plus O(1) player lookups (id -> ordinal index,
+    page, previous/following rows).
+
+    Unpacks and indexes like the `(ranked_players, unranked_players, scope)`
+    tuple it replaces.
+    """
+
+    __slots__ = ("ranked_players", "unranked_players", "scope", "_ordinals")
+
+    def __init__(self, ranked_players: list[RankedPlayer], unranked_players: list[Player], scope: str):
+        self.ranked_players = ranked_players
+        self.unranked_players = unranked_players
+        self.scope = scope
+        self._ordinals: dict[int, int] | None = None
+
+    def __iter__(self):
+        return iter((self.ranked_players, self.unranked_players, self.scope))
+
+    def __getitem__(self, index):
+        return (self.ranked_players, self.unranked_players, self.scope)[index]
+
+    def __getstate__(self):
+        # The index is rebuilt on first use instead of being cached with the rows.
+        return self.ranked_players, self.unranked_players, self.scope
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @property
+    def total(self) -> int:
+        return len(self.ranked_players)
+
+    @property
+    def ordinals(self) -> dict[int, int]:
+        """
+        `{player_id: ordinal}` (1-based row in canonical order).
+        """
+        if self._ordinals is None:
+            self._ordinals = {player.id: ordinal for ordinal, player in enumerate(self.ranked_players, start=1)}
+        return self._ordinals
+
+    def ordinal_of(self, player_id: int) -> int | None:
+        return self.ordinals.get(player_id)
+
+    def row_for(self, player_id: int) -> RankedPlayer | None:
+        ordinal = self.ordinal_of(player_id)
+        return self.ranked_players[ordinal - 1] if ordinal is not None else None
+
+    def page_of(self, player_id: int, page_size: int = 12) -> int | None:
+        ordinal = self.ordinal_of(player_id)
+        return ranking_page_for_ordinal(ordinal, page_size) if ordinal is not None else None
+
+    def neighbours(self, player_id: int) -> tuple[RankedPlayer | None, RankedPlayer | None]:
+        """
+        Rows right before and after the player (None at the edges or when unranked).
+        """
+        ordinal = self.ordinal_of(player_id)
+        if ordinal is None:
+            return None, None
+        previous_row = self.ranked_players[ordinal - 2] if ordinal > 1 else None
+        following_row = self.ranked_players[ordinal] if ordinal < self.total else None
+        return previous_row, following_row
+
+
+@dataclass(frozen=True, slots=True)
+class PairRow:
+    """
+    One row of the pairs ranking; `display_position`/`show_position` are set
+    once the row is placed in a section.
+    """
+
+    player1: PlayerRef
+    player2: PlayerRef
+    wins: int
+    matches: int
+    losses: int
+    win_rate: float
+    pair_sort_name: tuple[str, str]
+    display_position: int | None = None
+    show_position: bool = False
+
+
 def canonical_rounded_win_rate(win_rate: float) -> float:
     return round(win_rate, 2)
 
@@ -33,168 +154,160 @@ def canonical_ranking_tie_key(*, wins: int, win_rate: float, matches: int) -> tu
     )
 
 
-def _pair_player_tuple(player_a, player_b):
-    if player_a.id <= player_b.id:
-        return player_a, player_b
-    return player_b, player_a
+def _build_pair_rows(*, group=None) -> list[PairRow]:
+    if settings.RANKING_ENGINE == "sql":
+        from .ranking_sql import aggregate_pair_stats
+
+        return _pair_rows_from_pair_stats(aggregate_pair_stats(group=group))
+    if settings.RANKING_ENGINE == "numpy":
+        from .match_store import get_match_store
+        from .ranking_numpy import pair_stats
 
+        return _pair_rows_from_pair_stats(pair_stats(get_match_store(group)))
 
-def _build_pair_rows(*, group=None):
-    from games.models import Match
+    from .head_to_head import build_head_to_head
 
-    matches_qs = Match.objects.select_related(
-        "team1_player1", "team1_player2", "team2_player1", "team2_player2"
+    return _pair_rows_from_pair_stats(
+        {
+            (low_id, high_id): {"matches": matches, "wins": wins}
+            for low_id, high_id, matches, wins, _ in build_head_to_head(group=group).pairs()
+        }
     )
-    if group is not None:
-        matches_qs = matches_qs.filter(group=group)
-
-    stats = {}
-
-    for match in matches_qs:
-        for team_number, players in (
-            (1, _pair_player_tuple(match.team1_player1, match.team1_player2)),
-            (2, _pair_player_tuple(match.team2_player1, match.team2_player2)),
-        ):
-            pair_key = (players[0].id, players[1].id)
-            row = stats.setdefault(
-                pair_key,
-                {
-                    "player1": players[0],
-                    "player2": players[1],
-                    "wins": 0,
-                    "matches": 0,
-                },
-            )
-            row["matches"] += 1
-            if match.winning_team == team_number:
-                row["wins"] += 1
 
+
+def _pair_rows_from_pair_stats(stats: dict[tuple[int, int], dict[str, int]]) -> list[PairRow]:
+    from games.models import Player
+
+    players = {
+        player_id: PlayerRef(player_id, name, gender, group_id)
+        for player_id, name, gender, group_id in Player.objects.filter(
+            id__in={player_id for pair_key in stats for player_id in pair_key}
+        ).values_list("id", "name", "gender", "group_id")
+    }
+    return _pair_rows_from_stats(
+        (players[low_id], players[high_id], row["wins"], row["matches"])
+        for (low_id, high_id), row in stats.items()
+    )
+
+
+def _pair_rows_from_stats(stats_rows) -> list[PairRow]:
     pair_rows = []
-    for row in stats.values():
-        wins = row["wins"]
-        matches = row["matches"]
-        losses = matches - wins
+    for player1, player2, wins, matches in stats_rows:
         win_rate = (wins / matches) * 100 if matches else 0.0
         pair_rows.append(
-            {
-                "player1": row["player1"],
-                "player2": row["player2"],
-                "wins": wins,
-                "matches": matches,
-                "losses": losses,
-                "win_rate": win_rate,
-                "pair_sort_name": (
-                    row["player1"].name.lower(),
-                    row["player2"].name.lower(),
-                ),
-            }
+            PairRow(
+                player1=player1,
+                player2=player2,
+                wins=wins,
+                matches=matches,
+                losses=matches - wins,
+                win_rate=win_rate,
+                pair_sort_name=(player1.name.lower(), player2.name.lower()),
+            )
         )
 
     return pair_rows
 
 
-def _apply_competition_positions(rows: list[dict], key_fn) -> list[dict]:
-    rows = [row.copy() for row in rows]
-    last_key = None
-    last_position = None
+def _apply_competition_positions(rows: list[PairRow], key_fn) -> list[PairRow]:
+    return [
+        replace(row, display_position=position, show_position=show_position)
+        for row, (position, show_position) in zip(rows, competition_positions(rows, key_fn))
+    ]
 
-    for index, row in enumerate(rows, start=1):
-        key = key_fn(row)
-        if key != last_key:
-            row["display_position"] = index
-            row["show_position"] = True
-            last_key = key
-            last_position = index
-        else:
-            row["display_position"] = last_position
-            row["show_position"] = False
 
-    return rows
+def build_pairs_ranking_sections(*, group=None) -> dict[str, list[PairRow]]:
+    """
+    Pairs ranking sections, served from the versioned ranking cache.
+    """
+    from .ranking_cache import cached_ranking_value
+
+    return cached_ranking_value("pairs", group, lambda: _build_pairs_ranking_sections(group=group))
 
 
-def build_pairs_ranking_sections(*, group=None) -> dict[str, list[dict]]:
+def _build_pairs_ranking_sections(*, group=None) -> dict[str, list[PairRow]]:
     pair_rows = _build_pair_rows(group=group)
 
     by_wins = sorted(
         pair_rows,
         key=lambda row: (
-            -row["wins"],
-            -row["win_rate"],
-            -row["matches"],
-            row["pair_sort_name"][0],
-            row["pair_sort_name"][1],
+            -row.wins,
+            -row.win_rate,
+            -row.matches,
+            row.pair_sort_name[0],
+            row.pair_sort_name[1],
         ),
     )
-    qualified_by_rate = [row for row in pair_rows if row["matches"] >= 5]
+    qualified_by_rate = [row for row in pair_rows if row.matches >= 5]
 
     best_rate = sorted(
         qualified_by_rate,
         key=lambda row: (
-            -row["win_rate"],
-            -row["wins"],
-            -row["matches"],
-            row["pair_sort_name"][0],
-            row["pair_sort_name"][1],
+            -row.win_rate,
+            -row.wins,
+            -row.matches,
+            row.pair_sort_name[0],
+            row.pair_sort_name[1],
         ),
     )
     worst_rate = sorted(
         qualified_by_rate,
         key=lambda row: (
-            row["win_rate"],
-            -row["losses"],
-            -row["matches"],
-            row["pair_sort_name"][0],
-            row["pair_sort_name"][1],
+            row.win_rate,
+            -row.losses,
+            -row.matches,
+            row.pair_sort_name[0],
+            row.pair_sort_name[1],
         ),
     )
     return {
         "top_pairs": _apply_competition_positions(
             by_wins[:5],
-            key_fn=lambda row: (row["wins"], canonical_rounded_win_rate(row["win_rate"]), row["matches"]),
+            key_fn=lambda row: (row.wins, canonical_rounded_win_rate(row.win_rate), row.matches),
         ),
         "pairs_of_the_century": _apply_competition_positions(
             best_rate[:3],
             key_fn=lambda row: (
-                canonical_rounded_win_rate(row["win_rate"]),
-                row["wins"],
-                row["matches"],
+                canonical_rounded_win_rate(row.win_rate),
+                row.wins,
+                row.matches,
             ),
         ),
         "catastrophic_pairs": _apply_competition_positions(
             worst_rate[:3],
             key_fn=lambda row: (
-                canonical_rounded_win_rate(row["win_rate"]),
-                row["losses"],
-                row["matches"],
+                canonical_rounded_win_rate(row.win_rate),
+                row.losses,
+                row.matches,
             ),
         ),
     }
 
 
-def apply_competition_ranking_with_ties(players: list[Player], key_fn: Callable[[Player], tuple]) -> None:
+def competition_positions(rows: list, key_fn: Callable[[object], tuple]) -> list[tuple[int, bool]]:
     """
-    Applies competition ranking ("1224") with ties to an already-sorted list.
+    Competition ranking ("1224") with ties of an already-sorted list.
 
-    Adds:
-        - display_position (int)
-        - show_position (bool): True only for first row of tie group
+    Returns one (display_position, show_position) per row; show_position is True
+    only for the first row of a tie group.
     """
+    positions = []
     last_key = None
     last_position = None
 
-    for index, p in enumerate(players, start=1):
-        key = key_fn(p)
+    for index, row in enumerate(rows, start=1):
+        key = key_fn(row)
         if key != last_key:
-            p.display_position = index
-            p.show_position = True
             last_key = key
             last_position = index
+            positions.append((index, True))
         else:
-            p.display_position = last_position
-            p.show_position = False
+            positions.append((last_position, False))
+
+    return positions
 
 
-def _normalize_scope(scope: str) -> str:
+def normalize_ranking_scope(scope: str) -> str:
     return scope if scope in {"all", "male", "female", "mixed"} else "all"
 
 
@@ -208,132 +321,137 @@ def _population_for_scope(scope: str, population: list[Player]) -> list[Player]:
     return list(population)
 
 
-def _apply_ranking_stats(population: list[Player], stats: dict[int, dict[str, int]]):
-    ranked_players: list[Player] = []
+def _apply_ranking_stats(
+    population: list[Player],
+    stats: dict[int, dict[str, int]],
+    positions: dict[int, int] | None = None,
+) -> tuple[list[RankedPlayer], list[Player]]:
+    rows = []
     unranked_players: list[Player] = []
 
-    for source_player in population:
-        row = stats.get(source_player.id)
-        player = copy(source_player)
+    for player in population:
+        row = stats.get(player.id)
         if not row or row["matches"] == 0:
             unranked_players.append(player)
             continue
 
         wins = row["wins"]
         matches = row["matches"]
-        win_rate = (wins / matches) * 100 if matches else 0.0
+        rows.append((player, wins, matches, (wins / matches) * 100 if matches else 0.0))
 
-        player.display_wins = wins
-        player.display_matches = matches
-        player.display_win_rate = win_rate
-        ranked_players.append(player)
-
-    ranked_players.sort(
-        key=lambda p: (
-            canonical_ranking_sort_key(
-                wins=p.display_wins,
-                win_rate=p.display_win_rate,
-                matches=p.display_matches,
-                name=p.name,
-            )
-        )
+    rows.sort(
+        key=lambda row: canonical_ranking_sort_key(wins=row[1], win_rate=row[3], matches=row[2], name=row[0].name)
     )
 
-    apply_competition_ranking_with_ties(
-        ranked_players,
-        key_fn=lambda p: canonical_ranking_tie_key(
-            wins=p.display_wins,
-            win_rate=p.display_win_rate,
-            matches=p.display_matches,
-        ),
-    )
+    if positions is not None:
+        # Positions already assigned by the SQL/NumPy engines (same tie key).
+        display_positions = []
+        last_position = None
+        for player, _, _, _ in rows:
+            display_positions.append((positions[player.id], positions[player.id] != last_position))
+            last_position = positions[player.id]
+    else:
+        display_positions = competition_positions(
+            rows,
+            key_fn=lambda row: canonical_ranking_tie_key(wins=row[1], win_rate=row[3], matches=row[2]),
+        )
 
+    ranked_players = [
+        RankedPlayer(
+            id=player.id,
+            name=player.name,
+            gender=player.gender,
+            group_id=player.group_id,
+            display_position=position,
+            show_position=show_position,
+            display_ordinal=ordinal,
+            display_wins=wins,
+            display_matches=matches,
+            display_win_rate=win_rate,
+        )
+        for ordinal, ((player, wins, matches, win_rate), (position, show_position)) in enumerate(
+            zip(rows, display_positions), start=1
+        )
+    ]
     return ranked_players, unranked_players
 
 
-def compute_rankings_for_scopes(scopes: list[str], *, group=None) -> dict[str, tuple[list[Player], list[Player], str]]:
+def compute_rankings_for_scopes(scopes: list[str], *, group=None) -> dict[str, RankingResult]:
     """
-    Compute multiple ranking scopes from one match scan for the same group.
+    Compute multiple ranking scopes of the same group. Scopes cached for the
+    current group data version are served from the ranking cache; the rest are
+    computed together in one pass.
     """
-    from games.models import Match, Player
+    from .ranking_cache import cached_ranking_parts
 
     requested_scopes = []
     for scope in scopes:
-        normalized = _normalize_scope(scope)
+        normalized = normalize_ranking_scope(scope)
         if normalized not in requested_scopes:
             requested_scopes.append(normalized)
 
     if not requested_scopes:
         return {}
 
-    scope_map = {
-        "all": None,
-        "male": Match.GENDER_TYPE_MALE,
-        "female": Match.GENDER_TYPE_FEMALE,
-        "mixed": Match.GENDER_TYPE_MIXED,
-    }
-    gender_scope_by_type = {
-        Match.GENDER_TYPE_MALE: "male",
-        Match.GENDER_TYPE_FEMALE: "female",
-        Match.GENDER_TYPE_MIXED: "mixed",
-    }
+    results = cached_ranking_parts(
+        "scope",
+        group,
+        requested_scopes,
+        lambda missing_scopes: _compute_rankings_for_scopes(missing_scopes, group=group),
+    )
+    return {scope: results[scope] for scope in requested_scopes}
 
-    matches_qs = Match.objects.all()
-    if group is not None:
-        matches_qs = matches_qs.filter(group=group)
-    if "all" not in requested_scopes:
-        gender_types = [scope_map[scope] for scope in requested_scopes if scope_map[scope]]
-        matches_qs = matches_qs.filter(match_gender_type__in=gender_types)
 
-    matches_qs = matches_qs.select_related(
-        "team1_player1", "team1_player2", "team2_player1", "team2_player2"
-    )
+def _compute_rankings_for_scopes(requested_scopes: list[str], *, group=None):
+    """
+    Computes normalized scopes from the materialized `PlayerScopeStats` rows of
+    the same group (one indexed query, no match scan), from one grouped SQL
+    aggregation over matches when `RANKING_ENGINE = "sql"`, or from the
+    in-memory match store when `RANKING_ENGINE = "columnar"` (pure Python) or
+    `"numpy"` (vectorized, falls back to pure Python without NumPy).
+    """
+    from games.models import Player, PlayerScopeStats
 
-    stats_by_scope: dict[str, dict[int, dict[str, int]]] = {
-        scope: {} for scope in requested_scopes
-    }
+    positions_by_scope = None
+    if settings.RANKING_ENGINE == "sql":
+        from .ranking_sql import aggregate_player_scope_stats
 
-    for match in matches_qs:
-        match_scopes = []
-        if "all" in stats_by_scope:
-            match_scopes.append("all")
-        gender_scope = gender_scope_by_type.get(match.match_gender_type)
-        if gender_scope in stats_by_scope:
-            match_scopes.append(gender_scope)
-        if not match_scopes:
-            continue
+        stats_by_scope, positions_by_scope = aggregate_player_scope_stats(group=group, with_positions=True)
+    elif settings.RANKING_ENGINE == "columnar":
+        from .match_store import get_match_store
+
+        stats_by_scope = get_match_store(group).scope_stats()
+    elif settings.RANKING_ENGINE == "numpy":
+        from .match_store import get_match_store
+        from .ranking_numpy import aggregate_player_scope_stats
+
+        stats_by_scope, positions_by_scope = aggregate_player_scope_stats(get_match_store(group))
+    else:
+        stats_qs = PlayerScopeStats.objects.filter(scope__in=requested_scopes, matches__gt=0)
+        if group is not None:
+            stats_qs = stats_qs.filter(group=group)
 
-        players = [match.team1_player1, match.team1_player2, match.team2_player1, match.team2_player2]
-        winners = [match.team1_player1, match.team1_player2] if match.winning_team == 1 else [
-            match.team2_player1,
-            match.team2_player2,
-        ]
-        winner_ids = {winner.id for winner in winners}
-
-        for scope in match_scopes:
-            scope_stats = stats_by_scope[scope]
-            for player in players:
-                row = scope_stats.setdefault(player.id, {"matches": 0, "wins": 0})
-                row["matches"] += 1
-                if player.id in winner_ids:
-                    row["wins"] += 1
+        stats_by_scope = {scope: {} for scope in requested_scopes}
+        for scope, player_id, wins, matches in stats_qs.values_list("scope", "player_id", "wins", "matches"):
+            stats_by_scope[scope][player_id] = {"matches": matches, "wins": wins}
 
     if group:
         population = list(Player.objects.filter(group=group).order_by("name"))
     else:
-        population = list(Player.objects.select_related("group").all().order_by("name", "group__name"))
+        population = list(Player.objects.order_by("name", "group__name"))
 
     results = {}
     for scope in requested_scopes:
         ranked_players, unranked_players = _apply_ranking_stats(
             _population_for_scope(scope, population),
             stats_by_scope[scope],
+            positions_by_scope[scope] if positions_by_scope is not None else None,
         )
-        results[scope] = (ranked_players, unranked_players, scope)
+        results[scope] = RankingResult(ranked_players, unranked_players, scope)
     return results
 
 
-def compute_ranking(scope: str, *, group=None) -> tuple[list[Player], list[Player], str]:
+def compute_ranking(scope: str, *, group=None) -> RankingResult:
     """
     Compute ranking for a scope:
         - "all": all matches
@@ -341,10 +459,130 @@ def compute_ranking(scope: str, *, group=None) -> tuple[list[Player], list[Playe
         - "female": Match.GENDER_TYPE_FEMALE
         - "mixed": Match.GENDER_TYPE_MIXED
 
-    Returns:
-        ranked_players (with display_* + show_position),
+    Returns a `RankingResult` unpacking to:
+        ranked_players (`RankedPlayer` rows),
         unranked_players (scoped population),
         normalized_scope
     """
-    normalized_scope = _normalize_scope(scope)
+    normalized_scope = normalize_ranking_scope(scope)
     return compute_rankings_for_scopes([normalized_scope], group=group)[normalized_scope]
+
+
+def ranking_page_for_ordinal(ordinal: int, page_size: int = 12) -> int:
+    return ((ordinal - 1) // page_size) + 1
+
+
+def build_scope_ranking_queryset(scope: str, *, group):
+    """
+    Persisted ranked rows (`PlayerScopeStats`) of one group scope in canonical order.
+
+    Backed by the (group, scope, position) index so pages can be sliced in the DB.
+    """
+    from games.models import PlayerScopeStats
+
+    return (
+        PlayerScopeStats.objects.filter(
+            group=group,
+            scope=normalize_ranking_scope(scope),
+            position__gt=0,
+        )
+        .select_related("player")
+        .order_by("position", "ordinal")
+    )
+
+
+def ranked_player_from_stats(stats) -> RankedPlayer:
+    """
+    Returns the stats row as a `RankedPlayer`, like the rows of `compute_ranking`.
+    """
+    player = stats.player
+    return RankedPlayer(
+        id=player.id,
+        name=player.name,
+        gender=player.gender,
+        group_id=player.group_id,
+        display_position=stats.position,
+        show_position=stats.ordinal == stats.position,
+        display_ordinal=stats.ordinal,
+        display_wins=stats.wins,
+        display_matches=stats.matches,
+        display_win_rate=(stats.wins / stats.matches) * 100 if stats.matches else 0.0,
+    )
+
+
+def get_scoped_ranking_stats(scope: str, player_id: int, *, group):
+    """
+    Single-row lookup of a player's persisted ranking row, or None when unranked.
+    """
+    return build_scope_ranking_queryset(scope, group=group).filter(player_id=player_id).first()
+
+
+def compute_unranked_players(scope: str, *, group) -> list[Player]:
+    """
+    Scoped population of `group` without a persisted position in `scope`.
+    """
+    from games.models import Player
+
+    scope = normalize_ranking_scope(scope)
+    population = Player.objects.filter(group=group)
+    if scope == "male":
+        population = population.filter(gender=Player.GENDER_MALE)
+    elif scope == "female":
+        population = population.filter(gender=Player.GENDER_FEMALE)
+    ranked_player_ids = build_scope_ranking_queryset(scope, group=group).values("player_id")
+    return list(population.exclude(id__in=ranked_player_ids).order_by("name"))
+
+
+class RankingContext:
+    """
+    Per-request memo of the rankings of one group context (None = aggregate).
+
+    Each scope ranking, the pairs sections and the head-to-head matrices are
+    computed at most once; scopes requested together are computed in one
+    `compute_rankings_for_scopes` call. Player lookups go through the
+    `RankingResult` id -> ordinal index instead of scanning the ranking.
+    """
+
+    def __init__(self, *, group=None):
+        self.group = group
+        self._rankings: dict[str, RankingResult] = {}
+        self._pairs_sections: dict[str, list[PairRow]] | None = None
+        self._head_to_head = None
+
+    def load(self, scopes: list[str]) -> None:
+        missing = []
+        for scope in scopes:
+            normalized = normalize_ranking_scope(scope)
+            if normalized not in self._rankings and normalized not in missing:
+                missing.append(normalized)
+        if missing:
+            self._rankings.update(compute_rankings_for_scopes(missing, group=self.group))
+
+    def rankings(self, scopes: list[str]) -> dict[str, RankingResult]:
+        self.load(scopes)
+        return {normalize_ranking_scope(scope): self._rankings[normalize_ranking_scope(scope)] for scope in scopes}
+
+    def ranking(self, scope: str) -> RankingResult:
+        return self.rankings([scope])[normalize_ranking_scope(scope)]
+
+    def pairs_sections(self) -> dict[str, list[PairRow]]:
+        if self._pairs_sections is None:
+            self._pairs_sections = build_pairs_ranking_sections(group=self.group)
+        return self._pairs_sections
+
+    def head_to_head(self):
+        if self._head_to_head is None:
+            from .head_to_head import build_head_to_head
+
+            self._head_to_head = build_head_to_head(group=self.group)
+        return self._head_to_head
+
+    def ranked_total(self, scope: str) -> int:
+        return self.ranking(scope).total
+
+    def scoped_player_and_page(self, scope: str, player_id: int, page_size: int = 12):
+        """
+        Returns (scoped_player, page) or (None, None) when the player is unranked.
+        """
+        ranking = self.ranking(scope)
+        return ranking.row_for(player_id), ranking.page_of(player_id, page_size)
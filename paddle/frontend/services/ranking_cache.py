@@ -0,0 +1,174 @@
+"""Versioned cross-process cache for ranking results.
+
+Keys combine the result kind, the group (or the aggregate context), the group
+`GroupDataVersion` and the ranking engine. `Match.save`/`delete` and player edits
+bump the version of their own group only, so other groups keep serving cached
+results and stale entries simply expire.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+import uuid
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+KEY_PREFIX = "ranking"
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+# Backends whose `add` is not atomic across processes (FileBasedCache checks,
+# then writes); their single-flight locks are rows of `games.CacheLock` instead.
+NON_ATOMIC_ADD_BACKENDS = (FileBasedCache, DummyCache)
+
+
+def ranking_data_version(group) -> str:
+    """
+    Current data version token of `group`, or of every group for the aggregate
+    context (read from the DB, not from a possibly stale instance).
+    """
+    from games.models import GroupDataVersion
+
+    if group is not None:
+        version = GroupDataVersion.objects.filter(group_id=group.pk).values_list("version", flat=True).first()
+        return str(version or 0)
+    versions = GroupDataVersion.objects.order_by("group_id").values_list("group_id", "version")
+    return hashlib.md5(repr(list(versions)).encode()).hexdigest()
+
+
+def ranking_cache_key(kind: str, group, version: str, part: str = "") -> str:
+    group_key = group.pk if group is not None else "all"
+    return f"{KEY_PREFIX}:{kind}:{group_key}:{version}:{settings.RANKING_ENGINE}:{part}"
+
+
+def _stale_cache_key(kind: str, group, part: str) -> str:
+    # Latest computed value of any version, served while a recomputation runs.
+    return ranking_cache_key(kind, group, "stale", part)
+
+
+def _lock_cache_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+def _locks_in_cache() -> bool:
+    return not isinstance(caches["default"], NON_ATOMIC_ADD_BACKENDS)
+
+
+def _acquire_lock(lock_key: str, token: str) -> bool:
+    timeout = settings.RANKING_CACHE_LOCK_TIMEOUT
+    if _locks_in_cache():
+        return cache.add(lock_key, token, timeout=timeout)
+    from games.models import CacheLock
+
+    return CacheLock.acquire(lock_key, token, timeout)
+
+
+def _release_lock(lock_key: str, token: str) -> None:
+    if _locks_in_cache():
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+        return
+    from games.models import CacheLock
+
+    CacheLock.release(lock_key, token)
+
+
+def _compute_and_store(kind, group, keys, parts, compute_missing) -> dict:
+    computed = compute_missing(parts)
+    timeout = settings.RANKING_CACHE_TIMEOUT
+    values = {keys[part]: computed[part] for part in parts}
+    values.update({_stale_cache_key(kind, group, part): computed[part] for part in parts})
+    cache.set_many(values, timeout=timeout)
+    return {part: computed[part] for part in parts}
+
+
+def _wait_for_parts(keys: dict[str, str], parts: list[str]) -> dict:
+    """
+    Polls the cache for `parts` being filled by the lock owner, up to
+    `RANKING_CACHE_LOCK_WAIT` seconds.
+    """
+    found: dict = {}
+    deadline = time.monotonic() + settings.RANKING_CACHE_LOCK_WAIT
+    while True:
+        pending = [part for part in parts if part not in found]
+        cached = cache.get_many([keys[part] for part in pending])
+        found.update({part: cached[keys[part]] for part in pending if keys[part] in cached})
+        if len(found) == len(parts) or time.monotonic() >= deadline:
+            return found
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+
+
+def _single_flight(kind, group, keys, missing, compute_missing) -> dict:
+    """
+    One process recomputes each missing (kind, group, version, part) key; the
+    others serve the previous version (stale-while-revalidate) or wait for it.
+    Locks use the cache's atomic `add`, or a database row for backends without one.
+    """
+    token = uuid.uuid4().hex
+    owned = [part for part in missing if _acquire_lock(_lock_cache_key(keys[part]), token)]
+    results: dict = {}
+    try:
+        if owned:
+            results.update(_compute_and_store(kind, group, keys, owned, compute_missing))
+    finally:
+        for part in owned:
+            _release_lock(_lock_cache_key(keys[part]), token)
+
+    contended = [part for part in missing if part not in results]
+    if not contended:
+        return results
+
+    if settings.RANKING_CACHE_SERVE_STALE:
+        stale_keys = {part: _stale_cache_key(kind, group, part) for part in contended}
+        stale = cache.get_many(list(stale_keys.values()))
+        results.update({part: stale[key] for part, key in stale_keys.items() if key in stale})
+        contended = [part for part in contended if part not in results]
+
+    if contended:
+        results.update(_wait_for_parts(keys, contended))
+        contended = [part for part in contended if part not in results]
+
+    if contended:
+        # The lock owner is too slow (or died): compute instead of failing the request.
+        results.update(_compute_and_store(kind, group, keys, contended, compute_missing))
+    return results
+
+
+def cached_ranking_parts(
+    kind: str,
+    group,
+    parts: list[str],
+    compute_missing: Callable[[list[str]], dict],
+) -> dict:
+    """
+    Returns `{part: value}` for `parts`, computing only the parts missing from
+    the cache with one `compute_missing(missing_parts)` call.
+
+    With `RANKING_CACHE_SINGLE_FLIGHT`, concurrent misses of the same key are
+    computed by one process only (see `_single_flight`).
+    """
+    if not settings.RANKING_CACHE_ENABLED:
+        return compute_missing(parts)
+
+    version = ranking_data_version(group)
+    keys = {part: ranking_cache_key(kind, group, version, part) for part in parts}
+    cached = cache.get_many(list(keys.values()))
+    results = {part: cached[key] for part, key in keys.items() if key in cached}
+
+    missing = [part for part in parts if part not in results]
+    if missing:
+        if settings.RANKING_CACHE_SINGLE_FLIGHT:
+            results.update(_single_flight(kind, group, keys, missing, compute_missing))
+        else:
+            results.update(_compute_and_store(kind, group, keys, missing, compute_missing))
+    return results
+
+
+def cached_ranking_value(kind: str, group, compute: Callable[[], object]):
+    """
+    Single-value variant of `cached_ranking_parts`.
+    """
+    return cached_ranking_parts(kind, group, [""], lambda _: {"": compute()})[""]
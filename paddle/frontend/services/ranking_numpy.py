@@ -0,0 +1,172 @@
+"""Vectorized ranking engine over the columnar match store (optional NumPy).
+
+Selected with `RANKING_ENGINE = "numpy"`. Per-player and per-pair wins and
+matches come from `unique`/`bincount` over the integer slot arrays of
+`match_store.MatchStore`; competition positions come from one `lexsort` per
+scope. For equal wins the rounded win rate only decreases as matches grow, so
+(wins DESC, matches ASC, name) reproduces the canonical order and (wins,
+matches) the canonical tie key without floating-point rounding.
+
+Without NumPy every function falls back to the pure-Python columnar path with
+identical results.
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency.
+    np = None
+
+from .match_store import SCOPE_BY_GENDER_TYPE_CODE
+from .ranking_sql import SCOPE_KEYS
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def _slot_columns(store):
+    """
+    One entry per (match, slot): player id, win flag and gender type code.
+    """
+    count = len(store)
+    columns = [
+        np.frombuffer(column, dtype=np.int64, count=count)
+        for column in (store.team1_player1, store.team1_player2, store.team2_player1, store.team2_player2)
+    ]
+    winning_team = np.frombuffer(store.winning_team, dtype=np.int8, count=count)
+    gender_type = np.frombuffer(store.gender_type, dtype=np.int8, count=count)
+    team1_wins = winning_team == 1
+    team2_wins = winning_team == 2
+    player_ids = np.concatenate(columns)
+    is_win = np.concatenate([team1_wins, team1_wins, team2_wins, team2_wins]).astype(np.int64)
+    gender_codes = np.tile(gender_type, 4)
+    return player_ids, is_win, gender_codes
+
+
+def _grouped_counts(player_ids, is_win):
+    unique_ids, inverse = np.unique(player_ids, return_inverse=True)
+    matches = np.bincount(inverse, minlength=len(unique_ids))
+    wins = np.bincount(inverse, weights=is_win, minlength=len(unique_ids)).astype(np.int64)
+    return unique_ids, matches, wins
+
+
+def _stats_dict(unique_ids, matches, wins) -> dict[int, dict[str, int]]:
+    return {
+        player_id: {"matches": matches_count, "wins": wins_count}
+        for player_id, matches_count, wins_count in zip(unique_ids.tolist(), matches.tolist(), wins.tolist())
+    }
+
+
+def scope_stats(store) -> dict[str, dict[int, dict[str, int]]]:
+    """
+    Same result as `MatchStore.scope_stats`.
+    """
+    if np is None or not len(store):
+        return store.scope_stats()
+    player_ids, is_win, gender_codes = _slot_columns(store)
+    stats_by_scope = {"all": _stats_dict(*_grouped_counts(player_ids, is_win))}
+    for gender_code, scope in SCOPE_BY_GENDER_TYPE_CODE.items():
+        mask = gender_codes == gender_code
+        stats_by_scope[scope] = _stats_dict(*_grouped_counts(player_ids[mask], is_win[mask]))
+    return {scope: stats_by_scope[scope] for scope in SCOPE_KEYS}
+
+
+def pair_stats(store) -> dict[tuple[int, int], dict[str, int]]:
+    """
+    Same result as `MatchStore.pair_stats`.
+    """
+    if np is None or not len(store):
+        return store.pair_stats()
+    count = len(store)
+    t1p1, t1p2, t2p1, t2p2 = (
+        np.frombuffer(column, dtype=np.int64, count=count)
+        for column in (store.team1_player1, store.team1_player2, store.team2_player1, store.team2_player2)
+    )
+    winning_team = np.frombuffer(store.winning_team, dtype=np.int8, count=count)
+    first = np.concatenate([t1p1, t2p1])
+    second = np.concatenate([t1p2, t2p2])
+    is_win = np.concatenate([winning_team == 1, winning_team == 2]).astype(np.int64)
+    low_ids = np.minimum(first, second)
+    high_ids = np.maximum(first, second)
+    # One int64 key per pair keeps `unique` one-dimensional (much faster than axis=0).
+    base = int(high_ids.max()) + 1
+    unique_keys, inverse = np.unique(low_ids * base + high_ids, return_inverse=True)
+    matches = np.bincount(inverse, minlength=len(unique_keys))
+    wins = np.bincount(inverse, weights=is_win, minlength=len(unique_keys)).astype(np.int64)
+    return {
+        (low_id, high_id): {"matches": matches_count, "wins": wins_count}
+        for low_id, high_id, matches_count, wins_count in zip(
+            (unique_keys // base).tolist(),
+            (unique_keys % base).tolist(),
+            matches.tolist(),
+            wins.tolist(),
+        )
+    }
+
+
+def _in_population(scope: str, gender) -> bool:
+    from games.models import Player
+
+    if scope == "male":
+        return gender == Player.GENDER_MALE
+    if scope == "female":
+        return gender == Player.GENDER_FEMALE
+    return True
+
+
+def _python_positions(scope: str, stats: dict[int, dict[str, int]], store) -> dict[int, int]:
+    ranked = sorted(
+        (
+            (-row["wins"], row["matches"], store.player_name(player_id).lower(), player_id)
+            for player_id, row in stats.items()
+            if player_id in store.player_index and _in_population(scope, store.player_gender(player_id))
+        )
+    )
+    positions: dict[int, int] = {}
+    last_key, last_position = None, None
+    for index, (negative_wins, matches, _, player_id) in enumerate(ranked, start=1):
+        if (negative_wins, matches) != last_key:
+            last_key, last_position = (negative_wins, matches), index
+        positions[player_id] = last_position
+    return positions
+
+
+def scope_positions(scope: str, stats: dict[int, dict[str, int]], store) -> dict[int, int]:
+    """
+    `{player_id: competition position}` of the scoped population, in canonical
+    order (dict insertion order).
+    """
+    if np is None:
+        return _python_positions(scope, stats, store)
+    player_ids = [
+        player_id
+        for player_id in stats
+        if player_id in store.player_index and _in_population(scope, store.player_gender(player_id))
+    ]
+    if not player_ids:
+        return {}
+    wins = np.array([stats[player_id]["wins"] for player_id in player_ids], dtype=np.int64)
+    matches = np.array([stats[player_id]["matches"] for player_id in player_ids], dtype=np.int64)
+    names = np.array([store.player_name(player_id).lower() for player_id in player_ids])
+    order = np.lexsort((np.array(player_ids), names, matches, -wins))
+
+    sorted_wins = wins[order]
+    sorted_matches = matches[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (sorted_wins[1:] != sorted_wins[:-1]) | (sorted_matches[1:] != sorted_matches[:-1])
+    positions = np.maximum.accumulate(np.where(starts, np.arange(1, len(order) + 1), 0))
+    ordered_ids = np.array(player_ids)[order]
+    return dict(zip(ordered_ids.tolist(), positions.tolist()))
+
+
+def aggregate_player_scope_stats(store):
+    """
+    `(stats_by_scope, positions_by_scope)` with the same shape as
+    `ranking_sql.aggregate_player_scope_stats(..., with_positions=True)`.
+    """
+    stats_by_scope = scope_stats(store)
+    positions_by_scope = {scope: scope_positions(scope, stats_by_scope[scope], store) for scope in SCOPE_KEYS}
+    return stats_by_scope, positions_by_scope
+
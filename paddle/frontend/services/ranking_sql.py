@@ -0,0 +1,178 @@
+"""Set-based SQL aggregation engine for rankings.
+
+Counts wins and matches with one grouped query over the four match team slots
+instead of instantiating `Match`/`Player` objects per match. Selected with
+`RANKING_ENGINE = "sql"`; results are identical to the canonical Python policy.
+
+Competition positions use `RANK() OVER` when the backend supports window
+functions. For equal wins the rounded win rate only decreases as matches grow,
+so ordering by (wins DESC, matches ASC) reproduces the canonical tie key
+without floating-point rounding in SQL.
+"""
+
+from __future__ import annotations
+
+from django.db import connection
+
+SCOPE_KEYS = ("all", "male", "female", "mixed")
+
+
+def _quoted_match_columns():
+    from games.models import Match
+
+    qn = connection.ops.quote_name
+    meta = Match._meta
+    return qn(meta.db_table), {
+        name: qn(meta.get_field(name).column)
+        for name in (
+            "group",
+            "team1_player1",
+            "team1_player2",
+            "team2_player1",
+            "team2_player2",
+            "winning_team",
+            "match_gender_type",
+        )
+    }
+
+
+def _match_where(columns, group) -> tuple[str, list]:
+    if group is None:
+        return "", []
+    return f" WHERE {columns['group']} = %s", [group.pk]
+
+
+def _player_slots_sql(group) -> tuple[str, list]:
+    """
+    One row per (match, slot): player id, win flag and match gender type.
+    """
+    table, columns = _quoted_match_columns()
+    where, where_params = _match_where(columns, group)
+    selects = []
+    params = []
+    for slot, team_number in (
+        ("team1_player1", 1),
+        ("team1_player2", 1),
+        ("team2_player1", 2),
+        ("team2_player2", 2),
+    ):
+        selects.append(
+            f"SELECT {columns[slot]} AS player_id, "
+            f"CASE WHEN {columns['winning_team']} = %s THEN 1 ELSE 0 END AS is_win, "
+            f"{columns['match_gender_type']} AS gender_type "
+            f"FROM {table}{where}"
+        )
+        params.extend([team_number, *where_params])
+    return " UNION ALL ".join(selects), params
+
+
+def _scope_stats_sql(group) -> tuple[str, list]:
+    from games.models import Match
+
+    slots_sql, params = _player_slots_sql(group)
+    aggregates = ["COUNT(*) AS all_matches", "SUM(s.is_win) AS all_wins"]
+    aggregate_params = []
+    for scope, gender_type in (
+        ("male", Match.GENDER_TYPE_MALE),
+        ("female", Match.GENDER_TYPE_FEMALE),
+        ("mixed", Match.GENDER_TYPE_MIXED),
+    ):
+        aggregates.append(f"SUM(CASE WHEN s.gender_type = %s THEN 1 ELSE 0 END) AS {scope}_matches")
+        aggregates.append(f"SUM(CASE WHEN s.gender_type = %s THEN s.is_win ELSE 0 END) AS {scope}_wins")
+        aggregate_params.extend([gender_type, gender_type])
+    sql = f"SELECT s.player_id, {', '.join(aggregates)} FROM ({slots_sql}) s GROUP BY s.player_id"
+    return sql, aggregate_params + params
+
+
+def _ranked_scope_stats_sql(group) -> tuple[str, list]:
+    from games.models import Player
+
+    stats_sql, params = _scope_stats_sql(group)
+    qn = connection.ops.quote_name
+    player_table = qn(Player._meta.db_table)
+    player_id = qn(Player._meta.pk.column)
+    player_gender = qn(Player._meta.get_field("gender").column)
+
+    population = {
+        "all": "1 = 1",
+        "male": f"p.{player_gender} = %s",
+        "female": f"p.{player_gender} = %s",
+        "mixed": "1 = 1",
+    }
+    population_params = {"male": [Player.GENDER_MALE], "female": [Player.GENDER_FEMALE]}
+
+    rank_columns = []
+    rank_params = []
+    for scope in SCOPE_KEYS:
+        rank_columns.append(
+            f"RANK() OVER (PARTITION BY CASE WHEN a.{scope}_matches > 0 AND {population[scope]} "
+            f"THEN 1 ELSE 0 END ORDER BY a.{scope}_wins DESC, a.{scope}_matches ASC) AS {scope}_position"
+        )
+        rank_params.extend(population_params.get(scope, []))
+
+    sql = (
+        f"SELECT a.*, {', '.join(rank_columns)} "
+        f"FROM ({stats_sql}) a JOIN {player_table} p ON p.{player_id} = a.player_id"
+    )
+    return sql, rank_params + params
+
+
+def aggregate_player_scope_stats(*, group=None, with_positions: bool = False):
+    """
+    Returns `{scope: {player_id: {"matches", "wins"}}}` for the four scopes and,
+    when `with_positions` is set and window functions are available,
+    `{scope: {player_id: position}}` for the scoped populations (else None).
+    """
+    use_window = with_positions and connection.features.supports_over_clause
+    sql, params = _ranked_scope_stats_sql(group) if use_window else _scope_stats_sql(group)
+
+    stats_by_scope: dict[str, dict[int, dict[str, int]]] = {scope: {} for scope in SCOPE_KEYS}
+    positions_by_scope: dict[str, dict[int, int]] | None = (
+        {scope: {} for scope in SCOPE_KEYS} if use_window else None
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            player_id = row[0]
+            for index, scope in enumerate(SCOPE_KEYS):
+                matches = int(row[1 + index * 2] or 0)
+                wins = int(row[2 + index * 2] or 0)
+                if matches:
+                    stats_by_scope[scope][player_id] = {"matches": matches, "wins": wins}
+                    if use_window:
+                        positions_by_scope[scope][player_id] = int(row[1 + len(SCOPE_KEYS) * 2 + index])
+    return stats_by_scope, positions_by_scope
+
+
+def aggregate_pair_stats(*, group=None) -> dict[tuple[int, int], dict[str, int]]:
+    """
+    Returns `{(low_player_id, high_player_id): {"matches", "wins"}}` from one
+    grouped query over both team slots of every match.
+    """
+    table, columns = _quoted_match_columns()
+    where, where_params = _match_where(columns, group)
+    selects = []
+    params = []
+    for first, second, team_number in (
+        ("team1_player1", "team1_player2", 1),
+        ("team2_player1", "team2_player2", 2),
+    ):
+        first_column, second_column = columns[first], columns[second]
+        selects.append(
+            f"SELECT CASE WHEN {first_column} <= {second_column} THEN {first_column} ELSE {second_column} END AS low_id, "
+            f"CASE WHEN {first_column} <= {second_column} THEN {second_column} ELSE {first_column} END AS high_id, "
+            f"CASE WHEN {columns['winning_team']} = %s THEN 1 ELSE 0 END AS is_win "
+            f"FROM {table}{where}"
+        )
+        params.extend([team_number, *where_params])
+    sql = (
+        f"SELECT t.low_id, t.high_id, COUNT(*), SUM(t.is_win) "
+        f"FROM ({' UNION ALL '.join(selects)}) t GROUP BY t.low_id, t.high_id"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {
+            (low_id, high_id): {"matches": int(matches), "wins": int(wins or 0)}
+            for low_id, high_id, matches, wins in cursor.fetchall()
+        }
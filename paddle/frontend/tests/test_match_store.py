@@ -0,0 +1,98 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from frontend.services import match_store
+from frontend.services.ranking_sql import aggregate_pair_stats, aggregate_player_scope_stats
+from games.models import Match, Player
+
+
+pytestmark = pytest.mark.django_db
+
+
+def mk_match(p1, p2, p3, p4, winning_team, played_on):
+    return Match.objects.create(
+        team1_player1=p1,
+        team1_player2=p2,
+        team2_player1=p3,
+        team2_player2=p4,
+        winning_team=winning_team,
+        date_played=played_on,
+    )
+
+
+@pytest.fixture
+def history():
+    rng = random.Random(15)
+    players = [
+        Player.objects.create(name=f"S{idx:02d}", gender=Player.GENDER_MALE if idx % 3 else Player.GENDER_FEMALE)
+        for idx in range(10)
+    ]
+    for day in range(40):
+        mk_match(*rng.sample(players, 4), rng.choice([1, 2]), date(2026, 1, 1) + timedelta(days=day))
+    return players
+
+
+def test_match_store_loads_with_one_match_query_and_matches_sql_aggregates(history):
+    group = history[0].group
+
+    with CaptureQueriesContext(connection) as queries:
+        store = match_store.get_match_store(group)
+
+    # Data versions, match columns, player table.
+    assert len(queries) == 3
+    assert len(store) == 40
+    assert store.player_name(history[3].id) == "S03"
+    assert store.scope_stats() == aggregate_player_scope_stats(group=group)[0]
+    assert store.pair_stats() == aggregate_pair_stats(group=group)
+    assert store.nbytes() / len(store) <= 64
+
+
+def test_match_store_is_extended_in_place_for_appended_matches(history):
+    group = history[0].group
+    store = match_store.get_match_store(group)
+    newcomer = Player.objects.create(name="S-new", gender=Player.GENDER_MALE)
+
+    match = mk_match(newcomer, history[1], history[2], history[3], 1, date(2026, 3, 1))
+
+    assert match_store.get_match_store(group) is store
+    assert len(store) == 41
+    assert store.max_match_id == match.id
+    assert store.player_name(newcomer.id) == "S-new"
+    assert store.scope_stats() == aggregate_player_scope_stats(group=group)[0]
+
+
+def test_match_store_reloads_after_edits_and_deletes(history):
+    group = history[0].group
+    store = match_store.get_match_store(group)
+
+    match = Match.objects.filter(group=group).first()
+    match.update_match(winning_team=3 - match.winning_team)
+    edited_store = match_store.get_match_store(group)
+    assert edited_store is not store
+    assert edited_store.scope_stats() == aggregate_player_scope_stats(group=group)[0]
+
+    match.delete()
+    deleted_store = match_store.get_match_store(group)
+    assert deleted_store is not edited_store
+    assert len(deleted_store) == 39
+
+
+def test_columnar_ranking_engine_matches_the_stats_engine(history, settings):
+    from frontend.services.ranking import compute_rankings_for_scopes
+
+    group = history[0].group
+    scopes = ["all", "male", "female", "mixed"]
+
+    def snapshot():
+        return {
+            scope: [(p.id, p.display_position, p.display_wins, p.display_matches) for p in ranked]
+            for scope, (ranked, _, _) in compute_rankings_for_scopes(scopes, group=group).items()
+        }
+
+    expected = snapshot()
+    settings.RANKING_ENGINE = "columnar"
+    assert snapshot() == expected
@@ -1,4 +1,5 @@
 import re
+from dataclasses import FrozenInstanceError, replace
 from pathlib import Path
 
 import pytest
@@ -7,6 +8,7 @@ from django.urls import reverse
 
 from frontend.medals.config import MEDAL_DEFINITIONS, SCOPE_CONFIG
 from frontend.services import medals as medal_service
+from frontend.services import ranking as ranking_service
 from frontend.view_modules import ranking as ranking_views
 from games.models import Group, Player
 
@@ -24,25 +26,48 @@ def ranked_player(
     gender=Player.GENDER_MALE,
     group=None,
 ):
-    player = Player(id=player_id, name=name, gender=gender, group=group)
-    player.display_position = position
-    player.display_matches = matches
-    player.display_win_rate = win_rate
-    player.display_wins = round((matches * win_rate) / 100)
-    player.show_position = True
-    return player
+    return ranking_service.RankedPlayer(
+        id=player_id,
+        name=name,
+        gender=gender,
+        group_id=group.id if group else None,
+        display_position=position,
+        show_position=True,
+        display_ordinal=position,
+        display_wins=round((matches * win_rate) / 100),
+        display_matches=matches,
+        display_win_rate=win_rate,
+    )
+
+
+def pair_row(player1, player2):
+    return ranking_service.PairRow(
+        player1=player1,
+        player2=player2,
+        wins=1,
+        matches=1,
+        losses=0,
+        win_rate=100.0,
+        pair_sort_name=(player1.name.lower(), player2.name.lower()),
+    )
+
+
+def bypass_ranking_cache(monkeypatch):
+    # Unit tests of the medal rules run without a database (no data version lookup).
+    monkeypatch.setattr(medal_service, "cached_ranking_value", lambda kind, group, compute: compute())
 
 
 def patch_rankings(monkeypatch, players_by_scope):
     def fake_compute_rankings_for_scopes(scopes, *, group=None):
         return {
-            scope: (players_by_scope.get(scope, []), [], scope)
+            scope: ranking_service.RankingResult(players_by_scope.get(scope, []), [], scope)
             for scope in scopes
         }
 
-    monkeypatch.setattr(medal_service, "compute_rankings_for_scopes", fake_compute_rankings_for_scopes)
+    monkeypatch.setattr(ranking_service, "compute_rankings_for_scopes", fake_compute_rankings_for_scopes)
+    bypass_ranking_cache(monkeypatch)
     monkeypatch.setattr(
-        medal_service,
+        ranking_service,
         "build_pairs_ranking_sections",
         lambda group=None: {
             "top_pairs": [],
@@ -53,15 +78,15 @@ def patch_rankings(monkeypatch, players_by_scope):
 
 
 def medal_names(row):
-    return [medal["name"] for medal in row["medals"]]
+    return [medal.name for medal in row.medals]
 
 
 def medal_keys(row):
-    return [medal["key"] for medal in row["medals"]]
+    return [medal.key for medal in row.medals]
 
 
 def medal_scopes(row, medal_key):
-    return [medal["scope"] for medal in row["medals"] if medal["key"] == medal_key]
+    return [medal.scope for medal in row.medals if medal.key == medal_key]
 
 
 def test_medal_config_defines_required_metadata():
@@ -119,14 +144,15 @@ def test_medal_service_keeps_pair_scope_out_of_individual_ranking_batch(monkeypa
     def fake_compute_rankings_for_scopes(scopes, *, group=None):
         calls.append(tuple(scopes))
         return {
-            scope: (players if scope == "all" else [], [], scope)
+            scope: ranking_service.RankingResult(players if scope == "all" else [], [], scope)
             for scope in scopes
             if scope != "pairs"
         }
 
-    monkeypatch.setattr(medal_service, "compute_rankings_for_scopes", fake_compute_rankings_for_scopes)
+    monkeypatch.setattr(ranking_service, "compute_rankings_for_scopes", fake_compute_rankings_for_scopes)
+    bypass_ranking_cache(monkeypatch)
     monkeypatch.setattr(
-        medal_service,
+        ranking_service,
         "build_pairs_ranking_sections",
         lambda group=None: {
             "top_pairs": [],
@@ -135,7 +161,7 @@ def test_medal_service_keeps_pair_scope_out_of_individual_ranking_batch(monkeypa
         },
     )
 
-    rows_by_name = {row["player"].name: row for row in medal_service.build_medallero_rows()}
+    rows_by_name = {row.player.name: row for row in medal_service.build_medallero_rows()}
 
     assert "Ranked Player" in rows_by_name
     assert calls == [("all", "male", "female", "mixed")]
@@ -151,7 +177,7 @@ def test_medal_service_includes_top_12_display_positions_and_ties(monkeypatch):
     patch_rankings(monkeypatch, {"all": players})
 
     rows = medal_service.build_medallero_rows()
-    rows_by_name = {row["player"].name: row for row in rows}
+    rows_by_name = {row.player.name: row for row in rows}
 
     assert "Player 12 A" in rows_by_name
     assert "Player 12 B" in rows_by_name
@@ -170,7 +196,7 @@ def test_medal_service_awards_tied_position_medals(monkeypatch):
     ]
     patch_rankings(monkeypatch, {"all": players})
 
-    rows_by_name = {row["player"].name: row for row in medal_service.build_medallero_rows()}
+    rows_by_name = {row.player.name: row for row in medal_service.build_medallero_rows()}
 
     assert "Primer puesto" in medal_names(rows_by_name["Gold A"])
     assert "Primer puesto" in medal_names(rows_by_name["Gold B"])
@@ -191,7 +217,7 @@ def test_medal_service_performance_medals_include_cutoff_ties_only_for_eligible_
     ]
     patch_rankings(monkeypatch, {"all": players})
 
-    rows_by_name = {row["player"].name: row for row in medal_service.build_medallero_rows()}
+    rows_by_name = {row.player.name: row for row in medal_service.build_medallero_rows()}
 
     assert "Top 3 eficacia" in medal_names(rows_by_name["Efficiency 100"])
     assert "Top 3 eficacia" in medal_names(rows_by_name["Efficiency 90"])
@@ -218,26 +244,26 @@ def test_medal_service_includes_pair_medals_in_individual_rows(monkeypatch):
     patch_rankings(monkeypatch, {"all": players})
 
     monkeypatch.setattr(
-        medal_service,
+        ranking_service,
         "build_pairs_ranking_sections",
         lambda group=None: {
             "top_pairs": [
-                {"player1": players[0], "player2": players[1]},
-                {"player1": players[2], "player2": players[3]},
-                {"player1": players[4], "player2": players[5]},
-                {"player1": players[6], "player2": players[0]},
-                {"player1": players[1], "player2": players[2]},
+                pair_row(players[0], players[1]),
+                pair_row(players[2], players[3]),
+                pair_row(players[4], players[5]),
+                pair_row(players[6], players[0]),
+                pair_row(players[1], players[2]),
             ],
             "pairs_of_the_century": [
-                {"player1": players[0], "player2": players[1]},
+                pair_row(players[0], players[1]),
             ],
             "catastrophic_pairs": [
-                {"player1": players[2], "player2": players[3]},
+                pair_row(players[2], players[3]),
             ],
         },
     )
 
-    rows_by_name = {row["player"].name: row for row in medal_service.build_medallero_rows()}
+    rows_by_name = {row.player.name: row for row in medal_service.build_medallero_rows()}
 
     assert "pairs_first_place" in medal_keys(rows_by_name["Pair A"])
     assert "pairs_first_place" in medal_keys(rows_by_name["Pair B"])
@@ -252,43 +278,47 @@ def test_medal_service_includes_pair_medals_in_individual_rows(monkeypatch):
 
 
 def fake_medals():
-    medal = {
-        "key": "first_place",
-        "name": "Primer puesto",
-        "icon": "🥇",
-        "description": "Ocupa la primera posición de su ranking.",
-        "category": "position",
-        "order": 1,
-        "scope": "all",
-        "scope_label": "Todos",
-        "scope_css_class": "circular-progress-primary",
-        "progress_color_class": "circular-progress-primary",
-    }
-    return [medal]
-
-
-def fake_medallero_rows(group=None, medals=None):
+    medal = medal_service.Medal(
+        key="first_place",
+        name="Primer puesto",
+        icon="🥇",
+        description="Ocupa la primera posición de su ranking.",
+        category="position",
+        order=1,
+        scope="all",
+        scope_label="Todos",
+        scope_css_class="circular-progress-primary",
+        progress_color_class="circular-progress-primary",
+    )
+    return (medal,)
+
+
+def fake_medallero_rows(group=None, medals=None, ranking_context=None):
     player = ranked_player(1, "Medal Player", position=1, group=group)
-    medals = medals or fake_medals()
+    medals = tuple(medals or fake_medals())
     medal_rows = [medals[index:index + 3] for index in range(0, len(medals), 3)]
-    medal_rows[-1] = medal_rows[-1] + [None] * (3 - len(medal_rows[-1]))
+    medal_rows[-1] = medal_rows[-1] + (None,) * (3 - len(medal_rows[-1]))
     return [
-        {
-            "player": player,
-            "medals": medals,
-            "total_medals": len(medals),
-            "first_place_medals": 1,
-            "position_medals": len(medals),
-            "performance_medals": 0,
-            "medal_rows": medal_rows,
-        }
+        medal_service.MedalRow(
+            player=player,
+            medals=medals,
+            total_medals=len(medals),
+            first_place_medals=1,
+            position_medals=len(medals),
+            performance_medals=0,
+            medal_rows=tuple(medal_rows),
+        )
     ]
 
 
 @pytest.mark.django_db
 def test_medallero_page_renders_publicly_with_metadata_and_empty_slots(client, monkeypatch):
     monkeypatch.setattr(ranking_views, "build_medallero_rows", fake_medallero_rows)
-    monkeypatch.setattr(ranking_views, "get_player_page_in_scope", lambda scope, player_id, page_size=12, *, group=None: 4)
+    monkeypatch.setattr(
+        ranking_views,
+        "get_player_page_in_scope",
+        lambda scope, player_id, page_size=12, *, group=None, ranking_context=None: 4,
+    )
 
     response = client.get(reverse("medallero"))
     content = response.content.decode("utf-8")
@@ -320,20 +350,36 @@ def test_medallero_page_renders_publicly_with_metadata_and_empty_slots(client, m
     assert content.count("medallero-empty-slot") == 2
 
 
+@pytest.mark.django_db
+def test_medallero_page_links_copies_of_the_cached_rows(client, monkeypatch):
+    cached_rows = fake_medallero_rows()
+    monkeypatch.setattr(ranking_views, "build_medallero_rows", lambda group=None, ranking_context=None: cached_rows)
+    monkeypatch.setattr(
+        ranking_views,
+        "get_player_page_in_scope",
+        lambda scope, player_id, page_size=12, *, group=None, ranking_context=None: 4,
+    )
+
+    response = client.get(reverse("medallero"))
+
+    rendered_row = response.context["medallero_rows"][0]
+    assert rendered_row.medals[0].href == rendered_row.medal_rows[0][0].href == "/?page=4#top"
+    assert cached_rows[0].medals[0].href is None
+    with pytest.raises(FrozenInstanceError):
+        cached_rows[0].medals[0].href = "/"
+
+
 @pytest.mark.django_db
 def test_medallero_summary_icon_strip_renders_every_player_medal(client, monkeypatch):
-    medals = []
-    for index, icon in enumerate(["🥇", "🥈", "🥉", "🏅"], start=1):
-        medal = fake_medals()[0].copy()
-        medal["key"] = f"medal_{index}"
-        medal["name"] = f"Medalla {index}"
-        medal["icon"] = icon
-        medals.append(medal)
+    medals = [
+        replace(fake_medals()[0], key=f"medal_{index}", name=f"Medalla {index}", icon=icon)
+        for index, icon in enumerate(["🥇", "🥈", "🥉", "🏅"], start=1)
+    ]
 
     monkeypatch.setattr(
         ranking_views,
         "build_medallero_rows",
-        lambda group=None: fake_medallero_rows(group=group, medals=medals),
+        lambda group=None, ranking_context=None: fake_medallero_rows(group=group, medals=medals),
     )
 
     response = client.get(reverse("medallero"))
@@ -390,7 +436,7 @@ def test_medallero_uses_aggregate_for_anonymous_and_user_group_for_linked_user(c
     calls = []
     aggregate_row_group = Group.objects.create(name="Aggregate Row Group")
 
-    def fake_build_medallero_rows(*, group=None):
+    def fake_build_medallero_rows(*, group=None, ranking_context=None):
         calls.append(group)
         row_group = aggregate_row_group if group is None else group
         return fake_medallero_rows(group=row_group)
@@ -412,3 +458,44 @@ def test_medallero_uses_aggregate_for_anonymous_and_user_group_for_linked_user(c
     linked_response = client.get(reverse("medallero"))
     assert linked_response.status_code == 200
     assert calls[-1] == group
+
+
+@pytest.mark.django_db
+def test_medallero_page_computes_each_ranking_once_per_request(client, monkeypatch):
+    from datetime import date
+
+    from games.models import Match
+
+    players = [Player.objects.create(name=f"Medal {index:02d}", gender=Player.GENDER_MALE) for index in range(8)]
+    for index in range(0, len(players), 4):
+        Match.objects.create(
+            team1_player1=players[index],
+            team1_player2=players[index + 1],
+            team2_player1=players[index + 2],
+            team2_player2=players[index + 3],
+            winning_team=1,
+            date_played=date.today(),
+        )
+
+    ranking_calls = []
+    pairs_calls = []
+    compute_rankings_for_scopes = ranking_service.compute_rankings_for_scopes
+    build_pairs_ranking_sections = ranking_service.build_pairs_ranking_sections
+
+    def counting_compute_rankings_for_scopes(scopes, *, group=None):
+        ranking_calls.append(tuple(scopes))
+        return compute_rankings_for_scopes(scopes, group=group)
+
+    def counting_build_pairs_ranking_sections(*, group=None):
+        pairs_calls.append(group)
+        return build_pairs_ranking_sections(group=group)
+
+    monkeypatch.setattr(ranking_service, "compute_rankings_for_scopes", counting_compute_rankings_for_scopes)
+    monkeypatch.setattr(ranking_service, "build_pairs_ranking_sections", counting_build_pairs_ranking_sections)
+
+    response = client.get(reverse("medallero"))
+
+    assert response.status_code == 200
+    assert ranking_calls == [("all", "male", "female", "mixed")]
+    assert pairs_calls == [None]
+    assert 'href="/?page=1#top"' in response.content.decode("utf-8")
@@ -6,6 +6,8 @@ import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from frontend.services.medals import Medal, MedalRow
+from frontend.services import ranking as ranking_service
 from frontend.view_modules import players as player_views
 from games.models import Group, Match, Player
 
@@ -135,36 +137,43 @@ def test_player_detail_renders_medal_card_collapsed_and_collapsible(client, monk
     scoped_player.display_position = 3
     scoped_player.display_wins = 1
     scoped_player.display_matches = 2
-    medal = {
-        "key": "first_place",
-        "name": "Primer puesto",
-        "icon": "🥇",
-        "scope": "all",
-        "scope_label": "Todos",
-        "scope_css_class": "circular-progress-primary",
-    }
+    medal = Medal(
+        key="first_place",
+        name="Primer puesto",
+        icon="🥇",
+        description="",
+        category="position",
+        order=1,
+        scope="all",
+        scope_label="Todos",
+        scope_css_class="circular-progress-primary",
+        progress_color_class="circular-progress-primary",
+    )
 
     monkeypatch.setattr(
         player_views,
         "build_player_medallero_row",
-        lambda selected_player, *, group=None: {
-            "player": selected_player,
-            "medals": [medal],
-            "total_medals": 1,
-            "medal_rows": [[medal, None, None]],
-        },
+        lambda selected_player, *, group=None, ranking_context=None: MedalRow(
+            player=selected_player,
+            medals=(medal,),
+            total_medals=1,
+            first_place_medals=0,
+            position_medals=0,
+            performance_medals=0,
+            medal_rows=((medal, None, None),),
+        ),
     )
     monkeypatch.setattr(
         player_views,
         "_get_scoped_player_page_and_total",
-        lambda scope, player_id, page_size=12, *, group=None, ranking_results=None: (scoped_player, 3, 10),
+        lambda scope, player_id, page_size=12, *, group=None, ranking_context=None: (scoped_player, 3, 10),
     )
 
     response = client.get(reverse("player_detail", args=[player.id]))
     content = response.content.decode("utf-8")
 
     assert response.status_code == 200
-    assert response.context["profile_medal_row"]["total_medals"] == 1
+    assert response.context["profile_medal_row"].total_medals == 1
     assert '<h4 class="mb-0">Estadísticas</h4>' in content
     assert 'href="/?page=3#top"' in content
     assert "medallero-medal-card circular-progress-primary" in content
@@ -174,31 +183,38 @@ def test_player_detail_renders_medal_card_collapsed_and_collapsible(client, monk
 
 def test_player_detail_links_pair_medals_to_pairs_ranking(client, monkeypatch):
     player = Player.objects.create(name="Jugador Parejas", gender=Player.GENDER_MALE)
-    medal = {
-        "key": "pairs_first_place",
-        "name": "Primer puesto",
-        "icon": "🥇",
-        "scope": "pairs",
-        "scope_label": "Parejas",
-        "scope_css_class": "circular-progress-danger",
-    }
+    medal = Medal(
+        key="pairs_first_place",
+        name="Primer puesto",
+        icon="🥇",
+        description="",
+        category="position",
+        order=1,
+        scope="pairs",
+        scope_label="Parejas",
+        scope_css_class="circular-progress-danger",
+        progress_color_class="circular-progress-danger",
+    )
 
     monkeypatch.setattr(
         player_views,
         "build_player_medallero_row",
-        lambda selected_player, *, group=None: {
-            "player": selected_player,
-            "medals": [medal],
-            "total_medals": 1,
-            "medal_rows": [[medal, None, None]],
-        },
+        lambda selected_player, *, group=None, ranking_context=None: MedalRow(
+            player=selected_player,
+            medals=(medal,),
+            total_medals=1,
+            first_place_medals=0,
+            position_medals=0,
+            performance_medals=0,
+            medal_rows=((medal, None, None),),
+        ),
     )
 
     response = client.get(reverse("player_detail", args=[player.id]))
     content = response.content.decode("utf-8")
 
     assert response.status_code == 200
-    assert response.context["profile_medal_row"]["medals"][0]["href"] == reverse("ranking_pairs")
+    assert response.context["profile_medal_row"].medals[0].href == reverse("ranking_pairs")
     assert f'href="{reverse("ranking_pairs")}"' in content
 
 
@@ -207,7 +223,7 @@ def test_player_detail_renders_medal_empty_state(client, monkeypatch):
     monkeypatch.setattr(
         player_views,
         "build_player_medallero_row",
-        lambda selected_player, *, group=None: None,
+        lambda selected_player, *, group=None, ranking_context=None: None,
     )
 
     response = client.get(reverse("player_detail", args=[player.id]))
@@ -239,11 +255,11 @@ def test_player_detail_batches_scope_ranking_computation(client, monkeypatch):
             scoped_player.display_matches = 1
             scoped_player.display_win_rate = 0
             scoped_player.show_position = True
-            results[scope] = ([scoped_player], [], scope)
+            results[scope] = ranking_service.RankingResult([scoped_player], [], scope)
         return results
 
     monkeypatch.setattr(
-        player_views,
+        ranking_service,
         "compute_rankings_for_scopes",
         fake_compute_rankings_for_scopes,
     )
@@ -251,7 +267,8 @@ def test_player_detail_batches_scope_ranking_computation(client, monkeypatch):
     response = client.get(reverse("player_detail", args=[player.id]))
 
     assert response.status_code == 200
-    assert calls == [(("all", "male", "mixed"), player.group)]
+    # Profile cards and the medallero share one batched computation.
+    assert calls == [(("all", "male", "mixed", "female"), player.group)]
 
 
 def test_player_detail_anonymous_selector_shows_player_names_without_groups(client):
@@ -1910,3 +1927,63 @@ def test_player_detail_partner_card_names_use_single_line_ellipsis(client):
     assert "white-space: nowrap;" in css
     assert ".player-partner-metric-label {\n  margin-bottom: 0.125rem;" in css
     assert ".player-partner-cards {\n  margin-top: 0;\n}" in css
+
+
+def test_build_player_insights_reads_snapshot_without_scanning_match_history():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    player = Player.objects.create(name="Snapshot Veteran", gender=Player.GENDER_MALE)
+    partner = Player.objects.create(name="Snapshot Partner", gender=Player.GENDER_MALE)
+    rival_1 = Player.objects.create(name="Snapshot Rival 1", gender=Player.GENDER_MALE)
+    rival_2 = Player.objects.create(name="Snapshot Rival 2", gender=Player.GENDER_MALE)
+    for offset in range(6):
+        create_match(
+            player,
+            partner,
+            rival_1,
+            rival_2,
+            winning_team=1 if offset % 3 else 2,
+            played_on=date.today() - timedelta(days=offset),
+        )
+    expected = player_views.build_player_insights(player)
+
+    with CaptureQueriesContext(connection) as queries:
+        insights = player_views.build_player_insights(player)
+
+    assert insights == expected
+    assert not any('"games_match"' in query["sql"] for query in queries)
+    # Group data version (cached matrices), snapshot row, related players.
+    assert len(queries) == 3
+    assert insights["top_partners"][0]["matches_together"] == 6
+    assert insights["recent_form_chart"]["wins"] == 4
+
+
+def test_head_to_head_page_reads_group_matrices(client):
+    player = Player.objects.create(name="H2H Ana", gender=Player.GENDER_FEMALE)
+    other = Player.objects.create(name="H2H Bea", gender=Player.GENDER_FEMALE)
+    partner = Player.objects.create(name="H2H Carla", gender=Player.GENDER_FEMALE)
+    rival = Player.objects.create(name="H2H Dora", gender=Player.GENDER_FEMALE)
+    create_match(player, partner, other, rival, winning_team=1, played_on=date(2026, 3, 1))
+    create_match(player, partner, other, rival, winning_team=2, played_on=date(2026, 3, 2))
+    create_match(player, partner, other, rival, winning_team=1, played_on=date(2026, 3, 3))
+    create_match(player, other, partner, rival, winning_team=2, played_on=date(2026, 3, 4))
+
+    response = client.get(reverse("head_to_head"), {"player1": player.id, "player2": other.id})
+    summary = response.context["summary"]
+
+    assert response.status_code == 200
+    assert summary["matches_against"] == 3
+    assert (summary["player_wins"], summary["other_wins"]) == (2, 1)
+    assert summary["last_against"] == date(2026, 3, 3)
+    assert (summary["matches_together"], summary["wins_together"]) == (1, 0)
+    assert "Cara a cara" in response.content.decode("utf-8")
+
+
+def test_head_to_head_page_without_two_distinct_players_has_no_summary(client):
+    player = Player.objects.create(name="H2H Solo", gender=Player.GENDER_MALE)
+
+    response = client.get(reverse("head_to_head"), {"player1": player.id, "player2": "x"})
+
+    assert response.status_code == 200
+    assert response.context["summary"] is None
@@ -0,0 +1,144 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from django.urls import reverse
+
+from frontend.services import rank_index
+from frontend.services.ranking import compute_rankings_for_scopes
+from games.models import Match, Player, PlayerScopeStats
+
+
+pytestmark = pytest.mark.django_db
+SCOPES = ["all", "male", "female", "mixed"]
+
+
+def mk_match(p1, p2, p3, p4, winning_team, played_on):
+    return Match.objects.create(
+        team1_player1=p1,
+        team1_player2=p2,
+        team2_player1=p3,
+        team2_player2=p4,
+        winning_team=winning_team,
+        date_played=played_on,
+    )
+
+
+@pytest.fixture
+def history():
+    rng = random.Random(19)
+    players = [
+        Player.objects.create(name=f"R{idx:02d}", gender=Player.GENDER_MALE if idx % 3 else Player.GENDER_FEMALE)
+        for idx in range(12)
+    ]
+    for day in range(40):
+        mk_match(*rng.sample(players, 4), rng.choice([1, 2]), date(2026, 1, 1) + timedelta(days=day % 20))
+    return players
+
+
+def computed_positions(group):
+    return {
+        scope: {player.id: player.display_position for player in ranked}
+        for scope, (ranked, _, _) in compute_rankings_for_scopes(SCOPES, group=group).items()
+    }
+
+
+def index_positions(group):
+    return {
+        scope: {player_id: index.position_of(player_id) for player_id in index.rows}
+        for scope in SCOPES
+        for index in [rank_index.get_rank_index(scope, group=group)]
+    }
+
+
+def test_rank_index_positions_match_the_canonical_rankings(history):
+    group = history[0].group
+
+    assert index_positions(group) == computed_positions(group)
+    assert rank_index.get_rank_index("all", group=group).position_of(0) is None
+
+
+def test_rank_index_applies_appended_matches_in_place(history):
+    group = history[0].group
+    index = rank_index.get_rank_index("all", group=group)
+    rng = random.Random(7)
+
+    for day in range(5):
+        mk_match(*rng.sample(history, 4), rng.choice([1, 2]), date(2026, 2, 1) + timedelta(days=day))
+
+    assert rank_index.get_rank_index("all", group=group) is index
+    assert index.match_count == 45
+    assert index_positions(group) == computed_positions(group)
+
+
+def test_rank_index_is_rebuilt_after_a_history_rewrite(history):
+    group = history[0].group
+    index = rank_index.get_rank_index("all", group=group)
+
+    Match.objects.filter(group=group).order_by("pk").first().delete()
+
+    rebuilt = rank_index.get_rank_index("all", group=group)
+    assert rebuilt is not index
+    assert index_positions(group) == computed_positions(group)
+
+
+def test_what_if_matches_playing_the_match_for_real(history):
+    group = history[0].group
+    rng = random.Random(3)
+
+    for _ in range(6):
+        p1, p2, p3, p4 = rng.sample(history, 4)
+        winning_team = rng.choice([1, 2])
+        before = computed_positions(group)
+
+        what_if = rank_index.what_if_match((p1.id, p2.id), (p3.id, p4.id), winning_team, group=group)
+        match = mk_match(p1, p2, p3, p4, winning_team, date(2026, 3, 1))
+        after = computed_positions(group)
+
+        assert list(what_if) == PlayerScopeStats.scopes_for_match_gender_type(match.match_gender_type)
+        for scope, rows in what_if.items():
+            for row in rows:
+                assert row["before"] == before[scope].get(row["player_id"])
+                assert row["after"] == after[scope][row["player_id"]]
+
+
+def test_what_if_view_returns_position_changes_as_json(client, history):
+    p1, p2, p3, p4 = history[1], history[2], history[4], history[5]
+
+    response = client.get(
+        reverse("ranking_what_if"),
+        {"team1": f"{p1.id},{p2.id}", "team2": f"{p3.id},{p4.id}", "winner": "1"},
+    )
+
+    assert response.status_code == 200
+    scopes = response.json()["scopes"]
+    assert set(scopes) == {"all", "male"}
+    assert {row["player_id"] for row in scopes["all"]} == {p1.id, p2.id, p3.id, p4.id}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"team1": "1,2", "team2": "3", "winner": "1"},
+        {"team1": "1,2", "team2": "3,4", "winner": "3"},
+        {"team1": "1,x", "team2": "3,4", "winner": "1"},
+    ],
+)
+def test_what_if_view_rejects_malformed_queries(client, params):
+    response = client.get(reverse("ranking_what_if"), params)
+
+    assert response.status_code == 400
+
+
+def test_what_if_view_rejects_repeated_or_unknown_players(client, history):
+    repeated = client.get(
+        reverse("ranking_what_if"),
+        {"team1": f"{history[0].id},{history[1].id}", "team2": f"{history[0].id},{history[2].id}", "winner": "1"},
+    )
+    unknown = client.get(
+        reverse("ranking_what_if"),
+        {"team1": f"{history[0].id},{history[1].id}", "team2": f"{history[2].id},0", "winner": "2"},
+    )
+
+    assert repeated.status_code == 400
+    assert unknown.status_code == 400
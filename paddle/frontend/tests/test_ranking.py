@@ -3,8 +3,14 @@ from datetime import date, timedelta
 from django.urls import reverse
 from django.test import RequestFactory
 
-from games.models import Player, Match
-from frontend.services.ranking import build_pairs_ranking_sections, compute_ranking
+from games.models import Group, Player, Match
+from frontend.services.ranking import (
+    PairRow,
+    RankedPlayer,
+    RankingResult,
+    build_pairs_ranking_sections,
+    compute_ranking,
+)
 from frontend.views import get_ranking_redirect
 from frontend.views import get_player_page_in_scope
 from frontend.views import paginate_list
@@ -327,10 +333,59 @@ def test_pairs_ranking_sections_canonicalize_player_order_and_rank_by_wins():
     sections = build_pairs_ranking_sections()
     top_pair = sections["top_pairs"][0]
 
-    assert top_pair["player1"].id == a.id
-    assert top_pair["player2"].id == b.id
-    assert top_pair["wins"] == 3
-    assert top_pair["matches"] == 3
+    assert top_pair.player1.id == a.id
+    assert top_pair.player2.id == b.id
+    assert top_pair.wins == 3
+    assert top_pair.matches == 3
+
+
+def test_ranking_rows_are_compact_immutable_rows():
+    a = mk_player("A", "M")
+    b = mk_player("B", "M")
+    c = mk_player("C", "M")
+    d = mk_player("D", "M")
+    mk_match(a, b, c, d, winning_team=1, d=date.today())
+
+    ranked, _, _ = compute_ranking("all")
+    pair = build_pairs_ranking_sections()["top_pairs"][0]
+
+    assert all(isinstance(row, RankedPlayer) for row in ranked)
+    assert isinstance(pair, PairRow)
+    assert [(row.name, row.display_ordinal) for row in ranked[:2]] == [("A", 1), ("B", 2)]
+    for row, field in ((ranked[0], "display_wins"), (pair, "wins"), (pair.player1, "name")):
+        assert not hasattr(row, "__dict__")
+        with pytest.raises(AttributeError):
+            setattr(row, field, 0)
+
+
+def test_ranking_result_indexes_players_by_ordinal_page_and_neighbours():
+    import pickle
+
+    players = [mk_player(f"P{index:02d}", "M") for index in range(14)]
+    base = date.today() - timedelta(days=30)
+    # P00 wins most, P13 least: one extra win per index step.
+    for index in range(13):
+        for day in range(13 - index):
+            mk_match(players[index], players[13], players[12], players[11], winning_team=1, d=base + timedelta(days=day))
+
+    result = compute_ranking("all")
+    ranked, unranked, scope = result
+    last = ranked[-1]
+
+    assert isinstance(result, RankingResult)
+    assert scope == "all" and unranked == [] and result.total == len(ranked) == 14
+    assert result.ordinal_of(ranked[0].id) == 1
+    assert result.row_for(last.id) is last
+    assert result.page_of(ranked[0].id) == 1
+    assert result.page_of(last.id) == 2
+    assert result.neighbours(ranked[0].id) == (None, ranked[1])
+    assert result.neighbours(ranked[5].id) == (ranked[4], ranked[6])
+    assert result.neighbours(last.id) == (ranked[-2], None)
+    assert result.row_for(0) is None and result.page_of(0) is None and result.neighbours(0) == (None, None)
+
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored._ordinals is None
+    assert restored.ordinal_of(last.id) == 14
 
 
 def test_pairs_ranking_wins_tiebreak_prefers_better_rate_then_more_matches():
@@ -355,7 +410,7 @@ def test_pairs_ranking_wins_tiebreak_prefers_better_rate_then_more_matches():
     mk_match(c, d, e, f, winning_team=1, d=base + timedelta(days=6))
 
     sections = build_pairs_ranking_sections()
-    ordered_pairs = [(row["player1"].name, row["player2"].name) for row in sections["top_pairs"]]
+    ordered_pairs = [(row.player1.name, row.player2.name) for row in sections["top_pairs"]]
 
     assert ordered_pairs.index(("C", "D")) < ordered_pairs.index(("A", "B"))
 
@@ -393,13 +448,13 @@ def test_pairs_rate_sections_require_at_least_five_matches_and_use_requested_tie
 
     best_pair = sections["pairs_of_the_century"][0]
     worst_pair = sections["catastrophic_pairs"][0]
-    best_names = (best_pair["player1"].name, best_pair["player2"].name)
-    worst_names = (worst_pair["player1"].name, worst_pair["player2"].name)
+    best_names = (best_pair.player1.name, best_pair.player2.name)
+    worst_names = (worst_pair.player1.name, worst_pair.player2.name)
 
     assert best_names == ("A", "B")
     assert worst_names == ("E", "F")
-    assert all(row["matches"] >= 5 for row in sections["pairs_of_the_century"])
-    assert all(row["matches"] >= 5 for row in sections["catastrophic_pairs"])
+    assert all(row.matches >= 5 for row in sections["pairs_of_the_century"])
+    assert all(row.matches >= 5 for row in sections["catastrophic_pairs"])
     assert len(sections["top_pairs"]) <= 5
     assert len(sections["pairs_of_the_century"]) <= 3
     assert len(sections["catastrophic_pairs"]) <= 3
@@ -430,7 +485,7 @@ def test_pairs_of_the_century_tiebreak_prefers_more_wins_then_more_matches():
 
     sections = build_pairs_ranking_sections()
     ordered_pairs = [
-        (row["player1"].name, row["player2"].name)
+        (row.player1.name, row.player2.name)
         for row in sections["pairs_of_the_century"]
     ]
 
@@ -457,7 +512,7 @@ def test_catastrophic_pairs_tiebreak_prefers_more_losses_then_more_matches():
 
     sections = build_pairs_ranking_sections()
     ordered_pairs = [
-        (row["player1"].name, row["player2"].name)
+        (row.player1.name, row.player2.name)
         for row in sections["catastrophic_pairs"]
     ]
 
@@ -489,12 +544,12 @@ def test_top_pairs_use_competition_style_positions_for_ties():
     sections = build_pairs_ranking_sections()
     top_pairs = sections["top_pairs"]
 
-    assert top_pairs[0]["display_position"] == 1
-    assert top_pairs[0]["show_position"] is True
-    assert top_pairs[1]["display_position"] == 1
-    assert top_pairs[1]["show_position"] is False
-    assert top_pairs[2]["display_position"] == 3
-    assert top_pairs[2]["show_position"] is True
+    assert top_pairs[0].display_position == 1
+    assert top_pairs[0].show_position is True
+    assert top_pairs[1].display_position == 1
+    assert top_pairs[1].show_position is False
+    assert top_pairs[2].display_position == 3
+    assert top_pairs[2].show_position is True
 
 
 def test_best_pair_section_uses_competition_style_positions_for_ties():
@@ -516,9 +571,9 @@ def test_best_pair_section_uses_competition_style_positions_for_ties():
     sections = build_pairs_ranking_sections()
     best_pairs = sections["pairs_of_the_century"]
 
-    assert best_pairs[0]["display_position"] == 1
-    assert best_pairs[1]["display_position"] == 1
-    assert best_pairs[1]["show_position"] is False
+    assert best_pairs[0].display_position == 1
+    assert best_pairs[1].display_position == 1
+    assert best_pairs[1].show_position is False
 
 
 def test_worst_pair_section_uses_competition_style_positions_for_ties():
@@ -540,6 +595,299 @@ def test_worst_pair_section_uses_competition_style_positions_for_ties():
     sections = build_pairs_ranking_sections()
     worst_pairs = sections["catastrophic_pairs"]
 
-    assert worst_pairs[0]["display_position"] == 1
-    assert worst_pairs[1]["display_position"] == 1
-    assert worst_pairs[1]["show_position"] is False
+    assert worst_pairs[0].display_position == 1
+    assert worst_pairs[1].display_position == 1
+    assert worst_pairs[1].show_position is False
+
+
+def test_compute_rankings_reads_materialized_stats_without_scanning_matches(settings):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    settings.RANKING_ENGINE = "stats"
+
+    from frontend.services.ranking import compute_rankings_for_scopes
+
+    a = mk_player("A", "M")
+    b = mk_player("B", "M")
+    c = mk_player("C", "F")
+    d = mk_player("D", "F")
+    mk_match(a, b, c, d, winning_team=1, d=date.today())
+
+    with CaptureQueriesContext(connection) as queries:
+        results = compute_rankings_for_scopes(["all", "male", "mixed"])
+
+    assert not any('"games_match"' in query["sql"] for query in queries.captured_queries)
+    assert [player.id for player in results["all"][0]][:2] == [a.id, b.id]
+    assert [player.id for player in results["mixed"][0]][:2] == [a.id, b.id]
+    assert results["male"][0] == []
+
+
+def test_persisted_scope_positions_match_computed_rankings_for_every_scope():
+    from games.models import PlayerScopeStats
+
+    a = mk_player("A", "M")
+    b = mk_player("B", "M")
+    c = mk_player("C", "M")
+    d = mk_player("D", "M")
+    e = mk_player("E", "F")
+    f = mk_player("F", "F")
+    base = date.today() - timedelta(days=10)
+
+    mk_match(a, b, c, d, winning_team=1, d=base)
+    mk_match(c, d, a, b, winning_team=1, d=base + timedelta(days=1))
+    mk_match(a, e, b, f, winning_team=2, d=base + timedelta(days=2))
+    mk_match(c, a, d, b, winning_team=1, d=base + timedelta(days=3))
+
+    for scope in ("all", "male", "female", "mixed"):
+        ranked, _, _ = compute_ranking(scope, group=a.group)
+        persisted = list(
+            PlayerScopeStats.objects.filter(group=a.group, scope=scope, position__gt=0)
+            .order_by("ordinal")
+            .values_list("player_id", "position", "ordinal")
+        )
+        assert persisted == [
+            (player.id, player.display_position, ordinal)
+            for ordinal, player in enumerate(ranked, start=1)
+        ]
+
+
+def test_player_gender_change_moves_player_between_persisted_gender_rankings():
+    from games.models import PlayerScopeStats
+
+    a = mk_player("A", "M")
+    b = mk_player("B", "M")
+    c = mk_player("C", "M")
+    d = mk_player("D", "M")
+    mk_match(a, b, c, d, winning_team=1, d=date.today())
+
+    a.gender = Player.GENDER_FEMALE
+    a.save()
+
+    male_rows = PlayerScopeStats.objects.get(player=a, scope="male")
+    assert male_rows.position == 0
+    male_ranked, _, _ = compute_ranking("male", group=a.group)
+    assert [player.id for player in male_ranked] == [b.id, c.id, d.id]
+    assert list(
+        PlayerScopeStats.objects.filter(scope="male", position__gt=0)
+        .order_by("ordinal")
+        .values_list("player_id", "position")
+    ) == [(b.id, 1), (c.id, 2), (d.id, 2)]
+
+
+def test_group_ranking_page_query_count_is_bounded_by_page_size(client):
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    user = get_user_model().objects.create_user(username="viewer", password="pass")
+    viewer = Player.objects.create(name="viewer", gender="M", registered_user=user)
+    client.login(username="viewer", password="pass")
+
+    def ranking_page_queries(player_count):
+        players = [mk_player(f"Bulk{player_count}_{idx:03d}", "M") for idx in range(player_count)]
+        for idx in range(0, player_count - 2, 3):
+            mk_match(viewer, players[idx], players[idx + 1], players[idx + 2], 1, date.today())
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("hall_of_fame"), {"page": 2})
+        assert response.status_code == 200
+        return len(queries)
+
+    assert ranking_page_queries(60) <= ranking_page_queries(15)
+
+
+def test_sql_ranking_engine_matches_stats_engine_on_random_history():
+    import random
+
+    from django.test import override_settings
+
+    from frontend.services.ranking import _build_pair_rows, compute_rankings_for_scopes
+    from games.models import PlayerScopeStats, update_player_rankings
+
+    rng = random.Random(4)
+    players = [mk_player(f"P{idx:02d}", "M" if idx % 3 else "F") for idx in range(14)]
+    for day in range(60):
+        p1, p2, p3, p4 = rng.sample(players, 4)
+        mk_match(p1, p2, p3, p4, rng.choice([1, 2]), date.today() - timedelta(days=day))
+    group = players[0].group
+    scopes = ["all", "male", "female", "mixed"]
+
+    def snapshot():
+        results = compute_rankings_for_scopes(scopes, group=group)
+        return {
+            scope: (
+                [
+                    (p.id, p.display_position, p.show_position, p.display_wins, p.display_matches)
+                    for p in ranked
+                ],
+                [p.id for p in unranked],
+            )
+            for scope, (ranked, unranked, _) in results.items()
+        }, sorted(
+            (row.player1.id, row.player2.id, row.wins, row.matches)
+            for row in _build_pair_rows(group=group)
+        )
+
+    def persisted():
+        return sorted(
+            PlayerScopeStats.objects.filter(group=group).values_list(
+                "scope", "player_id", "wins", "matches", "position", "ordinal"
+            )
+        )
+
+    stats_snapshot = snapshot()
+    stats_persisted = persisted()
+    with override_settings(RANKING_ENGINE="sql"):
+        assert snapshot() == stats_snapshot
+        PlayerScopeStats.objects.filter(group=group).update(wins=0, matches=0, losses=0)
+        update_player_rankings(group=group)
+        assert persisted() == stats_persisted
+
+
+def test_head_to_head_matrices_cover_groups_and_the_aggregate_context():
+    from frontend.services.head_to_head import build_head_to_head
+
+    other_group = Group.objects.create(name="Matrix Club")
+    a, b, c, d = (mk_player(name, "M") for name in ("MA", "MB", "MC", "MD"))
+    e, f, g, h = (
+        Player.objects.create(name=name, gender="M", group=other_group) for name in ("ME", "MF", "MG", "MH")
+    )
+    mk_match(a, b, c, d, 1, date(2026, 3, 1))
+    mk_match(a, c, b, d, 2, date(2026, 3, 2))
+    Match.objects.create(
+        group=other_group, team1_player1=e, team1_player2=f, team2_player1=g, team2_player2=h,
+        winning_team=1, date_played=date(2026, 3, 3),
+    )
+
+    group_matrices = build_head_to_head(group=a.group)
+    assert group_matrices.matches_together(a.id, b.id) == 1
+    assert group_matrices.wins_together(b.id, a.id) == 1
+    assert group_matrices.matches_against(a.id, d.id) == 2
+    assert group_matrices.wins_against(a.id, d.id) == 1
+    assert group_matrices.wins_against(d.id, a.id) == 1
+    assert (group_matrices.matches_against(a.id, b.id), group_matrices.wins_against(b.id, a.id)) == (1, 1)
+    assert group_matrices.last_against(a.id, d.id) == date(2026, 3, 2)
+    assert group_matrices.matches_together(e.id, f.id) == 0
+
+    aggregate = build_head_to_head()
+    assert aggregate.matches_together(e.id, f.id) == 1
+    assert aggregate.wins_against(e.id, g.id) == 1
+    assert aggregate.partners_of(a.id) == group_matrices.partners_of(a.id)
+
+
+def test_ranking_cache_serves_unchanged_groups_and_invalidates_only_the_changed_group():
+    from unittest import mock
+
+    from games.models import Group
+    from frontend.services import ranking as ranking_service
+
+    group_a = Group.objects.create(name="Cache A")
+    group_b = Group.objects.create(name="Cache B")
+    players_a = [Player.objects.create(name=f"CA{idx}", gender="M", group=group_a) for idx in range(4)]
+    players_b = [Player.objects.create(name=f"CB{idx}", gender="M", group=group_b) for idx in range(4)]
+    Match.objects.create(
+        group=group_a,
+        team1_player1=players_a[0], team1_player2=players_a[1],
+        team2_player1=players_a[2], team2_player2=players_a[3],
+        winning_team=1, date_played=date.today(),
+    )
+    Match.objects.create(
+        group=group_b,
+        team1_player1=players_b[0], team1_player2=players_b[1],
+        team2_player1=players_b[2], team2_player2=players_b[3],
+        winning_team=1, date_played=date.today(),
+    )
+
+    with mock.patch.object(
+        ranking_service,
+        "_compute_rankings_for_scopes",
+        wraps=ranking_service._compute_rankings_for_scopes,
+    ) as compute:
+        compute_ranking("all", group=group_a)
+        compute_ranking("all", group=group_b)
+        assert compute.call_count == 2
+
+        cached_a, _, _ = compute_ranking("all", group=group_a)
+        compute_ranking("all", group=group_b)
+        assert compute.call_count == 2
+        assert [player.id for player in cached_a[:2]] == [players_a[0].id, players_a[1].id]
+
+        Match.objects.create(
+            group=group_a,
+            team1_player1=players_a[2], team1_player2=players_a[3],
+            team2_player1=players_a[0], team2_player2=players_a[1],
+            winning_team=1, date_played=date.today() - timedelta(days=1),
+        )
+        compute_ranking("all", group=group_b)
+        assert compute.call_count == 2
+        refreshed_a, _, _ = compute_ranking("all", group=group_a)
+        assert compute.call_count == 3
+        assert all(player.display_matches == 2 for player in refreshed_a)
+
+        players_b[0].name = "CB renamed"
+        players_b[0].save()
+        renamed_b, _, _ = compute_ranking("all", group=group_b)
+        assert compute.call_count == 4
+        assert "CB renamed" in [player.name for player in renamed_b]
+
+
+def test_public_ranking_pages_answer_304_until_group_data_changes(client, monkeypatch):
+    from frontend.services import ranking as ranking_service
+
+    a = mk_player("A", "M")
+    b = mk_player("B", "M")
+    c = mk_player("C", "M")
+    d = mk_player("D", "M")
+    mk_match(a, b, c, d, winning_team=1, d=date.today())
+
+    urls = [
+        reverse("hall_of_fame"),
+        reverse("ranking_male"),
+        reverse("ranking_pairs"),
+        reverse("medallero"),
+        reverse("player_detail", args=[a.id]),
+    ]
+    first_responses = {url: client.get(url) for url in urls}
+    for url, response in first_responses.items():
+        assert response.status_code == 200
+        assert response.has_header("ETag"), url
+        assert response.has_header("Last-Modified"), url
+
+    def fail_compute(*args, **kwargs):
+        raise AssertionError("304 responses must not run ranking code")
+
+    monkeypatch.setattr(ranking_service, "_compute_rankings_for_scopes", fail_compute)
+    monkeypatch.setattr(ranking_service, "_build_pairs_ranking_sections", fail_compute)
+    for url, response in first_responses.items():
+        revalidated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert revalidated.status_code == 304, url
+        assert revalidated.content == b""
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code == 304, url
+    monkeypatch.undo()
+
+    mk_match(c, d, a, b, winning_team=1, d=date.today() - timedelta(days=1))
+    for url, response in first_responses.items():
+        assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 200, url
+
+
+def test_ranking_page_etag_changes_with_the_new_match_badge(client):
+    from django.contrib.auth import get_user_model
+
+    user = get_user_model().objects.create_user(username="badge", password="pass")
+    viewer = Player.objects.create(name="Badge Viewer", gender="M", registered_user=user)
+    others = [mk_player(f"Badge {idx}", "M") for idx in range(3)]
+    mk_match(viewer, others[0], others[1], others[2], winning_team=1, d=date.today())
+    client.login(username="badge", password="pass")
+
+    first = client.get(reverse("hall_of_fame"))
+    assert first.context["new_matches_number"] == 1
+    assert not first.has_header("Last-Modified")
+    assert client.get(reverse("hall_of_fame"), HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+    # Visiting the matches page marks the match as seen: same data, new badge.
+    client.get(reverse("match"))
+    response = client.get(reverse("hall_of_fame"), HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 200
+    assert response.context["new_matches_number"] == 0
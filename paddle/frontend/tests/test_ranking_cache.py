@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from frontend.services import ranking_cache
+from games.models import CacheLock
+
+
+@pytest.fixture
+def version(monkeypatch):
+    # Threads cannot share the in-memory test DB, so the data version is faked.
+    current = {"value": "1"}
+    monkeypatch.setattr(ranking_cache, "ranking_data_version", lambda group: current["value"])
+    return current
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def slow_compute(calls, value, delay=0.2):
+    def compute():
+        calls.append(value)
+        time.sleep(delay)
+        return value
+
+    return compute
+
+
+def test_concurrent_misses_compute_the_same_key_once(settings, version):
+    settings.RANKING_CACHE_SERVE_STALE = False
+    calls = []
+
+    results = run_concurrently(
+        6,
+        lambda: ranking_cache.cached_ranking_value("test", None, slow_compute(calls, "fresh")),
+    )
+
+    assert calls == ["fresh"]
+    assert results == ["fresh"] * 6
+
+
+def test_concurrent_misses_serve_previous_version_while_one_thread_recomputes(settings, version):
+    settings.RANKING_CACHE_SERVE_STALE = True
+    assert ranking_cache.cached_ranking_value("test", None, lambda: "v1") == "v1"
+
+    version["value"] = "2"
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append("v2")
+        started.set()
+        time.sleep(0.3)
+        return "v2"
+
+    owner = threading.Thread(target=lambda: ranking_cache.cached_ranking_value("test", None, compute))
+    owner.start()
+    started.wait(timeout=2)
+
+    stale_results = run_concurrently(
+        4,
+        lambda: ranking_cache.cached_ranking_value("test", None, slow_compute(calls, "duplicate")),
+    )
+    owner.join()
+
+    assert stale_results == ["v1"] * 4
+    assert calls == ["v2"]
+    assert ranking_cache.cached_ranking_value("test", None, lambda: "unused") == "v2"
+
+
+def test_waiting_thread_falls_back_to_computing_when_lock_owner_is_too_slow(settings, version):
+    settings.RANKING_CACHE_SERVE_STALE = False
+    settings.RANKING_CACHE_LOCK_WAIT = 0.1
+    key = ranking_cache.ranking_cache_key("test", None, "1", "")
+    cache.add(f"{key}:lock", "other-process", timeout=30)
+
+    calls = []
+    assert ranking_cache.cached_ranking_value("test", None, slow_compute(calls, "fallback", delay=0)) == "fallback"
+    assert calls == ["fallback"]
+
+
+def test_single_flight_can_be_disabled(settings, version):
+    settings.RANKING_CACHE_SINGLE_FLIGHT = False
+    calls = []
+
+    results = run_concurrently(
+        3,
+        lambda: ranking_cache.cached_ranking_value("test", None, slow_compute(calls, "fresh")),
+    )
+
+    assert len(calls) == 3
+    assert results == ["fresh"] * 3
+
+
+@pytest.mark.django_db
+def test_cache_lock_rows_are_exclusive_until_released_or_expired():
+    assert CacheLock.acquire("ranking:test:lock", "a", 30)
+    assert not CacheLock.acquire("ranking:test:lock", "b", 30)
+
+    CacheLock.release("ranking:test:lock", "b")
+    assert not CacheLock.acquire("ranking:test:lock", "b", 30)
+    CacheLock.release("ranking:test:lock", "a")
+    assert CacheLock.acquire("ranking:test:lock", "b", -1)
+    # The crashed owner's lock has expired.
+    assert CacheLock.acquire("ranking:test:lock", "c", 30)
+    assert CacheLock.objects.get().token == "c"
+
+
+@pytest.mark.django_db
+def test_file_based_cache_locks_single_flight_in_the_database(settings, version, tmp_path, monkeypatch):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}
+    }
+    settings.RANKING_CACHE_SERVE_STALE = False
+    acquired = []
+    acquire = CacheLock.acquire.__func__
+    monkeypatch.setattr(
+        CacheLock, "acquire", classmethod(lambda cls, key, *args: acquired.append(key) or acquire(cls, key, *args))
+    )
+
+    assert ranking_cache.cached_ranking_value("test", None, lambda: "fresh") == "fresh"
+
+    assert acquired == [ranking_cache.ranking_cache_key("test", None, "1", "") + ":lock"]
+    assert not CacheLock.objects.exists()
+    assert ranking_cache.cached_ranking_value("test", None, lambda: "unused") == "fresh"
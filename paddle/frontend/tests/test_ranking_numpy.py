@@ -0,0 +1,113 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from frontend.services import ranking_numpy
+from frontend.services.match_store import get_match_store
+from frontend.services.ranking import _build_pair_rows, compute_rankings_for_scopes
+from games.models import Group, Match, Player
+
+
+pytestmark = pytest.mark.django_db
+SCOPES = ["all", "male", "female", "mixed"]
+
+
+def build_random_history(seed, *, player_count=16, match_count=80):
+    rng = random.Random(seed)
+    group = Group.objects.create(name=f"Numpy {seed}")
+    players = [
+        Player.objects.create(
+            name=f"N{seed}-{idx:02d}",
+            gender=rng.choice([Player.GENDER_MALE, Player.GENDER_FEMALE, None]),
+            group=group,
+        )
+        for idx in range(player_count)
+    ]
+    for day in range(match_count):
+        team1_player1, team1_player2, team2_player1, team2_player2 = rng.sample(players, 4)
+        Match.objects.create(
+            group=group,
+            team1_player1=team1_player1,
+            team1_player2=team1_player2,
+            team2_player1=team2_player1,
+            team2_player2=team2_player2,
+            # Few distinct outcomes per player so ties are common.
+            winning_team=rng.choice([1, 2]),
+            date_played=date(2026, 1, 1) + timedelta(days=day % 30),
+        )
+    return group
+
+
+def ranking_snapshot(group):
+    return {
+        scope: (
+            [
+                (p.id, p.display_position, p.show_position, p.display_wins, p.display_matches)
+                for p in ranked
+            ],
+            [p.id for p in unranked],
+        )
+        for scope, (ranked, unranked, _) in compute_rankings_for_scopes(SCOPES, group=group).items()
+    }
+
+
+def pairs_snapshot(group):
+    return sorted(
+        (row.player1.id, row.player2.id, row.wins, row.matches)
+        for row in _build_pair_rows(group=group)
+    )
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "fallback"])
+def numpy_engine(request, settings, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ranking_numpy, "np", None)
+    settings.RANKING_ENGINE = "numpy"
+    return settings
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_numpy_engine_matches_the_stats_engine_on_random_histories(seed, numpy_engine):
+    group = build_random_history(seed)
+
+    numpy_engine.RANKING_ENGINE = "stats"
+    expected_rankings, expected_pairs = ranking_snapshot(group), pairs_snapshot(group)
+    numpy_engine.RANKING_ENGINE = "numpy"
+
+    assert ranking_snapshot(group) == expected_rankings
+    assert pairs_snapshot(group) == expected_pairs
+
+
+def test_numpy_engine_matches_the_stats_engine_in_the_aggregate_context(numpy_engine):
+    build_random_history(5, match_count=30)
+    build_random_history(6, match_count=30)
+
+    numpy_engine.RANKING_ENGINE = "stats"
+    expected_rankings, expected_pairs = ranking_snapshot(None), pairs_snapshot(None)
+    numpy_engine.RANKING_ENGINE = "numpy"
+
+    assert ranking_snapshot(None) == expected_rankings
+    assert pairs_snapshot(None) == expected_pairs
+
+
+def test_numpy_aggregations_match_the_python_store_paths():
+    pytest.importorskip("numpy")
+    group = build_random_history(7)
+    store = get_match_store(group)
+
+    assert ranking_numpy.scope_stats(store) == store.scope_stats()
+    assert ranking_numpy.pair_stats(store) == store.pair_stats()
+
+
+def test_benchmark_command_reports_both_paths():
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    out = StringIO()
+    call_command("benchmark_rankings", matches=2_000, players=50, repeat=1, stdout=out)
+
+    assert "python:" in out.getvalue()
@@ -1,8 +1,10 @@
 import pytest
 from django.contrib.auth import get_user_model
 from datetime import date, timedelta
+from unittest.mock import patch
 
-from django.db import connection
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
 from django.test import Client
 from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
@@ -357,6 +359,91 @@ class TestFrontendViews:
         messages = list(response.context["messages"])
         assert any("error" in str(m).lower() for m in messages)
 
+    def test_match_view_post_absorbs_repeated_submits_with_the_same_idempotency_key(self):
+        self.client.login(username="testuser", password="testpass")
+        url = reverse("match")
+        p2 = Player.objects.create(name="retry_p2", ranking_position=2)
+        p3 = Player.objects.create(name="retry_p3", ranking_position=3)
+        p4 = Player.objects.create(name="retry_p4", ranking_position=4)
+        match_data = {
+            "team1_player2_choice": str(p2.id),
+            "team2_player1_choice": str(p3.id),
+            "team2_player2_choice": str(p4.id),
+            "winning_team": "1",
+            "date_played": date.today().isoformat(),
+            "idempotency_key": "retry-key",
+        }
+
+        first = self.client.post(url, match_data, follow=True)
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.post(url, match_data, follow=True)
+
+        assert Match.objects.filter(idempotency_key="retry-key").count() == 1
+        assert not any(query["sql"].startswith('INSERT INTO "games_match"') for query in ctx.captured_queries)
+        for response in (first, second):
+            assert any("Partido creado correctamente" in str(m) for m in response.context["messages"])
+
+    def test_match_view_post_rejects_the_same_teams_in_any_order(self):
+        self.client.login(username="testuser", password="testpass")
+        url = reverse("match")
+        p2 = Player.objects.create(name="swap_p2", ranking_position=2)
+        p3 = Player.objects.create(name="swap_p3", ranking_position=3)
+        p4 = Player.objects.create(name="swap_p4", ranking_position=4)
+        Match.objects.create(
+            team1_player1=p4,
+            team1_player2=p3,
+            team2_player1=p2,
+            team2_player2=self.player,
+            winning_team=1,
+            date_played=date.today(),
+        )
+
+        response = self.client.post(
+            url,
+            {
+                "team1_player2_choice": str(p2.id),
+                "team2_player1_choice": str(p3.id),
+                "team2_player2_choice": str(p4.id),
+                "winning_team": "1",
+                "date_played": date.today().isoformat(),
+            },
+            follow=True,
+        )
+
+        assert any("ya se había creado" in str(m) for m in response.context["messages"])
+        assert Match.objects.filter(team1_player1=p4).count() == 1
+        assert not Match.objects.filter(team1_player1=self.player, team1_player2=p2).exists()
+
+    def test_match_view_post_reports_other_match_errors_as_they_are(self):
+        self.client.login(username="testuser", password="testpass")
+        url = reverse("match")
+        p2 = Player.objects.create(name="err_p2", ranking_position=2)
+        p3 = Player.objects.create(name="err_p3", ranking_position=3)
+        p4 = Player.objects.create(name="err_p4", ranking_position=4)
+        match_data = {
+            "team1_player2_choice": str(p2.id),
+            "team2_player1_choice": str(p3.id),
+            "team2_player2_choice": str(p4.id),
+            "winning_team": "1",
+            "date_played": date.today().isoformat(),
+        }
+
+        def invalid(match):
+            raise ValidationError("El grupo del partido no coincide con el grupo de sus jugadores.")
+
+        with patch.object(Match, "clean", invalid):
+            response = self.client.post(url, match_data, follow=True)
+        shown = [str(m) for m in response.context["messages"]]
+        assert "El grupo del partido no coincide con el grupo de sus jugadores." in shown
+        assert not any("ya se había creado" in message for message in shown)
+
+        def broken(match, *args, **kwargs):
+            raise IntegrityError("NOT NULL constraint failed")
+
+        with patch.object(Match, "save", broken), pytest.raises(IntegrityError):
+            self.client.post(url, match_data)
+        assert not Match.objects.filter(team1_player2=p2).exists()
+
     def test_match_view_post_rejects_date_older_than_30_days(self):
         self.client.login(username="testuser", password="testpass")
         url = reverse("match")
@@ -446,39 +533,55 @@ class TestFrontendViews:
         request.user = User.objects.create_user(username="no_player", password="pass")
         assert views.get_new_match_ids(request) == []
 
-    def test_get_new_match_ids_uses_id_queryset(self, monkeypatch):
-        class FakeMatchQueryset:
-            def __init__(self):
-                self.excluded = None
+    def test_get_new_match_ids_uses_last_seen_watermark(self):
+        newer_match = Match.objects.create(
+            team1_player1=self.player,
+            team1_player2=self.other_player,
+            team2_player1=self.other_player,
+            team2_player2=self.player,
+            winning_team=2,
+            date_played=date.today() - timedelta(days=1),
+        )
+        Player.objects.filter(pk=self.player.pk).update(last_seen_match_id=self.match.id)
 
-            def exclude(self, **kwargs):
-                self.excluded = kwargs
-                return self
+        self.client.login(username="testuser", password="testpass")
+        request = self.client.get(reverse("hall_of_fame")).wsgi_request
 
-            def values_list(self, *args, **kwargs):
-                assert args == ("id",)
-                assert kwargs == {"flat": True}
-                return [self.match_id]
+        assert views.get_new_match_ids(request) == [newer_match.id]
+        with CaptureQueriesContext(connection) as queries:
+            assert views.count_new_matches(request) == 1
+        assert len(queries) == 1
+        assert "COUNT" in queries[0]["sql"].upper()
 
-            def __iter__(self):
-                raise AssertionError("get_new_match_ids should not load full Match objects")
+    def test_get_new_match_ids_folds_legacy_session_list_into_watermark(self):
+        self.client.login(username="testuser", password="testpass")
+        session = self.client.session
+        session["seen_matches"] = list(range(1, self.match.id + 1))
+        session["new_matches"] = []
+        session.save()
 
-        fake_queryset = FakeMatchQueryset()
-        fake_queryset.match_id = self.match.id
+        request = self.client.get(reverse("hall_of_fame")).wsgi_request
 
+        assert views.get_new_match_ids(request) == []
+        assert "seen_matches" not in request.session
+        assert "new_matches" not in request.session
+        assert "seen_matches" not in self.client.session
+        self.player.refresh_from_db()
+        assert self.player.last_seen_match_id == self.match.id
+
+    def test_match_view_advances_watermark_without_growing_session(self):
         self.client.login(username="testuser", password="testpass")
-        response = self.client.get(reverse("hall_of_fame"))
-        request = response.wsgi_request
-        request.session["seen_matches"] = [999]
 
-        monkeypatch.setattr(
-            common,
-            "build_player_participation_queryset",
-            lambda player: fake_queryset,
-        )
+        first = self.client.get(reverse("match"))
+        assert first.context["new_match_ids"] == [self.match.id]
+
+        self.player.refresh_from_db()
+        assert self.player.last_seen_match_id == self.match.id
+        assert "seen_matches" not in self.client.session
 
-        assert views.get_new_match_ids(request) == [self.match.id]
-        assert fake_queryset.excluded == {"id__in": {999}}
+        second = self.client.get(reverse("match"))
+        assert second.context["new_match_ids"] == []
+        assert second.context["new_matches_number"] == 0
 
     def test_fetch_paginated_data_invalid_page(self):
         # Covers lines 123-124
@@ -9,7 +9,9 @@ from . import views
 # - `/ranking/male/`: Male ranking page
 # - `/ranking/female/`: Female ranking page
 # - `/ranking/mixed/`: Mixed ranking page
+# - `/ranking/what-if/`: JSON position changes of a hypothetical match
 # - `/medallero/`: Public medal board
+# - `/players/head-to-head/`: Head-to-head comparison of two players
 # - `/register/`: User registration
 # - `/matches/`: Matches list/add/delete
 # - `/users/<id>/`: Edit user details
@@ -30,9 +32,11 @@ urlpatterns = [
     path('ranking/male/', views.ranking_view, {"scope": "male"}, name='ranking_male'),
     path('ranking/female/', views.ranking_view, {"scope": "female"}, name='ranking_female'),
     path('ranking/mixed/', views.ranking_view, {"scope": "mixed"}, name='ranking_mixed'),
+    path("ranking/what-if/", views.what_if_view, name="ranking_what_if"),
     path("medallero/", views.medallero_view, name="medallero"),
     path("players/", views.players_view, name="players"),
     path("players/<int:player_id>/", views.player_detail_view, name="player_detail"),
+    path("players/head-to-head/", views.head_to_head_view, name="head_to_head"),
     path('register/', views.register_view, name='register'),
     path('matches/', views.match_view, name='match'), # Handles listing, adding, deleting      
     path('users/<int:id>/', views.user_view, name='user'),
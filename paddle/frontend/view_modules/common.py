@@ -9,17 +9,22 @@ Integration:
 - Re-exported publicly via `frontend.views`.
 """
 
+import hashlib
 from functools import lru_cache
 
 from django import forms
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import PasswordResetForm
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Max
 from django.db.models.functions import Lower
 from django.shortcuts import redirect
+from django.utils import timezone
 
-from games.models import Match, Player
+from games.models import GroupDataVersion, Match, MatchParticipant, Player
+from frontend.services.ranking import RankingContext
+from frontend.services.ranking_cache import ranking_data_version
 
 
 @lru_cache(maxsize=1)
@@ -52,13 +57,9 @@ def compute_player_stats(player):
             "win_rate": 0.0,
         }
 
-    matches = player.matches.count()
-    wins = Match.objects.filter(
-        Q(team1_player1=player, winning_team=1)
-        | Q(team1_player2=player, winning_team=1)
-        | Q(team2_player1=player, winning_team=2)
-        | Q(team2_player2=player, winning_team=2)
-    ).count()
+    totals = player.participation_totals()
+    matches = totals["matches"]
+    wins = totals["wins"]
     win_rate = (wins / matches) * 100 if matches else 0.0
     return {
         "wins": wins,
@@ -97,6 +98,20 @@ def get_request_group_context(request):
     }
 
 
+def get_request_ranking_context(request, *, group=None) -> RankingContext:
+    """
+    Returns the `RankingContext` of `group` memoized on the request, so every
+    helper rendering the same response shares one computation per scope.
+    """
+    contexts = getattr(request, "_ranking_contexts", None)
+    if contexts is None:
+        contexts = request._ranking_contexts = {}
+    group_key = group.pk if group is not None else None
+    if group_key not in contexts:
+        contexts[group_key] = RankingContext(group=group)
+    return contexts[group_key]
+
+
 def filter_players_for_group(queryset=None, *, group=None):
     queryset = queryset if queryset is not None else Player.objects.all()
     if group is not None:
@@ -165,34 +180,114 @@ def get_player_stats(request, player_id=None):
 
 def build_player_participation_queryset(player):
     """
-    Returns matches where `player` participates in any of the four match slots.
+    Returns matches where `player` participates in any of the four match slots
+    (one `MatchParticipant` row per match and player, so no `distinct()`).
     """
-    return (
-        Match.objects.filter(team1_player1=player)
-        | Match.objects.filter(team1_player2=player)
-        | Match.objects.filter(team2_player1=player)
-        | Match.objects.filter(team2_player2=player)
-    ).distinct()
+    return Match.objects.filter(participants__player=player)
 
 
-def get_new_match_ids(request):
+def mark_matches_seen(player, match_id: int) -> None:
     """
-    Retrieves the list of new match IDs for the user.
-    A match is considered "new" if the user is a participant but hasn't seen it yet.
+    Moves the "last seen" watermark of `player` forward to `match_id` (never back).
+    """
+    if match_id <= player.last_seen_match_id:
+        return
+    Player.objects.filter(pk=player.pk, last_seen_match_id__lt=match_id).update(last_seen_match_id=match_id)
+    player.last_seen_match_id = match_id
+
+
+def _migrate_legacy_seen_matches(request, player) -> None:
+    # Sessions created before the watermark carry the full list of seen ids.
+    legacy_seen_ids = request.session.pop("seen_matches", None)
+    request.session.pop("new_matches", None)
+    if legacy_seen_ids:
+        mark_matches_seen(player, max(legacy_seen_ids))
+
+
+def build_new_participations_queryset(request):
+    """
+    Returns the `MatchParticipant` rows of the user player newer than its
+    "last seen" watermark, or None without a user player.
     """
     if not request.user.is_authenticated:
-        return []
+        return None
 
     user_player = get_user_player(request)
     if not user_player:
+        return None
+
+    _migrate_legacy_seen_matches(request, user_player)
+    return MatchParticipant.objects.filter(player=user_player, match_id__gt=user_player.last_seen_match_id)
+
+
+def get_new_match_ids(request):
+    """
+    Retrieves the list of new match IDs for the user.
+    A match is considered "new" if the user is a participant and its id is above
+    the player "last seen" watermark.
+    """
+    participations = build_new_participations_queryset(request)
+    if participations is None:
         return []
+    return list(participations.order_by("match_id").values_list("match_id", flat=True))
+
+
+def count_new_matches(request) -> int:
+    """
+    Number of new matches for the navbar badge (one indexed COUNT query).
+    """
+    participations = build_new_participations_queryset(request)
+    if participations is None:
+        return 0
+    return participations.count()
+
+
+def _navbar_tournaments_token(group) -> str:
+    from americano.context_processors import get_nav_tournaments
+
+    return repr(get_nav_tournaments(group))
 
-    seen_matches = set(request.session.get("seen_matches", []))
-    matches = build_player_participation_queryset(user_player)
-    if seen_matches:
-        matches = matches.exclude(id__in=seen_matches)
-    new_match_ids = list(matches.values_list("id", flat=True))
-    return new_match_ids
+
+def build_public_page_etag(request, page_key: str, *, group=None) -> str | None:
+    """
+    ETag of a public ranking page: the data version of the ranked group(s) plus
+    every request-specific bit the page renders (user, group context, new-match
+    badge, navbar tournaments, app version). None disables conditional handling,
+    e.g. while flash messages are pending.
+    """
+    if len(messages.get_messages(request)):
+        return None
+
+    group_context = get_request_group_context(request)
+    context_group = group_context["group"]
+    parts = [
+        page_key,
+        request.get_full_path(),
+        group.pk if group is not None else "all",
+        ranking_data_version(group),
+        context_group.pk if context_group is not None else "all",
+        request.user.pk if request.user.is_authenticated else "anonymous",
+        count_new_matches(request),
+        timezone.localdate().isoformat(),
+        _navbar_tournaments_token(context_group),
+        get_about_app_version_label(),
+    ]
+    if context_group is not None and context_group != group:
+        parts.append(ranking_data_version(context_group))
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def public_page_last_modified(request, *, group=None):
+    """
+    Last ranking data change of the group(s). Only sent to anonymous users:
+    authenticated pages also depend on the new-match badge (ETag only).
+    """
+    if request.user.is_authenticated:
+        return None
+    versions = GroupDataVersion.objects.all()
+    if group is not None:
+        versions = versions.filter(group=group)
+    return versions.aggregate(last_change=Max("updated_at"))["last_change"]
 
 
 def fetch_paginated_data(queryset, request, page_size=12):
@@ -9,10 +9,13 @@ Integration:
 - Exported through `frontend.views` facade.
 """
 
+import uuid
 from datetime import date, datetime
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.shortcuts import redirect, render
 from django.utils.safestring import mark_safe
 
@@ -26,6 +29,7 @@ from .common import (
     get_new_match_ids,
     get_ranking_redirect,
     get_user_player,
+    mark_matches_seen,
 )
 
 
@@ -62,6 +66,12 @@ def _match_window_floor():
     return Match.editable_date_floor()
 
 
+def _match_created_response(request):
+    messages.success(request, "Partido creado correctamente")
+    scope = request.session.get("last_ranking_scope", "all")
+    return get_ranking_redirect(scope)
+
+
 @login_required
 def match_view(request, client=None):
     """
@@ -114,6 +124,14 @@ def match_view(request, client=None):
             messages.success(request, "Partido borrado correctamente")
             return redirect("match")
 
+        # Repeated submits of the same form (double taps, app retries) carry the
+        # same key and get the answer of the first one without a second write.
+        idempotency_key = (match_data.get("idempotency_key") or "").strip()[:64] or None
+        if idempotency_key and Match.objects.filter(
+            group=user_player.group, idempotency_key=idempotency_key
+        ).exists():
+            return _match_created_response(request)
+
         def resolve_player(choice_key: str, new_name_key: str):
             choice = (match_data.get(choice_key) or "").strip()
             new_name = (match_data.get(new_name_key) or "").strip()
@@ -177,38 +195,44 @@ def match_view(request, client=None):
             )
             return redirect("match")
 
-        team1_sorted = sorted([team1_player1.id, team1_player2.id])
-        team2_sorted = sorted([team2_player1.id, team2_player2.id])
-
-        existing_matches = Match.objects.filter(date_played=date_played, group=user_player.group)
-
-        for match in existing_matches:
-            existing_team1_sorted = sorted([match.team1_player1.id, match.team1_player2.id])
-            existing_team2_sorted = sorted([match.team2_player1.id, match.team2_player2.id])
-
-            if (team1_sorted == existing_team1_sorted and team2_sorted == existing_team2_sorted) or (
-                team1_sorted == existing_team2_sorted and team2_sorted == existing_team1_sorted
-            ):
-                messages.error(request, "Error: el partido ya se había creado")
-                return redirect("match")
-
         winning_team = match_data.get("winning_team")
         if winning_team not in ["1", "2"]:
             messages.error(request, "Error: Por favor selecciona equipo ganador.")
             return redirect("match")
 
-        Match.objects.create(
-            group=user_player.group,
-            team1_player1=team1_player1,
-            team1_player2=team1_player2,
-            team2_player1=team2_player1,
-            team2_player2=team2_player2,
-            winning_team=int(winning_team),
-            date_played=date_played,
-        )
-        messages.success(request, "Partido creado correctamente")
-        scope = request.session.get("last_ranking_scope", "all")
-        return get_ranking_redirect(scope)
+        try:
+            Match.objects.create(
+                group=user_player.group,
+                team1_player1=team1_player1,
+                team1_player2=team1_player2,
+                team2_player1=team2_player1,
+                team2_player2=team2_player2,
+                winning_team=int(winning_team),
+                date_played=date_played,
+                idempotency_key=idempotency_key,
+            )
+        except (IntegrityError, ValidationError) as exc:
+            # Either the same submit won a race, or the match signature (group,
+            # date and teams) is already stored.
+            if idempotency_key and Match.objects.filter(
+                group=user_player.group, idempotency_key=idempotency_key
+            ).exists():
+                return _match_created_response(request)
+            signature = Match.build_signature(
+                user_player.group.pk,
+                date_played,
+                (team1_player1.id, team1_player2.id),
+                (team2_player1.id, team2_player2.id),
+            )
+            if Match.objects.filter(signature=signature).exists():
+                messages.error(request, "Error: el partido ya se había creado")
+                return redirect("match")
+            if isinstance(exc, IntegrityError):
+                raise
+            for error in exc.messages:
+                messages.error(request, error)
+            return redirect("match")
+        return _match_created_response(request)
 
     registered_players, non_registered_players, all_players = build_all_players(group=user_player.group)
 
@@ -221,8 +245,6 @@ def match_view(request, client=None):
     user_matches, user_pagination = fetch_paginated_data(user_matches_qs, request)
 
     new_match_ids = get_new_match_ids(request)
-    request.session["new_matches"] = new_match_ids
-    request.session.modified = True
 
     user_icon = mark_safe(
         '<i class="bi bi-person-check-fill"></i><span class="fw-bold">'
@@ -249,13 +271,11 @@ def match_view(request, client=None):
         "today": today,
         "min_match_date": min_match_date,
         "match_window_days": Match.APPROVAL_WINDOW_DAYS,
+        "idempotency_key": uuid.uuid4().hex,
         "error": None,
     }
 
-    request.session["seen_matches"] = list(
-        set(request.session.get("seen_matches", [])).union(new_match_ids)
-    )
-    request.session["new_matches"] = []
-    request.session.modified = True
+    if new_match_ids:
+        mark_matches_seen(user_player, max(new_match_ids))
 
     return render(request, "frontend/match.html", context)
@@ -9,21 +9,33 @@ Integration:
 - Exported through `frontend.views` facade.
 """
 
+from datetime import date
+
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-
-from games.models import Match, Player
-from frontend.services.medals import build_player_medallero_row
-from frontend.services.ranking import compute_ranking, compute_rankings_for_scopes
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from games.models import Match, Player, PlayerInsights
+from frontend.services.medals import (
+    INDIVIDUAL_RANKING_SCOPE_KEYS,
+    MedalRow,
+    build_player_medallero_row,
+    with_medal_hrefs,
+)
+from frontend.services.ranking import RankingContext
 
 from .common import (
     build_all_players,
+    build_public_page_etag,
     build_player_participation_queryset,
+    count_new_matches,
     fetch_paginated_data,
-    get_new_match_ids,
     get_request_group_context,
+    get_request_ranking_context,
     get_user_player,
+    public_page_last_modified,
 )
 
 
@@ -141,20 +153,29 @@ def _build_ranking_progress_fields(scoped_player, ranking_total: int) -> dict:
     }
 
 
-def _add_medallero_card_hrefs(medal_row: dict | None, *, group=None) -> None:
+def _with_medallero_card_hrefs(
+    medal_row: MedalRow | None,
+    *,
+    group=None,
+    ranking_context: RankingContext | None = None,
+) -> MedalRow | None:
     if not medal_row:
-        return
-    for medal in medal_row.get("medals", []):
-        url_name = MEDAL_SCOPE_URL_NAMES.get(medal["scope"])
-        if medal["scope"] == "pairs":
-            medal["href"] = reverse(url_name) if url_name else None
-            continue
+        return medal_row
+
+    def href_for(medal):
+        url_name = MEDAL_SCOPE_URL_NAMES.get(medal.scope)
+        if medal.scope == "pairs":
+            return reverse(url_name) if url_name else None
         scoped_player, page, _ = _get_scoped_player_page_and_total(
-            medal["scope"],
-            medal_row["player"].id,
+            medal.scope,
+            medal_row.player.id,
             group=group,
+            ranking_context=ranking_context,
         )
-        medal["href"] = None if not scoped_player or page is None or not url_name else f'{reverse(url_name)}?page={page}#top'
+        return None if not scoped_player or page is None or not url_name else f'{reverse(url_name)}?page={page}#top'
+
+    # The row comes from the shared ranking cache: link a copy, never the row.
+    return with_medal_hrefs(medal_row, href_for)
 
 
 def _get_scoped_player_page_and_total(
@@ -163,18 +184,11 @@ def _get_scoped_player_page_and_total(
     page_size: int = 12,
     *,
     group=None,
-    ranking_results=None,
+    ranking_context: RankingContext | None = None,
 ):
-    if ranking_results is None:
-        ranked_players, _, _ = compute_ranking(scope, group=group)
-    else:
-        ranked_players, _, _ = ranking_results[scope]
-    scoped_player = next((player for player in ranked_players if player.id == player_id), None)
-    if not scoped_player:
-        return None, None, len(ranked_players)
-    ordinal_index = ranked_players.index(scoped_player) + 1
-    page = ((ordinal_index - 1) // page_size) + 1
-    return scoped_player, page, len(ranked_players)
+    ranking_context = ranking_context or RankingContext(group=group)
+    scoped_player, page = ranking_context.scoped_player_and_page(scope, player_id, page_size)
+    return scoped_player, page, ranking_context.ranked_total(scope)
 
 
 def _build_efficiency_result_row(label: str, results: list[bool]) -> dict:
@@ -190,22 +204,36 @@ def _build_efficiency_result_row(label: str, results: list[bool]) -> dict:
     }
 
 
-def _build_efficiency_scope(scope_key: str, label: str, match_results: list[dict]) -> dict:
-    results = [row["is_win"] for row in match_results]
-    selector_row = _build_efficiency_result_row(label, results)
+def _build_efficiency_scope(
+    scope_key: str,
+    label: str,
+    totals: tuple[int, int],
+    recent_results: list[bool],
+) -> dict:
+    """
+    `totals` is `(matches, wins)` of the scope; `recent_results` its latest
+    results (newest first), at least the last 20.
+    """
+    matches_count, wins = totals
+    selector_row = {
+        "label": label,
+        "wins": wins,
+        "losses": matches_count - wins,
+        "matches": matches_count,
+        "win_rate_percent": _compute_win_rate_percent(wins, matches_count),
+    }
     selector_row["show_progress_stroke"] = selector_row["matches"] > 0
     selector_row["display_value"] = "" if selector_row["matches"] > 0 else "--%"
     selector_row["is_inactive"] = selector_row["matches"] == 0
     selector_row["record_label"] = f"{selector_row['wins']}🏆/{selector_row['matches']}🏓"
 
     trend_rows = [
-        _build_efficiency_result_row("5 últimos", results[:5]),
-        _build_efficiency_result_row("10 últimos", results[:10]),
-        _build_efficiency_result_row("20 últimos", results[:20]),
+        _build_efficiency_result_row("5 últimos", recent_results[:5]),
+        _build_efficiency_result_row("10 últimos", recent_results[:10]),
+        _build_efficiency_result_row("20 últimos", recent_results[:20]),
     ]
-    total_matches = len(results)
     for row, minimum_matches in zip(trend_rows, [1, 6, 11]):
-        row["is_eligible"] = total_matches >= minimum_matches
+        row["is_eligible"] = matches_count >= minimum_matches
         row["is_inactive"] = not row["is_eligible"]
         row["display_value"] = "" if row["is_eligible"] else "--%"
     _mark_distinct_trend_progress(trend_rows)
@@ -220,33 +248,36 @@ def _build_efficiency_scope(scope_key: str, label: str, match_results: list[dict
     }
 
 
-def _build_efficiency_scopes(player, match_results: list[dict]) -> list[dict]:
-    from games.models import Match
+def _snapshot_scope(data: dict, gender_types) -> tuple[tuple[int, int], list[bool]]:
+    """
+    `((matches, wins), recent_results)` of the snapshot for the union of
+    `gender_types` (newest results first).
+    """
+    matches_count, wins, recent = 0, 0, []
+    for gender_type in gender_types:
+        scope_matches, scope_wins = data["totals"].get(gender_type, (0, 0))
+        matches_count += scope_matches
+        wins += scope_wins
+        recent.extend(data["recent"].get(gender_type, []))
+    recent.sort(reverse=True)
+    return (matches_count, wins), [bool(entry[2]) for entry in recent[:PlayerInsights.RECENT_LIMIT]]
 
+
+def _build_efficiency_scopes(player, data: dict) -> list[dict]:
     if player.gender == Player.GENDER_MALE:
         gender_label = "Masc."
-        gender_type = Match.GENDER_TYPE_MALE
+        gender_types = [Match.GENDER_TYPE_MALE]
     elif player.gender == Player.GENDER_FEMALE:
         gender_label = "Fem."
-        gender_type = Match.GENDER_TYPE_FEMALE
+        gender_types = [Match.GENDER_TYPE_FEMALE]
     else:
         gender_label = "Categoría"
-        gender_type = None
-
-    gender_results = (
-        [row for row in match_results if row["match_gender_type"] == gender_type]
-        if gender_type
-        else []
-    )
+        gender_types = []
 
     scopes = [
-        _build_efficiency_scope("all", "Todos", match_results),
-        _build_efficiency_scope("gender", gender_label, gender_results),
-        _build_efficiency_scope(
-            "mixed",
-            "Mixtos",
-            [row for row in match_results if row["match_gender_type"] == Match.GENDER_TYPE_MIXED],
-        ),
+        _build_efficiency_scope("all", "Todos", *_snapshot_scope(data, list(data["totals"]))),
+        _build_efficiency_scope("gender", gender_label, *_snapshot_scope(data, gender_types)),
+        _build_efficiency_scope("mixed", "Mixtos", *_snapshot_scope(data, [Match.GENDER_TYPE_MIXED])),
     ]
     for scope in scopes:
         _add_scope_classes(scope, scope["key"])
@@ -277,15 +308,15 @@ def _get_recent_form_summary_color_class(balance: int) -> str:
     return "bg-secondary"
 
 
-def _build_recent_form_chart(match_results: list[dict]) -> dict:
-    recent_results = list(reversed(match_results[:10]))
+def _build_recent_form_chart(results: list[bool]) -> dict:
+    recent_results = list(reversed(results[:10]))
     points = [{"x": 0, "y": 0}]
     cumulative_balance = 0
     wins = 0
     losses = 0
 
-    for index, row in enumerate(recent_results, start=1):
-        if row["is_win"]:
+    for index, is_win in enumerate(recent_results, start=1):
+        if is_win:
             cumulative_balance += 1
             wins += 1
         else:
@@ -671,97 +702,54 @@ def _build_player_stats_summary(scope_rows, player_insights):
     }
 
 
-def build_player_insights(player):
+def build_player_insights(player, *, ranking_context: RankingContext | None = None):
     """
-    Build trend, top partners and top rivals insights for a player.
+    Build trend, top partners and top rivals insights for a player from the
+    group head-to-head matrices and its persisted `PlayerInsights` snapshot
+    (no match history scan).
     """
-    matches = list(
-        build_player_matches_queryset(player).select_related(
-            "team1_player1",
-            "team1_player2",
-            "team2_player1",
-            "team2_player2",
-        )
-    )
-
-    match_results = []
-    partner_stats = {}
+    ranking_context = ranking_context or RankingContext(group=player.group)
+    head_to_head = ranking_context.head_to_head()
+    partners = head_to_head.partners_of(player.id)
+    opponents = head_to_head.opponents_of(player.id)
+    data = PlayerInsights.for_player(player).data
+    related_ids = set(partners) | set(opponents)
+    for pair_key in data["rival_pairs"]:
+        related_ids.update(int(player_id) for player_id in pair_key.split(","))
+    players_by_id = Player.objects.in_bulk(related_ids)
+
+    partner_stats = {
+        partner_id: {
+            "player": players_by_id[partner_id],
+            "matches_together": matches,
+            "wins_together": wins,
+            "last_date": last_date,
+        }
+        for partner_id, (matches, wins, last_date) in partners.items()
+    }
     rival_stats = {}
-    opponent_stats = {}
-
-    for match in matches:
-        if match.team1_player1_id == player.id:
-            teammate = match.team1_player2
-            rivals = (match.team2_player1, match.team2_player2)
-            is_win = match.winning_team == 1
-        elif match.team1_player2_id == player.id:
-            teammate = match.team1_player1
-            rivals = (match.team2_player1, match.team2_player2)
-            is_win = match.winning_team == 1
-        elif match.team2_player1_id == player.id:
-            teammate = match.team2_player2
-            rivals = (match.team1_player1, match.team1_player2)
-            is_win = match.winning_team == 2
-        else:
-            teammate = match.team2_player1
-            rivals = (match.team1_player1, match.team1_player2)
-            is_win = match.winning_team == 2
-
-        match_results.append(
-            {
-                "is_win": is_win,
-                "match_gender_type": match.match_gender_type,
-            }
-        )
-
-        partner_row = partner_stats.setdefault(
-            teammate.id,
-            {
-                "player": teammate,
-                "matches_together": 0,
-                "wins_together": 0,
-                "last_date": match.date_played,
-            },
-        )
-        partner_row["matches_together"] += 1
-        partner_row["wins_together"] += 1 if is_win else 0
-        if match.date_played > partner_row["last_date"]:
-            partner_row["last_date"] = match.date_played
-
-        rival_pair = tuple(sorted((rivals[0].id, rivals[1].id)))
-        rival_row = rival_stats.setdefault(
-            rival_pair,
-            {
-                "players_by_id": tuple(sorted(rivals, key=lambda p: p.id)),
-                "encounters": 0,
-                "wins_vs_pair": 0,
-                "last_date": match.date_played,
-            },
-        )
-        rival_row["encounters"] += 1
-        rival_row["wins_vs_pair"] += 1 if is_win else 0
-        if match.date_played > rival_row["last_date"]:
-            rival_row["last_date"] = match.date_played
-
-        for opponent in rivals:
-            opponent_row = opponent_stats.setdefault(
-                opponent.id,
-                {
-                    "player": opponent,
-                    "matches_against": 0,
-                    "player_wins": 0,
-                    "opponent_wins": 0,
-                    "last_date": match.date_played,
-                },
-            )
-            opponent_row["matches_against"] += 1
-            opponent_row["player_wins"] += 1 if is_win else 0
-            opponent_row["opponent_wins"] += 0 if is_win else 1
-            if match.date_played > opponent_row["last_date"]:
-                opponent_row["last_date"] = match.date_played
+    for pair_key, (matches, wins, last_date) in data["rival_pairs"].items():
+        rival_pair = tuple(int(player_id) for player_id in pair_key.split(","))
+        rival_stats[rival_pair] = {
+            "players_by_id": tuple(players_by_id[player_id] for player_id in rival_pair),
+            "encounters": matches,
+            "wins_vs_pair": wins,
+            "last_date": date.fromisoformat(last_date),
+        }
+    opponent_stats = {
+        opponent_id: {
+            "player": players_by_id[opponent_id],
+            "matches_against": matches,
+            "player_wins": wins,
+            "opponent_wins": matches - wins,
+            "last_date": last_date,
+        }
+        for opponent_id, (matches, wins, last_date) in opponents.items()
+    }
 
-    efficiency_scopes = _build_efficiency_scopes(player, match_results)
+    efficiency_scopes = _build_efficiency_scopes(player, data)
     trend_rows = efficiency_scopes[0]["trend_rows"]
+    _, recent_results = _snapshot_scope(data, list(data["totals"]))
 
     partner_rows = []
     for row in partner_stats.values():
@@ -870,7 +858,7 @@ def build_player_insights(player):
 
     return {
         "efficiency_scopes": efficiency_scopes,
-        "recent_form_chart": _build_recent_form_chart(match_results),
+        "recent_form_chart": _build_recent_form_chart(recent_results),
         "trend_rows": trend_rows,
         "top_partners": partner_rows[:3],
         "partner_distribution": _build_partner_distribution(partner_rows),
@@ -898,6 +886,68 @@ def process_matches_plain(matches):
     return matches
 
 
+def _parse_player_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_head_to_head_summary(player, other, head_to_head) -> dict:
+    """
+    Head-to-head comparison rows of two players read from the group matrices.
+    """
+    matches_against = head_to_head.matches_against(player.id, other.id)
+    player_wins = head_to_head.wins_against(player.id, other.id)
+    matches_together = head_to_head.matches_together(player.id, other.id)
+    wins_together = head_to_head.wins_together(player.id, other.id)
+    return {
+        "matches_against": matches_against,
+        "player_wins": player_wins,
+        "other_wins": matches_against - player_wins,
+        "player_win_rate_percent": _compute_win_rate_percent(player_wins, matches_against),
+        "other_win_rate_percent": _compute_win_rate_percent(matches_against - player_wins, matches_against),
+        "last_against": head_to_head.last_against(player.id, other.id),
+        "matches_together": matches_together,
+        "wins_together": wins_together,
+        "losses_together": matches_together - wins_together,
+        "together_win_rate_percent": _compute_win_rate_percent(wins_together, matches_together),
+        "last_together": head_to_head.last_together(player.id, other.id),
+    }
+
+
+def head_to_head_view(request):
+    """
+    Public head-to-head comparison of two players (`?player1=<id>&player2=<id>`).
+    """
+    group_context = get_request_group_context(request)
+    _, _, all_players = build_all_players(
+        group=group_context["group"],
+        include_group_labels=group_context["aggregate"],
+    )
+    players_by_id = {player.id: player for player in all_players}
+    player = players_by_id.get(_parse_player_id(request.GET.get("player1")))
+    other = players_by_id.get(_parse_player_id(request.GET.get("player2")))
+
+    summary = None
+    if player and other and player.id != other.id:
+        ranking_context = get_request_ranking_context(request, group=group_context["group"])
+        summary = build_head_to_head_summary(player, other, ranking_context.head_to_head())
+
+    return render(
+        request,
+        "frontend/head_to_head.html",
+        {
+            "all_players": all_players,
+            "player1": player,
+            "player2": other,
+            "summary": summary,
+            "new_matches_number": count_new_matches(request),
+            "group_display_name": group_context["display_name"],
+        },
+    )
+
+
 def players_view(request):
     """
     Public players landing page with selector.
@@ -911,19 +961,38 @@ def players_view(request):
         group=group_context["group"],
         include_group_labels=False,
     )
-    new_match_ids = get_new_match_ids(request) or []
+    new_matches_number = count_new_matches(request)
     return render(
         request,
         "frontend/players.html",
         {
             "all_players": all_players,
             "selected_player_id": None,
-            "new_matches_number": len(new_match_ids),
+            "new_matches_number": new_matches_number,
             "group_display_name": group_context["display_name"],
         },
     )
 
 
+def _profile_group(player_id):
+    player = Player.objects.select_related("group").filter(pk=player_id).first()
+    return player.group if player else None
+
+
+def _player_detail_etag(request, player_id):
+    group = _profile_group(player_id)
+    if group is None:
+        return None
+    return build_public_page_etag(request, f"player:{player_id}", group=group)
+
+
+def _player_detail_last_modified(request, player_id):
+    group = _profile_group(player_id)
+    return public_page_last_modified(request, group=group) if group is not None else None
+
+
+@vary_on_cookie
+@condition(etag_func=_player_detail_etag, last_modified_func=_player_detail_last_modified)
 def player_detail_view(request, player_id):
     """
     Public player profile page with scoped stats and match history.
@@ -947,10 +1016,9 @@ def player_detail_view(request, player_id):
         scope_rows.append({"label": "Fem.", "scope": "female", "url_name": "ranking_female"})
     scope_rows.append({"label": "Mixtos", "scope": "mixed", "url_name": "ranking_mixed"})
 
-    ranking_results = compute_rankings_for_scopes(
-        [row["scope"] for row in scope_rows],
-        group=profile_player.group,
-    )
+    # Profile cards and the medallero share one ranking computation per scope.
+    ranking_context = get_request_ranking_context(request, group=profile_player.group)
+    ranking_context.load([row["scope"] for row in scope_rows] + INDIVIDUAL_RANKING_SCOPE_KEYS)
 
     for row in scope_rows:
         _add_scope_classes(row, row["scope"])
@@ -958,7 +1026,7 @@ def player_detail_view(request, player_id):
             row["scope"],
             profile_player.id,
             group=profile_player.group,
-            ranking_results=ranking_results,
+            ranking_context=ranking_context,
         )
         row["scoped_player"] = scoped_player
         row.update(_build_ranking_progress_fields(scoped_player, ranking_total))
@@ -973,12 +1041,15 @@ def player_detail_view(request, player_id):
     profile_matches_qs = build_player_matches_queryset(profile_player)
     profile_matches, profile_pagination = fetch_paginated_data(profile_matches_qs, request)
     profile_matches = process_matches_plain(profile_matches)
-    player_insights = build_player_insights(profile_player)
+    player_insights = build_player_insights(profile_player, ranking_context=ranking_context)
     player_stats_summary = _build_player_stats_summary(scope_rows, player_insights)
-    profile_medal_row = build_player_medallero_row(profile_player, group=profile_player.group)
-    _add_medallero_card_hrefs(profile_medal_row, group=profile_player.group)
+    profile_medal_row = _with_medallero_card_hrefs(
+        build_player_medallero_row(profile_player, group=profile_player.group, ranking_context=ranking_context),
+        group=profile_player.group,
+        ranking_context=ranking_context,
+    )
 
-    new_match_ids = get_new_match_ids(request) or []
+    new_matches_number = count_new_matches(request)
     return render(
         request,
         "frontend/player_detail.html",
@@ -994,7 +1065,7 @@ def player_detail_view(request, player_id):
             "profile_medal_row": profile_medal_row,
             "new_match_ids": [],
             "user_matches": [],
-            "new_matches_number": len(new_match_ids),
+            "new_matches_number": new_matches_number,
             "group_display_name": profile_player.group.name if not group_context["aggregate"] else f"{profile_player.group.name} · Hall of Fame",
         },
     )
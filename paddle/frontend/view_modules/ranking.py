@@ -3,21 +3,45 @@
 Responsibilities:
 - Ranking home redirect and hall of fame wrapper.
 - Scoped ranking page rendering and scoped-player pagination helpers.
+- "What if" JSON endpoint for hypothetical match results.
 
 Integration:
 - Uses ranking service (`frontend.services.ranking`) and shared helpers from `common.py`.
 - Exported to URLconf through `frontend.views` facade.
 """
 
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
+from django.views.decorators.http import condition, require_GET
+from django.views.decorators.vary import vary_on_cookie
 
 from games.models import Player
 
-from frontend.services.medals import build_medallero_rows
-from frontend.services.ranking import build_pairs_ranking_sections, compute_ranking
-
-from .common import get_new_match_ids, get_ranking_redirect, get_request_group_context, get_user_player, paginate_list
+from frontend.services.medals import MedalRow, build_medallero_rows, with_medal_hrefs
+from frontend.services.rank_index import what_if_match
+from frontend.services.ranking import (
+    RankingContext,
+    build_scope_ranking_queryset,
+    compute_unranked_players,
+    get_scoped_ranking_stats,
+    normalize_ranking_scope,
+    ranked_player_from_stats,
+    ranking_page_for_ordinal,
+)
+
+from .common import (
+    build_public_page_etag,
+    count_new_matches,
+    fetch_paginated_data,
+    filter_players_for_group,
+    get_ranking_redirect,
+    get_request_group_context,
+    get_request_ranking_context,
+    get_user_player,
+    paginate_list,
+    public_page_last_modified,
+)
 
 
 MEDAL_SCOPE_URL_NAMES = {
@@ -28,13 +52,16 @@ MEDAL_SCOPE_URL_NAMES = {
 }
 
 
-def _add_medallero_card_hrefs(rows: list[dict], *, group=None) -> None:
-    for row in rows:
-        player = row["player"]
-        for medal in row.get("medals", []):
-            page = get_player_page_in_scope(medal["scope"], player.id, group=group)
-            url_name = MEDAL_SCOPE_URL_NAMES.get(medal["scope"])
-            medal["href"] = None if page is None or not url_name else f'{reverse(url_name)}?page={page}#top'
+def _with_medallero_card_hrefs(
+    rows: list[MedalRow], *, group=None, ranking_context: RankingContext | None = None
+) -> list[MedalRow]:
+    def href_for(player, medal):
+        page = get_player_page_in_scope(medal.scope, player.id, group=group, ranking_context=ranking_context)
+        url_name = MEDAL_SCOPE_URL_NAMES.get(medal.scope)
+        return None if page is None or not url_name else f'{reverse(url_name)}?page={page}#top'
+
+    # The rows come from the shared ranking cache: link copies, never the rows.
+    return [with_medal_hrefs(row, lambda medal, player=row.player: href_for(player, medal)) for row in rows]
 
 
 def ranking_home_view(request):
@@ -50,43 +77,75 @@ def hall_of_fame_view(request):
     return ranking_view(request, scope="all")
 
 
+def _ranking_group(request):
+    return get_request_group_context(request)["group"]
+
+
+def _ranking_page_etag(request, scope):
+    return build_public_page_etag(request, f"ranking:{scope}", group=_ranking_group(request))
+
+
+def _ranking_page_last_modified(request, scope=None):
+    return public_page_last_modified(request, group=_ranking_group(request))
+
+
 def ranking_view(request, scope):
     """
     Renders scoped ranking pages: all/male/female/mixed.
-    """
-    group_context = get_request_group_context(request)
-    ranked_players, unranked_players, scope = compute_ranking(scope, group=group_context["group"])
 
+    Group rankings page persisted positions in the DB; the aggregate Hall of Fame
+    (no group) is still computed in memory across every group.
+    """
+    scope = normalize_ranking_scope(scope)
     request.session["last_ranking_scope"] = scope
+    return _render_ranking_page(request, scope)
 
-    players, pagination = paginate_list(ranked_players, request, page_size=12)
 
-    new_match_ids = get_new_match_ids(request) or []
-    new_matches_number = len(new_match_ids)
+@vary_on_cookie
+@condition(etag_func=_ranking_page_etag, last_modified_func=_ranking_page_last_modified)
+def _render_ranking_page(request, scope):
+    """
+    Unchanged pages answer 304 before any ranking code or template rendering.
+    """
+    group_context = get_request_group_context(request)
+    group = group_context["group"]
+
+    new_matches_number = count_new_matches(request)
 
     user_page = None
     user_player = None
     previous_player = None
     following_player = None
 
-    if request.user.is_authenticated:
-        db_user_player = get_user_player(request)
-
-        if db_user_player:
-            scoped_user_player = next((p for p in ranked_players if p.id == db_user_player.id), None)
-
-            if scoped_user_player:
-                user_player = scoped_user_player
-                ordinal_index = ranked_players.index(user_player) + 1
-
-                current_page = int(request.GET.get("page", 1))
-                user_page = ((ordinal_index - 1) // 12) + 1
-
-                if user_page != current_page:
-                    previous_player = ranked_players[ordinal_index - 2] if ordinal_index > 1 else None
-                    following_player = (
-                        ranked_players[ordinal_index] if ordinal_index < len(ranked_players) else None
+    if group is None:
+        ranked_players, unranked_players, scope = get_request_ranking_context(request, group=None).ranking(scope)
+        players, pagination = paginate_list(ranked_players, request, page_size=12)
+    else:
+        stats_page, pagination = fetch_paginated_data(build_scope_ranking_queryset(scope, group=group), request)
+        players = [ranked_player_from_stats(stats) for stats in stats_page]
+        unranked_players = (
+            compute_unranked_players(scope, group=group)
+            if pagination["current_page"] == pagination["total_pages"]
+            else []
+        )
+
+        db_user_player = get_user_player(request) if request.user.is_authenticated else None
+        user_stats = (
+            get_scoped_ranking_stats(scope, db_user_player.id, group=group) if db_user_player else None
+        )
+        if user_stats:
+            user_player = ranked_player_from_stats(user_stats)
+            user_page = ranking_page_for_ordinal(user_stats.ordinal)
+
+            if user_page != pagination["current_page"]:
+                neighbours = {
+                    stats.ordinal: ranked_player_from_stats(stats)
+                    for stats in build_scope_ranking_queryset(scope, group=group).filter(
+                        ordinal__in=[user_stats.ordinal - 1, user_stats.ordinal + 1]
                     )
+                }
+                previous_player = neighbours.get(user_stats.ordinal - 1)
+                following_player = neighbours.get(user_stats.ordinal + 1)
 
     titles = {
         "all": f'{group_context["display_name"]} — Todos los partidos',
@@ -115,13 +174,18 @@ def ranking_view(request, scope):
     )
 
 
+@vary_on_cookie
+@condition(
+    etag_func=lambda request: build_public_page_etag(request, "pairs", group=_ranking_group(request)),
+    last_modified_func=_ranking_page_last_modified,
+)
 def pairs_ranking_view(request):
     """
     Renders the all-matches pairs ranking page.
     """
     group_context = get_request_group_context(request)
-    sections = build_pairs_ranking_sections(group=group_context["group"])
-    new_match_ids = get_new_match_ids(request) or []
+    sections = get_request_ranking_context(request, group=group_context["group"]).pairs_sections()
+    new_matches_number = count_new_matches(request)
 
     return render(
         request,
@@ -130,7 +194,7 @@ def pairs_ranking_view(request):
             "top_pairs": sections["top_pairs"],
             "pairs_of_the_century": sections["pairs_of_the_century"],
             "catastrophic_pairs": sections["catastrophic_pairs"],
-            "new_matches_number": len(new_match_ids),
+            "new_matches_number": new_matches_number,
             "page_title": "Parejas",
             "group_display_name": group_context["display_name"],
             "is_aggregate_context": group_context["aggregate"],
@@ -138,22 +202,31 @@ def pairs_ranking_view(request):
     )
 
 
+@vary_on_cookie
+@condition(
+    etag_func=lambda request: build_public_page_etag(request, "medallero", group=_ranking_group(request)),
+    last_modified_func=_ranking_page_last_modified,
+)
 def medallero_view(request):
     """
     Renders the public medal board for the current ranking group context.
     """
     group_context = get_request_group_context(request)
-    new_match_ids = get_new_match_ids(request) or []
+    new_matches_number = count_new_matches(request)
 
-    medallero_rows = build_medallero_rows(group=group_context["group"])
-    _add_medallero_card_hrefs(medallero_rows, group=group_context["group"])
+    ranking_context = get_request_ranking_context(request, group=group_context["group"])
+    medallero_rows = _with_medallero_card_hrefs(
+        build_medallero_rows(group=group_context["group"], ranking_context=ranking_context),
+        group=group_context["group"],
+        ranking_context=ranking_context,
+    )
 
     return render(
         request,
         "frontend/medallero.html",
         {
             "medallero_rows": medallero_rows,
-            "new_matches_number": len(new_match_ids),
+            "new_matches_number": new_matches_number,
             "page_title": "Medallero",
             "group_display_name": group_context["display_name"],
             "is_aggregate_context": group_context["aggregate"],
@@ -161,34 +234,79 @@ def medallero_view(request):
     )
 
 
-def get_scoped_player_row(scope: str, player_id: int, *, group=None):
+def _parse_team(value) -> tuple[int, int] | None:
+    try:
+        player_ids = tuple(int(player_id) for player_id in (value or "").split(","))
+    except ValueError:
+        return None
+    return player_ids if len(player_ids) == 2 else None
+
+
+@require_GET
+def what_if_view(request):
     """
-    Returns the scoped ranked player object with display_* fields or None.
+    Position changes of the four players if a hypothetical match were played
+    (`?team1=<id>,<id>&team2=<id>,<id>&winner=1|2`), answered from the rank
+    indexes without recomputing any ranking.
     """
-    ranked_players, _, _ = compute_ranking(scope, group=group)
-    return next((player for player in ranked_players if player.id == player_id), None)
+    group = _ranking_group(request)
+    team1 = _parse_team(request.GET.get("team1"))
+    team2 = _parse_team(request.GET.get("team2"))
+    winner = request.GET.get("winner")
+    if not team1 or not team2 or winner not in {"1", "2"}:
+        return JsonResponse({"error": "Indica team1, team2 (dos ids cada uno) y winner (1 o 2)."}, status=400)
 
+    player_ids = set(team1 + team2)
+    if len(player_ids) != 4:
+        return JsonResponse({"error": "Los cuatro jugadores deben ser distintos."}, status=400)
+    players = list(filter_players_for_group(group=group).filter(id__in=player_ids))
+    if len(players) != 4 or len({player.group_id for player in players}) != 1:
+        return JsonResponse({"error": "Jugadores no encontrados en el grupo."}, status=400)
 
-def get_player_page_in_scope(scope: str, player_id: int, page_size: int = 12, *, group=None):
+    return JsonResponse({"scopes": what_if_match(team1, team2, int(winner), group=group)})
+
+
+def get_scoped_player_row(scope: str, player_id: int, *, group=None, ranking_context: RankingContext | None = None):
+    """
+    Returns the scoped ranked player object with display_* fields or None.
+    """
+    scoped_player, _ = get_scoped_player_and_page(scope, player_id, group=group, ranking_context=ranking_context)
+    return scoped_player
+
+
+def get_player_page_in_scope(
+    scope: str,
+    player_id: int,
+    page_size: int = 12,
+    *,
+    group=None,
+    ranking_context: RankingContext | None = None,
+):
     """
     Returns the pagination page number where player_id appears for a ranking scope.
     """
-    ranked_players, _, _ = compute_ranking(scope, group=group)
-    scoped_player = next((p for p in ranked_players if p.id == player_id), None)
-    if not scoped_player:
-        return None
-    ordinal_index = ranked_players.index(scoped_player) + 1
-    return ((ordinal_index - 1) // page_size) + 1
-
-
-def get_scoped_player_and_page(scope: str, player_id: int, page_size: int = 12, *, group=None):
+    _, page = get_scoped_player_and_page(scope, player_id, page_size, group=group, ranking_context=ranking_context)
+    return page
+
+
+def get_scoped_player_and_page(
+    scope: str,
+    player_id: int,
+    page_size: int = 12,
+    *,
+    group=None,
+    ranking_context: RankingContext | None = None,
+):
     """
-    Returns (scoped_player, page) from a single ranking computation.
+    Returns (scoped_player, page): an index lookup in `ranking_context` when given,
+    a single-row lookup for group rankings, or one ranking computation for the
+    aggregate context.
     """
-    ranked_players, _, _ = compute_ranking(scope, group=group)
-    scoped_player = next((p for p in ranked_players if p.id == player_id), None)
-    if not scoped_player:
-        return None, None
-    ordinal_index = ranked_players.index(scoped_player) + 1
-    page = ((ordinal_index - 1) // page_size) + 1
-    return scoped_player, page
+    if ranking_context is None and group is not None:
+        stats = get_scoped_ranking_stats(scope, player_id, group=group)
+        if not stats:
+            return None, None
+        return ranked_player_from_stats(stats), ranking_page_for_ordinal(stats.ordinal, page_size)
+
+    ranking_context = ranking_context or RankingContext(group=group)
+    return ranking_context.scoped_player_and_page(scope, player_id, page_size)
@@ -16,6 +16,7 @@ from .view_modules.auth_profile import (
 from .view_modules.common import (
     EmailExistsPasswordResetForm,
     build_all_players,
+    count_new_matches,
     fetch_available_players,
     fetch_paginated_data,
     get_about_app_version_label,
@@ -29,6 +30,7 @@ from .view_modules.players import (
     _compute_win_rate_percent,
     build_player_insights,
     build_player_matches_queryset,
+    head_to_head_view,
     player_detail_view,
     players_view,
     process_matches_plain,
@@ -42,6 +44,7 @@ from .view_modules.ranking import (
     pairs_ranking_view,
     ranking_home_view,
     ranking_view,
+    what_if_view,
 )
 
 __all__ = [
@@ -51,6 +54,7 @@ __all__ = [
     "build_all_players",
     "build_player_insights",
     "build_player_matches_queryset",
+    "count_new_matches",
     "fetch_available_players",
     "fetch_paginated_data",
     "get_about_app_version_label",
@@ -61,6 +65,7 @@ __all__ = [
     "get_scoped_player_and_page",
     "get_scoped_player_row",
     "hall_of_fame_view",
+    "head_to_head_view",
     "login_view",
     "logout_view",
     "match_view",
@@ -76,4 +81,5 @@ __all__ = [
     "register_view",
     "user_delete_view",
     "user_view",
+    "what_if_view",
 ]
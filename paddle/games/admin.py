@@ -1,7 +1,7 @@
 # absolute path: /workspaces/paddle/paddle/games/admin.py
 
 from django.contrib import admin
-from .models import Player, Match
+from .models import Group, Job, Match, Player, PlayerScopeStats, group_write_lock, update_scope_positions
 from django.utils.html import format_html
 
 class GenderMissingFilter(admin.SimpleListFilter):
@@ -26,11 +26,23 @@ class PlayerAdmin(admin.ModelAdmin):
 
     @admin.action(description="Set gender to Male (M)")
     def set_gender_male(self, request, queryset):
-        queryset.update(gender=Player.GENDER_MALE)
+        self._set_gender(queryset, Player.GENDER_MALE)
 
     @admin.action(description="Set gender to Female (F)")
     def set_gender_female(self, request, queryset):
-        queryset.update(gender=Player.GENDER_FEMALE)
+        self._set_gender(queryset, Player.GENDER_FEMALE)
+
+    def _set_gender(self, queryset, gender):
+        group_ids = set(queryset.values_list("group_id", flat=True))
+        # Queryset updates bypass Player.save, so take its lock and re-sort the
+        # gender rankings (bumping each group's data version) here.
+        with group_write_lock(*group_ids):
+            queryset.update(gender=gender)
+            for group in Group.objects.filter(id__in=group_ids):
+                update_scope_positions(
+                    group=group,
+                    scopes=[PlayerScopeStats.SCOPE_MALE, PlayerScopeStats.SCOPE_FEMALE],
+                )
 
 
 
@@ -55,6 +67,11 @@ class MatchAdmin(admin.ModelAdmin):
     )
     ordering = ("-date_played",)
 
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes must go through Match.delete to keep ranking counters in sync.
+        for match in queryset:
+            match.delete()
+
     @admin.display(description="Players (gender)")
     def players_with_gender(self, obj):
         def fmt(p):
@@ -72,3 +89,11 @@ class MatchAdmin(admin.ModelAdmin):
         )
 
 
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "key", "status", "attempts", "run_after", "locked_by")
+    list_filter = ("status", "kind")
+    ordering = ("run_after",)
+    readonly_fields = ("last_error",)
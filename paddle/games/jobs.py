@@ -0,0 +1,160 @@
+"""Database-backed background job queue (no external broker).
+
+- `enqueue_job(kind, key)` adds a pending job unless one with the same
+  (kind, key) is already pending, so bursts of writes coalesce into one run;
+  the `unique_pending_job` constraint keeps this atomic across processes.
+- Workers (`manage.py run_jobs`) claim due jobs with a conditional UPDATE, so
+  a row is run by one worker only, and skip keys that are already running.
+- A failing job is retried with exponential backoff up to `JOBS_MAX_ATTEMPTS`
+  attempts, then kept as failed with its traceback.
+- Jobs left running by a crashed worker are requeued after
+  `JOBS_LOCK_TIMEOUT` seconds.
+
+Handlers are registered per kind with `register_job_handler`, receive the job
+key and must be idempotent (a job may run again after a crash).
+"""
+
+from __future__ import annotations
+
+import logging
+import traceback
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_GROUP_RANKINGS = "group_rankings"
+CLAIM_BATCH_SIZE = 20
+
+_handlers: dict[str, Callable[[str], None]] = {}
+
+
+def register_job_handler(kind: str, handler: Callable[[str], None]) -> None:
+    _handlers[kind] = handler
+
+
+def background_jobs_enabled() -> bool:
+    return settings.BACKGROUND_JOBS_ENABLED
+
+
+def enqueue_job(kind: str, key) -> Job:
+    """
+    Pending job of (kind, key), reusing the one already waiting if any.
+    """
+    # A concurrent insert of the same pending job fails on `unique_pending_job`
+    # and get_or_create then returns the winner's row.
+    job, _ = Job.objects.get_or_create(kind=kind, key=str(key), status=Job.STATUS_PENDING)
+    return job
+
+
+def _return_to_pending(job_filter, **changes) -> int:
+    """
+    Moves the matching jobs back to pending; one whose (kind, key) already has
+    a pending job is deleted instead, as that job will redo its work.
+    """
+    moved = 0
+    for job in Job.objects.filter(job_filter):
+        try:
+            with transaction.atomic():
+                moved += Job.objects.filter(job_filter, pk=job.pk).update(status=Job.STATUS_PENDING, **changes)
+        except IntegrityError:
+            Job.objects.filter(job_filter, pk=job.pk).delete()
+    return moved
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Puts back jobs whose worker stopped before finishing them.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return _return_to_pending(
+        models.Q(status=Job.STATUS_RUNNING, locked_at__lt=cutoff),
+        locked_by="",
+        locked_at=None,
+    )
+
+
+def claim_job(worker_id: str) -> Job | None:
+    """
+    Marks the oldest due job as running for `worker_id`, or None when idle.
+    """
+    now = timezone.now()
+    running_keys = set(Job.objects.filter(status=Job.STATUS_RUNNING).values_list("kind", "key"))
+    candidates = Job.objects.filter(status=Job.STATUS_PENDING, run_after__lte=now).order_by("run_after", "pk")
+    for job in candidates[:CLAIM_BATCH_SIZE]:
+        if (job.kind, job.key) in running_keys:
+            continue
+        claimed = Job.objects.filter(pk=job.pk, status=Job.STATUS_PENDING).update(
+            status=Job.STATUS_RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=models.F("attempts") + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** max(attempts - 1, 0))
+
+
+def run_job(job: Job) -> bool:
+    """
+    Runs a claimed job in one transaction. Returns True when it succeeded.
+    """
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}.")
+        with transaction.atomic():
+            handler(job.key)
+    except Exception:
+        logger.exception("Job %s failed (attempt %s)", job, job.attempts)
+        changes = {
+            "run_after": timezone.now() + _retry_delay(job.attempts),
+            "locked_by": "",
+            "locked_at": None,
+            "last_error": traceback.format_exc(),
+        }
+        owned = models.Q(pk=job.pk, locked_by=job.locked_by)
+        if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+            Job.objects.filter(owned).update(status=Job.STATUS_FAILED, **changes)
+        else:
+            _return_to_pending(owned, **changes)
+        return False
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).delete()
+    return True
+
+
+def run_pending_jobs(worker_id: str, *, limit: int | None = None) -> int:
+    """
+    Claims and runs due jobs until none is left (or `limit` were run).
+    """
+    requeue_stale_jobs()
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def _recompute_group_rankings(key: str) -> None:
+    from .models import Group, rebuild_group_rankings
+
+    group = Group.objects.filter(pk=int(key)).first()
+    if group is not None:
+        rebuild_group_rankings(group, drop_insights=False, skip_if_current=True)
+
+
+register_job_handler(JOB_GROUP_RANKINGS, _recompute_group_rankings)
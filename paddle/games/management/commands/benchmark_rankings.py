@@ -0,0 +1,71 @@
+import random
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from frontend.services import ranking_numpy
+from frontend.services.match_store import MatchStore
+
+
+class Command(BaseCommand):
+    help = "Benchmark the pure-Python and NumPy ranking aggregations on a synthetic match store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--matches", type=int, default=100_000, help="Synthetic matches (default: 100000).")
+        parser.add_argument("--players", type=int, default=500, help="Synthetic players (default: 500).")
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs (default: 3).")
+        parser.add_argument("--seed", type=int, default=16)
+
+    def handle(self, *args, **options):
+        store = build_synthetic_store(options["matches"], options["players"], options["seed"])
+        self.stdout.write(
+            f"Synthetic store: {len(store)} matches, {len(store.player_ids)} players, "
+            f"{store.nbytes() / 1024:.0f} KiB of match columns"
+        )
+
+        python_stats = best_of(options["repeat"], lambda: (store.scope_stats(), store.pair_stats()))
+        self.stdout.write(f"  python: {python_stats[0] * 1000:.1f} ms")
+
+        if not ranking_numpy.numpy_available():
+            self.stdout.write(self.style.WARNING("NumPy is not installed; only the Python path was measured."))
+            return
+
+        numpy_stats = best_of(
+            options["repeat"],
+            lambda: (ranking_numpy.scope_stats(store), ranking_numpy.pair_stats(store)),
+        )
+        self.stdout.write(f"  numpy:  {numpy_stats[0] * 1000:.1f} ms")
+        if numpy_stats[1] != python_stats[1]:
+            self.stderr.write(self.style.ERROR("NumPy results differ from the Python path."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Done. Speedup x{python_stats[0] / numpy_stats[0]:.1f}."))
+
+
+def build_synthetic_store(matches: int, players: int, seed: int) -> MatchStore:
+    rng = random.Random(seed)
+    genders = ["M", "F"]
+    store = MatchStore(version="synthetic", history_version="synthetic")
+    store.append_players((player_id, f"Player {player_id:05d}", genders[player_id % 2]) for player_id in range(1, players + 1))
+    first_day = date(2020, 1, 1).toordinal()
+    store.append_matches(
+        (
+            match_id,
+            *rng.sample(range(1, players + 1), 4),
+            rng.choice((1, 2)),
+            rng.choice(("M", "F", "X")),
+            date.fromordinal(first_day + match_id % 2_000),
+        )
+        for match_id in range(1, matches + 1)
+    )
+    return store
+
+
+def best_of(repeat: int, run):
+    best, result = None, None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
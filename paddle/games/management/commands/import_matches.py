@@ -0,0 +1,281 @@
+import csv
+import json
+import os
+import sys
+from datetime import date
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from games.models import (
+    Group,
+    Match,
+    MatchParticipant,
+    Player,
+    bump_group_data_version,
+    get_default_group,
+    group_write_lock,
+    rebuild_group_rankings,
+)
+
+FIELDS = ("date_played", "team1_player1", "team1_player2", "team2_player1", "team2_player2", "winning_team")
+SLOTS = FIELDS[1:5]
+
+
+class Command(BaseCommand):
+    help = (
+        "Import historical matches from CSV or NDJSON (columns: "
+        + ", ".join(FIELDS)
+        + ") in bulk, then re-rank the group once. Players must already exist in the group "
+        "(matched case-insensitively) unless --create-players is given; their gender is then read "
+        "from optional <slot>_gender columns (M/F, e.g. team1_player1_gender) or --default-gender."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for stdin.")
+        parser.add_argument("--format", choices=("csv", "ndjson"), help="Input format (default: from the extension).")
+        parser.add_argument(
+            "--group",
+            dest="group_slug",
+            help="Slug of the group the matches and players belong to (default: the default group).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Matches per bulk insert (default: 500).")
+        parser.add_argument(
+            "--checkpoint",
+            help="File recording the rows already imported; an interrupted import resumes after them.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Validate and resolve every row without writing.")
+        parser.add_argument(
+            "--create-players",
+            action="store_true",
+            help="Create the players missing from the group instead of rejecting their rows.",
+        )
+        parser.add_argument(
+            "--default-gender",
+            choices=(Player.GENDER_MALE, Player.GENDER_FEMALE),
+            help="Gender of created players without a <slot>_gender value (default: unset).",
+        )
+
+    def handle(self, *args, **options):
+        group = self._group(options["group_slug"])
+        batch_size = max(options["batch_size"], 1)
+        dry_run = options["dry_run"]
+        self.create_players = options["create_players"]
+        self.dry_run = dry_run
+        self.default_gender = options["default_gender"]
+        checkpoint = None if dry_run else options["checkpoint"]
+        source = options["path"]
+        done_rows = self._read_checkpoint(checkpoint, source)
+        if done_rows:
+            self.stdout.write(f"Resuming after row {done_rows} (checkpoint {checkpoint}).")
+
+        self.players_by_name: dict[str, tuple[int, str | None]] = {}
+        self.seen_signatures: set[str] = set()
+        totals = {"imported": 0, "duplicates": 0, "invalid": 0}
+        row_number = done_rows
+        records = islice(self._records(source, options["format"]), done_rows, None)
+        while True:
+            chunk = list(islice(records, batch_size))
+            if not chunk:
+                break
+            first_row = row_number + 1
+            row_number += len(chunk)
+            matches = self._build_matches(group, chunk, first_row, totals)
+            if matches and not dry_run:
+                inserted = self._save_matches(group, matches)
+                # Stored by another writer since `_build_matches` checked.
+                totals["duplicates"] += len(matches) - len(inserted)
+                matches = inserted
+            totals["imported"] += len(matches)
+            self._write_checkpoint(checkpoint, source, row_number)
+            self.stdout.write(
+                f"  rows {row_number}: {totals['imported']} imported, "
+                f"{totals['duplicates']} duplicates, {totals['invalid']} invalid"
+            )
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f"Dry run. {totals['imported']} matches would be imported."))
+            return
+        if totals["imported"] or done_rows:
+            self.stdout.write(f"Re-ranking {group.slug}...")
+            rebuild_group_rankings(group)
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(f"Done. Imported {totals['imported']} matches."))
+
+    def _group(self, slug):
+        if not slug:
+            return get_default_group()
+        group = Group.objects.filter(slug=slug).first()
+        if group is None:
+            raise CommandError(f"Unknown group {slug!r}.")
+        return group
+
+    def _records(self, source, input_format):
+        input_format = input_format or ("ndjson" if source.endswith((".ndjson", ".jsonl")) else "csv")
+        stream = sys.stdin if source == "-" else open(source, newline="", encoding="utf-8")
+        try:
+            if input_format == "csv":
+                yield from csv.DictReader(stream)
+            else:
+                for line in stream:
+                    if line.strip():
+                        yield json.loads(line)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def _read_checkpoint(self, checkpoint, source) -> int:
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint, encoding="utf-8") as handle:
+            state = json.load(handle)
+        if state.get("source") != os.path.abspath(source):
+            raise CommandError(f"Checkpoint {checkpoint} belongs to {state.get('source')}.")
+        return int(state["rows"])
+
+    def _write_checkpoint(self, checkpoint, source, rows):
+        if not checkpoint:
+            return
+        with open(f"{checkpoint}.tmp", "w", encoding="utf-8") as handle:
+            json.dump({"source": os.path.abspath(source), "rows": rows}, handle)
+        os.replace(f"{checkpoint}.tmp", checkpoint)
+
+    def _resolve_players(self, group, names):
+        """
+        Loads the unknown names of `names` with one query, matching names
+        case-insensitively like the `unique_lower_name` constraint.
+        """
+        missing = {name for name in names if name not in self.players_by_name}
+        if not missing:
+            return
+        rows = (
+            Player.objects.filter(group=group)
+            .annotate(lower_name=Lower("name"))
+            .filter(lower_name__in=missing)
+            .values_list("lower_name", "id", "gender")
+        )
+        for lower_name, player_id, gender in rows:
+            self.players_by_name[lower_name] = (player_id, gender)
+
+    def _create_players(self, group, chunk):
+        """
+        Creates the players of `chunk` still unknown after `_resolve_players`,
+        with the gender of their first `<slot>_gender` value.
+        """
+        for record in chunk:
+            for slot in SLOTS:
+                name = str(record.get(slot) or "").strip()
+                if not name or name.lower() in self.players_by_name:
+                    continue
+                gender = str(record.get(f"{slot}_gender") or "").strip().upper() or self.default_gender
+                if gender not in (Player.GENDER_MALE, Player.GENDER_FEMALE):
+                    gender = self.default_gender
+                if self.dry_run:
+                    # Placeholder id, never written.
+                    self.players_by_name[name.lower()] = (-len(self.players_by_name) - 1, gender)
+                    continue
+                try:
+                    with transaction.atomic():
+                        player = Player.objects.create(name=name, gender=gender, group=group)
+                except IntegrityError:
+                    # The name is taken (case-insensitively) outside the group;
+                    # its rows are reported as unknown players.
+                    continue
+                self.players_by_name[name.lower()] = (player.pk, gender)
+                self.stdout.write(f"  created player {name!r}")
+
+    def _build_matches(self, group, chunk, first_row, totals) -> list[Match]:
+        names = {str(record.get(slot) or "").strip().lower() for record in chunk for slot in SLOTS}
+        self._resolve_players(group, names)
+        if self.create_players:
+            self._create_players(group, chunk)
+
+        matches, errors = [], []
+        for row_number, record in enumerate(chunk, start=first_row):
+            try:
+                matches.append(self._build_match(group, record))
+            except ValueError as exc:
+                errors.append(f"  row {row_number}: {exc}")
+        totals["invalid"] += len(errors)
+        for error in errors:
+            self.stderr.write(error)
+
+        stored = set(
+            Match.objects.filter(signature__in=[match.signature for match in matches]).values_list(
+                "signature", flat=True
+            )
+        )
+        unique = []
+        for match in matches:
+            if match.signature in stored or match.signature in self.seen_signatures:
+                totals["duplicates"] += 1
+                continue
+            self.seen_signatures.add(match.signature)
+            unique.append(match)
+        return unique
+
+    def _build_match(self, group, record) -> Match:
+        try:
+            date_played = date.fromisoformat(str(record.get("date_played") or "").strip())
+        except ValueError:
+            raise ValueError(f"invalid date {record.get('date_played')!r}") from None
+        winning_team = str(record.get("winning_team") or "").strip()
+        if winning_team not in ("1", "2"):
+            raise ValueError(f"winning_team must be 1 or 2, got {record.get('winning_team')!r}")
+        players = []
+        for slot in SLOTS:
+            name = str(record.get(slot) or "").strip()
+            player = self.players_by_name.get(name.lower())
+            if player is None:
+                raise ValueError(f"unknown player {name!r}")
+            players.append(player)
+        player_ids = [player_id for player_id, _ in players]
+        if len(set(player_ids)) != 4:
+            raise ValueError("repeated players")
+
+        match = Match(
+            group=group,
+            team1_player1_id=player_ids[0],
+            team1_player2_id=player_ids[1],
+            team2_player1_id=player_ids[2],
+            team2_player2_id=player_ids[3],
+            winning_team=int(winning_team),
+            date_played=date_played,
+            match_gender_type=Match.gender_type_for_genders(gender for _, gender in players),
+        )
+        match.signature = match.compute_signature()
+        return match
+
+    def _save_matches(self, group, matches) -> list[Match]:
+        """
+        Inserts `matches` and their participants and returns the inserted ones;
+        matches whose signature was stored meanwhile are skipped.
+        """
+        # Bulk inserts bypass `Match.save`; participants are written here and
+        # rankings are rebuilt once at the end of the import.
+        signatures = [match.signature for match in matches]
+        with group_write_lock(group.pk, updates_rankings=False):
+            # Signatures embed the group, so under its lock this check is exact
+            # and a plain insert cannot conflict (Oracle has no ignore_conflicts).
+            stored = set(Match.objects.filter(signature__in=signatures).values_list("signature", flat=True))
+            inserted = [match for match in matches if match.signature not in stored]
+            if not inserted:
+                return inserted
+            Match.objects.bulk_create(inserted)
+            if any(match.pk is None for match in inserted):
+                # Backends that do not return primary keys from bulk inserts.
+                ids = dict(
+                    Match.objects.filter(signature__in=[match.signature for match in inserted]).values_list(
+                        "signature", "id"
+                    )
+                )
+                for match in inserted:
+                    match.pk = ids[match.signature]
+            MatchParticipant.objects.bulk_create(
+                [participant for match in inserted for participant in match.build_participants()]
+            )
+            bump_group_data_version(group.pk)
+        return inserted
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from games.models import Group, update_player_rankings
+
+
+class Command(BaseCommand):
+    help = "Rebuild persisted ranking counters and positions from match history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group",
+            dest="group_slug",
+            help="Only rebuild the group with this slug (default: every group).",
+        )
+
+    def handle(self, *args, **options):
+        groups = Group.objects.order_by("id")
+        if options["group_slug"]:
+            groups = groups.filter(slug=options["group_slug"])
+
+        rebuilt = 0
+        for group in groups:
+            with transaction.atomic():
+                update_player_rankings(group=group)
+            rebuilt += 1
+            self.stdout.write(f"  rebuilt {group.slug}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Rebuilt {rebuilt} groups."))
@@ -0,0 +1,63 @@
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from games.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (ranking and americano standings recomputations)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=1, help="Worker threads (default: 1).")
+        parser.add_argument("--once", action="store_true", help="Run every due job, then exit.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to sleep when the queue is empty (default: JOBS_POLL_INTERVAL).",
+        )
+        parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            processed = run_pending_jobs(options["worker_id"])
+            self.stdout.write(f"Ran {processed} jobs.")
+            return
+
+        poll_interval = options["poll_interval"]
+        if poll_interval is None:
+            poll_interval = settings.JOBS_POLL_INTERVAL
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(f"{options['worker_id']}-{number}", poll_interval, stop),
+                daemon=True,
+            )
+            for number in range(1, max(options["threads"], 1) + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Running {len(threads)} job worker threads.")
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _work(self, worker_id, poll_interval, stop):
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                if not run_pending_jobs(worker_id):
+                    stop.wait(poll_interval)
+        finally:
+            connection.close()
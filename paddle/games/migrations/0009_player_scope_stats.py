@@ -0,0 +1,123 @@
+# Generated by Django 5.2.14 on 2026-10-18 10:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SCOPE_BY_MATCH_GENDER_TYPE = {"M": "male", "F": "female", "X": "mixed"}
+
+
+def backfill_player_scope_stats(apps, schema_editor):
+    Match = apps.get_model("games", "Match")
+    PlayerScopeStats = apps.get_model("games", "PlayerScopeStats")
+
+    computed = {}
+    for (
+        group_id,
+        team1_player1_id,
+        team1_player2_id,
+        team2_player1_id,
+        team2_player2_id,
+        winning_team,
+        match_gender_type,
+    ) in Match.objects.values_list(
+        "group_id",
+        "team1_player1_id",
+        "team1_player2_id",
+        "team2_player1_id",
+        "team2_player2_id",
+        "winning_team",
+        "match_gender_type",
+    ).iterator():
+        winner_ids = (team1_player1_id, team1_player2_id) if winning_team == 1 else (
+            team2_player1_id,
+            team2_player2_id,
+        )
+        scopes = ["all"]
+        if match_gender_type in SCOPE_BY_MATCH_GENDER_TYPE:
+            scopes.append(SCOPE_BY_MATCH_GENDER_TYPE[match_gender_type])
+        for scope in scopes:
+            for player_id in (team1_player1_id, team1_player2_id, team2_player1_id, team2_player2_id):
+                row = computed.setdefault((group_id, scope, player_id), [0, 0])
+                row[1] += 1
+                if player_id in winner_ids:
+                    row[0] += 1
+
+    PlayerScopeStats.objects.bulk_create(
+        [
+            PlayerScopeStats(
+                group_id=group_id,
+                scope=scope,
+                player_id=player_id,
+                wins=wins,
+                matches=matches,
+                losses=matches - wins,
+            )
+            for (group_id, scope, player_id), (wins, matches) in computed.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0007_remove_player_unique_lower_name_per_group_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerScopeStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("all", "All"),
+                            ("male", "Male"),
+                            ("female", "Female"),
+                            ("mixed", "Mixed"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                ("wins", models.PositiveIntegerField(default=0)),
+                ("matches", models.PositiveIntegerField(default=0)),
+                ("losses", models.PositiveIntegerField(default=0)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="player_scope_stats",
+                        to="games.group",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="scope_stats",
+                        to="games.player",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("group", "scope", "player"),
+                        name="unique_player_scope_stats",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_player_scope_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.14 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+# Frozen copies of the scope rules and the canonical ranking policy as of this
+# migration, so later changes to application code do not alter it.
+GENDER_BY_SCOPE = {"male": "M", "female": "F"}
+
+
+def canonical_ranking_tie_key(*, wins, win_rate, matches):
+    return (wins, round(win_rate, 2), matches)
+
+
+def canonical_ranking_sort_key(*, wins, win_rate, matches, name):
+    return (-wins, -round(win_rate, 2), matches, name.lower())
+
+
+def backfill_scope_positions(apps, schema_editor):
+    PlayerScopeStats = apps.get_model("games", "PlayerScopeStats")
+
+    rows_by_group_scope = {}
+    for stats in PlayerScopeStats.objects.select_related("player"):
+        rows_by_group_scope.setdefault((stats.group_id, stats.scope), []).append(stats)
+
+    to_update = []
+    for (_, scope), rows in rows_by_group_scope.items():
+        ranked = [
+            stats
+            for stats in rows
+            if stats.matches > 0
+            and (scope not in GENDER_BY_SCOPE or stats.player.gender == GENDER_BY_SCOPE[scope])
+        ]
+        ranked.sort(
+            key=lambda stats: canonical_ranking_sort_key(
+                wins=stats.wins,
+                win_rate=(stats.wins / stats.matches) * 100,
+                matches=stats.matches,
+                name=stats.player.name,
+            )
+        )
+        last_tie_key = None
+        last_rank = 0
+        for ordinal, stats in enumerate(ranked, start=1):
+            tie_key = canonical_ranking_tie_key(
+                wins=stats.wins,
+                win_rate=(stats.wins / stats.matches) * 100,
+                matches=stats.matches,
+            )
+            if tie_key != last_tie_key:
+                last_tie_key = tie_key
+                last_rank = ordinal
+            stats.position = last_rank
+            stats.ordinal = ordinal
+            to_update.append(stats)
+
+    PlayerScopeStats.objects.bulk_update(to_update, ["position", "ordinal"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0009_player_scope_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="playerscopestats",
+            name="ordinal",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="playerscopestats",
+            name="position",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="playerscopestats",
+            index=models.Index(
+                fields=["group", "scope", "position"],
+                name="player_scope_stats_position",
+            ),
+        ),
+        migrations.RunPython(backfill_scope_positions, migrations.RunPython.noop),
+    ]
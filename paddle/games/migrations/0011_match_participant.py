@@ -0,0 +1,103 @@
+# Generated by Django 5.2.14 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def backfill_match_participants(apps, schema_editor):
+    Match = apps.get_model("games", "Match")
+    MatchParticipant = apps.get_model("games", "MatchParticipant")
+
+    batch = []
+    for match in Match.objects.order_by("pk").iterator(chunk_size=BATCH_SIZE):
+        slots = (
+            (1, match.team1_player1_id),
+            (1, match.team1_player2_id),
+            (2, match.team2_player1_id),
+            (2, match.team2_player2_id),
+        )
+        winner_ids = {player_id for team_number, player_id in slots if team_number == match.winning_team}
+        seen_player_ids = set()
+        for team_number, player_id in slots:
+            if player_id in seen_player_ids:
+                continue
+            seen_player_ids.add(player_id)
+            batch.append(
+                MatchParticipant(
+                    match_id=match.pk,
+                    player_id=player_id,
+                    group_id=match.group_id,
+                    team=team_number,
+                    is_win=player_id in winner_ids,
+                    date_played=match.date_played,
+                    match_gender_type=match.match_gender_type,
+                )
+            )
+        if len(batch) >= BATCH_SIZE:
+            MatchParticipant.objects.bulk_create(batch)
+            batch = []
+    MatchParticipant.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0010_player_scope_stats_positions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchParticipant",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("team", models.PositiveSmallIntegerField(choices=[(1, "Team 1"), (2, "Team 2")])),
+                ("is_win", models.BooleanField(default=False)),
+                ("date_played", models.DateField()),
+                (
+                    "match_gender_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[("U", "Unknown"), ("M", "Men"), ("F", "Women"), ("X", "Mixed")],
+                        max_length=1,
+                        null=True,
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="match_participants",
+                        to="games.group",
+                    ),
+                ),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="participants",
+                        to="games.match",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="participations",
+                        to="games.player",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["player", "date_played"], name="match_participant_history"),
+                    models.Index(fields=["player", "is_win"], name="match_participant_wins"),
+                    models.Index(fields=["group", "player", "match_gender_type"], name="match_participant_scope"),
+                ],
+                "constraints": [models.UniqueConstraint(fields=("match", "player"), name="unique_match_participant")],
+            },
+        ),
+        migrations.RunPython(backfill_match_participants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.14 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def drop_auto_created_matches_table(apps, schema_editor):
+    # Participant rows were backfilled in 0011; the plain M2M table carries nothing else.
+    Player = apps.get_model("games", "Player")
+    schema_editor.delete_model(Player._meta.get_field("matches").remote_field.through)
+
+
+def restore_auto_created_matches_table(apps, schema_editor):
+    Player = apps.get_model("games", "Player")
+    MatchParticipant = apps.get_model("games", "MatchParticipant")
+    PlayerMatches = Player._meta.get_field("matches").remote_field.through
+    schema_editor.create_model(PlayerMatches)
+
+    batch = []
+    for player_id, match_id in MatchParticipant.objects.order_by("pk").values_list("player_id", "match_id").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        batch.append(PlayerMatches(player_id=player_id, match_id=match_id))
+        if len(batch) >= BATCH_SIZE:
+            PlayerMatches.objects.bulk_create(batch)
+            batch = []
+    PlayerMatches.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0011_match_participant"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(drop_auto_created_matches_table, restore_auto_created_matches_table),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="player",
+                    name="matches",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="players",
+                        through="games.MatchParticipant",
+                        through_fields=("player", "match"),
+                        to="games.match",
+                    ),
+                ),
+            ],
+        ),
+    ]
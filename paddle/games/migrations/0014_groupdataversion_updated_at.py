@@ -0,0 +1,19 @@
+# Generated by Django 5.2.14 on 2026-10-18 13:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0013_group_data_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="groupdataversion",
+            name="updated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
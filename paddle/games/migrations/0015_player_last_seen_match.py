@@ -0,0 +1,22 @@
+# Generated by Django 5.2.14 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0014_groupdataversion_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="last_seen_match_id",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="matchparticipant",
+            index=models.Index(fields=["player", "match"], name="match_participant_player_match"),
+        ),
+    ]
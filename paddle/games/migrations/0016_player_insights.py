@@ -0,0 +1,31 @@
+# Generated by Django 5.2.14 on 2026-10-18 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0015_player_last_seen_match"),
+    ]
+
+    # Snapshots are built lazily from match history on first read.
+    operations = [
+        migrations.CreateModel(
+            name="PlayerInsights",
+            fields=[
+                (
+                    "player",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="insights",
+                        serialize=False,
+                        to="games.player",
+                    ),
+                ),
+                ("data", models.JSONField(default=dict)),
+            ],
+        ),
+    ]
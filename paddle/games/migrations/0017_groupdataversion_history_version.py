@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0016_player_insights"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="groupdataversion",
+            name="history_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
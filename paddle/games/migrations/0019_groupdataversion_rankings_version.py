@@ -0,0 +1,25 @@
+# Generated by Django 5.2.14 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+def backfill_rankings_version(apps, schema_editor):
+    # Persisted rankings are kept up to date synchronously until now.
+    GroupDataVersion = apps.get_model("games", "GroupDataVersion")
+    GroupDataVersion.objects.update(rankings_version=models.F("version"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0018_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="groupdataversion",
+            name="rankings_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rankings_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.14 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+def backfill_match_signatures(apps, schema_editor):
+    Match = apps.get_model("games", "Match")
+
+    seen = set()
+    matches = []
+    for match in Match.objects.order_by("pk").only(
+        "id",
+        "group_id",
+        "date_played",
+        "team1_player1_id",
+        "team1_player2_id",
+        "team2_player1_id",
+        "team2_player2_id",
+    ).iterator():
+        teams = sorted(
+            tuple(sorted(team))
+            for team in (
+                (match.team1_player1_id, match.team1_player2_id),
+                (match.team2_player1_id, match.team2_player2_id),
+            )
+        )
+        signature = f"{match.group_id}:{match.date_played}:" + ":".join(f"{first}-{second}" for first, second in teams)
+        # Keep existing duplicates, disambiguated by their primary key.
+        match.signature = signature if signature not in seen else f"{signature}#{match.pk}"
+        seen.add(signature)
+        matches.append(match)
+    Match.objects.bulk_update(matches, ["signature"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0019_groupdataversion_rankings_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="signature",
+            field=models.CharField(blank=True, editable=False, max_length=120, null=True),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="idempotency_key",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_match_signatures, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(fields=("signature",), name="unique_match_signature"),
+        ),
+        migrations.AddConstraint(
+            model_name="match",
+            constraint=models.UniqueConstraint(
+                models.Case(models.When(idempotency_key__isnull=False, then=models.F("group"))),
+                models.Case(models.When(idempotency_key__isnull=False, then=models.F("idempotency_key"))),
+                name="unique_match_idempotency_key",
+            ),
+        ),
+    ]
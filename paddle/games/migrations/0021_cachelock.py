@@ -0,0 +1,22 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0020_match_signature_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheLock",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=250, unique=True)),
+                ("token", models.CharField(max_length=32)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+def drop_duplicate_pending_jobs(apps, schema_editor):
+    # Coalescing used to be check-then-insert; keep the oldest pending job of each (kind, key).
+    Job = apps.get_model("games", "Job")
+    seen = set()
+    duplicates = []
+    for pk, kind, key in Job.objects.filter(status="pending").order_by("pk").values_list("pk", "kind", "key"):
+        if (kind, key) in seen:
+            duplicates.append(pk)
+        seen.add((kind, key))
+    Job.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("games", "0021_cachelock"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_pending_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="job",
+            constraint=models.UniqueConstraint(
+                models.Case(models.When(status="pending", then=models.F("kind"))),
+                models.Case(models.When(status="pending", then=models.F("key"))),
+                name="unique_pending_job",
+            ),
+        ),
+    ]
@@ -1,9 +1,15 @@
 # absolute path: /workspaces/paddle/paddle/games/models.py
 
+import bisect
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
 from django.db.models.functions import Lower
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -44,105 +50,393 @@ class Group(models.Model):
         return self.name
 
 
-def update_player_rankings(*, group=None):
+def bump_group_data_version(group_id, *, rewrite: bool = True) -> None:
     """
-    Recalculates persisted `ranking_position` using the canonical ranking policy.
+    Marks every cached ranking result of the group as outdated.
+
+    `rewrite=False` is reserved for pure appends (a new match or player): the
+    in-memory match stores of the group can then be extended in place instead
+    of reloaded.
+    """
+    changes = {"version": models.F("version") + 1, "updated_at": timezone.now()}
+    if rewrite:
+        changes["history_version"] = models.F("history_version") + 1
+    if GroupDataVersion.objects.filter(group_id=group_id).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            GroupDataVersion.objects.create(group_id=group_id, version=1, history_version=1 if rewrite else 0)
+    except IntegrityError:
+        # Created concurrently by another writer.
+        GroupDataVersion.objects.filter(group_id=group_id).update(**changes)
 
-    Canonical policy is shared with frontend ranking pages:
-    - sort key: wins desc, rounded win rate (2dp) desc, matches asc, name asc
-    - tie key: wins + rounded win rate + matches
-    - position style: competition ranking ("1224")
 
-    Players with zero matches are persisted as unranked (`ranking_position = 0`).
+def _lock_group_data_version(group_id):
     """
-    from frontend.services.ranking import canonical_ranking_sort_key, canonical_ranking_tie_key
+    Row-locks the `GroupDataVersion` of a group until the current transaction
+    ends (creating it first if needed) and returns it.
+    """
+    if not GroupDataVersion.objects.filter(group_id=group_id).exists():
+        try:
+            with transaction.atomic():
+                GroupDataVersion.objects.create(group_id=group_id)
+        except IntegrityError:
+            # Created concurrently by another writer.
+            pass
+    return GroupDataVersion.objects.select_for_update().get(group_id=group_id)
 
-    players_qs = Player.objects.all()
-    matches_qs = Match.objects.all()
-    if group is not None:
-        players_qs = players_qs.filter(group=group)
-        matches_qs = matches_qs.filter(group=group)
 
-    players = list(players_qs)
-    if not players:
-        return
+@contextmanager
+def group_write_lock(*group_ids, updates_rankings: bool = True):
+    """
+    Transaction holding the ranking write lock of `group_ids` (locked in id
+    order), so concurrent match writes of a group apply their effects one
+    after the other instead of interleaving position writes.
+
+    Persisted rankings that were current when the lock was taken stay current
+    through synchronous delta updates, so `rankings_version` follows `version`;
+    with background jobs (or writes that leave rankings to a later rebuild,
+    `updates_rankings=False`) they are only current again after the next rebuild.
+    """
+    from .jobs import background_jobs_enabled
 
-    matches_qs = matches_qs.select_related(
-        "team1_player1", "team1_player2", "team2_player1", "team2_player2"
+    with transaction.atomic():
+        locked = [_lock_group_data_version(group_id) for group_id in sorted(set(group_ids))]
+        yield
+        current_ids = [row.group_id for row in locked if row.rankings_version == row.version]
+        if current_ids and updates_rankings and not background_jobs_enabled():
+            GroupDataVersion.objects.filter(group_id__in=current_ids).update(rankings_version=models.F("version"))
+
+
+def _stats_win_rate(stats) -> float:
+    if not stats.matches:
+        return 0.0
+    return (stats.wins / stats.matches) * 100
+
+
+def _stats_sort_key(stats) -> tuple:
+    from frontend.services.ranking import canonical_ranking_sort_key
+
+    return canonical_ranking_sort_key(
+        wins=stats.wins,
+        win_rate=_stats_win_rate(stats),
+        matches=stats.matches,
+        name=stats.player.name,
     )
-    stats: dict[int, dict[str, int]] = {}
-
-    for match in matches_qs:
-        match_players = [
-            match.team1_player1,
-            match.team1_player2,
-            match.team2_player1,
-            match.team2_player2,
-        ]
-        for player in match_players:
-            row = stats.setdefault(player.id, {"matches": 0, "wins": 0})
-            row["matches"] += 1
 
-        winners = [match.team1_player1, match.team1_player2] if match.winning_team == 1 else [
-            match.team2_player1,
-            match.team2_player2,
-        ]
-        for winner in winners:
-            stats[winner.id]["wins"] += 1
-
-    ranked_players: list[Player] = []
-    unranked_players: list[Player] = []
-    for player in players:
-        row = stats.get(player.id)
-        if not row or row["matches"] == 0:
-            unranked_players.append(player)
-            continue
 
-        matches_played = row["matches"]
-        wins = row["wins"]
-        win_rate = (wins / matches_played) * 100 if matches_played else 0.0
-        player._ranking_wins = wins
-        player._ranking_matches = matches_played
-        player._ranking_win_rate = win_rate
-        ranked_players.append(player)
-
-    ranked_players.sort(
-        key=lambda player: canonical_ranking_sort_key(
-            wins=player._ranking_wins,
-            win_rate=player._ranking_win_rate,
-            matches=player._ranking_matches,
-            name=player.name,
-        )
+def _stats_tie_key(stats) -> tuple:
+    from frontend.services.ranking import canonical_ranking_tie_key
+
+    return canonical_ranking_tie_key(
+        wins=stats.wins,
+        win_rate=_stats_win_rate(stats),
+        matches=stats.matches,
     )
 
+
+def _in_scope_population(scope: str, player) -> bool:
+    if scope == PlayerScopeStats.SCOPE_MALE:
+        return player.gender == Player.GENDER_MALE
+    if scope == PlayerScopeStats.SCOPE_FEMALE:
+        return player.gender == Player.GENDER_FEMALE
+    return True
+
+
+def _is_ranked_in_scope(stats) -> bool:
+    return stats.matches > 0 and _in_scope_population(stats.scope, stats.player)
+
+
+def _persist_scope_positions(scope: str, ranked_stats, unranked_stats) -> None:
+    """
+    Assigns competition positions ("1224") and ordinals to already-sorted stats
+    rows of one scope and writes only the rows whose persisted values changed,
+    with one batched CASE UPDATE per table instead of one UPDATE per row.
+
+    The "all" scope position is mirrored into `Player.ranking_position`.
+    """
+    mirror_player_position = scope == PlayerScopeStats.SCOPE_ALL
+    changed_stats = []
+    changed_players = []
+
+    def assign(stats, position: int, ordinal: int) -> None:
+        if (stats.position, stats.ordinal) != (position, ordinal):
+            stats.position = position
+            stats.ordinal = ordinal
+            changed_stats.append(stats)
+        player = stats.player
+        if mirror_player_position and player.ranking_position != position:
+            player.ranking_position = position
+            changed_players.append(player)
+
     last_tie_key = None
     last_rank = 0
-    for ordinal, player in enumerate(ranked_players, start=1):
-        tie_key = canonical_ranking_tie_key(
-            wins=player._ranking_wins,
-            win_rate=player._ranking_win_rate,
-            matches=player._ranking_matches,
-        )
+    for ordinal, stats in enumerate(ranked_stats, start=1):
+        tie_key = _stats_tie_key(stats)
         if tie_key != last_tie_key:
             last_tie_key = tie_key
             last_rank = ordinal
+        assign(stats, last_rank, ordinal)
+
+    for stats in unranked_stats:
+        assign(stats, 0, 0)
+
+    if changed_stats:
+        PlayerScopeStats.objects.bulk_update(changed_stats, ["position", "ordinal"], batch_size=500)
+    if changed_players:
+        Player.objects.bulk_update(changed_players, ["ranking_position"], batch_size=500)
+
+
+def _apply_scope_stats_delta(group, scopes, delta: dict[int, tuple[int, int]]) -> None:
+    """
+    Applies per-player `(matches_delta, wins_delta)` to the `PlayerScopeStats`
+    rows of `scopes`, creating missing rows first.
+    """
+    player_ids = list(delta)
+    existing = set(
+        PlayerScopeStats.objects.filter(group=group, scope__in=scopes, player_id__in=player_ids)
+        .values_list("scope", "player_id")
+    )
+    missing = [
+        PlayerScopeStats(group=group, scope=scope, player_id=player_id)
+        for scope in scopes
+        for player_id in player_ids
+        if (scope, player_id) not in existing
+    ]
+    if missing:
+        PlayerScopeStats.objects.bulk_create(missing)
+
+    player_ids_by_change: dict[tuple[int, int], list[int]] = {}
+    for player_id, change in delta.items():
+        player_ids_by_change.setdefault(change, []).append(player_id)
+    for (matches_delta, wins_delta), changed_ids in player_ids_by_change.items():
+        PlayerScopeStats.objects.filter(group=group, scope__in=scopes, player_id__in=changed_ids).update(
+            matches=models.F("matches") + matches_delta,
+            wins=models.F("wins") + wins_delta,
+            losses=models.F("losses") + (matches_delta - wins_delta),
+        )
+
+
+def _apply_scope_positions_delta(group, scope: str, changed_player_ids) -> None:
+    """
+    Moves only the changed players inside the persisted ordering of one scope.
+
+    Unaffected players keep their relative order because their sort keys did not
+    change, so match history is never scanned.
+    """
+    stats_rows = list(
+        PlayerScopeStats.objects.filter(group=group, scope=scope)
+        .filter(models.Q(ordinal__gt=0) | models.Q(player_id__in=changed_player_ids))
+        .select_related("player")
+        .order_by("ordinal")
+    )
+
+    ranked_stats = [stats for stats in stats_rows if stats.player_id not in changed_player_ids]
+    unranked_stats = []
+    for stats in stats_rows:
+        if stats.player_id not in changed_player_ids:
+            continue
+        if _is_ranked_in_scope(stats):
+            bisect.insort(ranked_stats, stats, key=_stats_sort_key)
+        else:
+            unranked_stats.append(stats)
+
+    _persist_scope_positions(scope, ranked_stats, unranked_stats)
+
+
+def update_scope_positions(*, group, scopes) -> None:
+    """
+    Re-sorts the persisted positions of `scopes` from the current stats rows.
+
+    Used when the scope population changes without a match change (for example
+    a player gender edit moves the player between the male and female rankings).
+    """
+    bump_group_data_version(group.pk)
+    for scope in scopes:
+        stats_rows = list(
+            PlayerScopeStats.objects.filter(group=group, scope=scope).select_related("player")
+        )
+        ranked_stats = sorted(
+            (stats for stats in stats_rows if _is_ranked_in_scope(stats)),
+            key=_stats_sort_key,
+        )
+        unranked_stats = [stats for stats in stats_rows if not _is_ranked_in_scope(stats)]
+        _persist_scope_positions(scope, ranked_stats, unranked_stats)
+
+
+def _scope_stats_from_matches(matches_qs) -> dict[tuple[int, str, int], list[int]]:
+    """
+    Counts `[wins, matches]` per (group, scope, player) from match team slots.
+    """
+    computed: dict[tuple[int, str, int], list[int]] = {}
+    for (
+        group_id,
+        team1_player1_id,
+        team1_player2_id,
+        team2_player1_id,
+        team2_player2_id,
+        winning_team,
+        match_gender_type,
+    ) in matches_qs.values_list(
+        "group_id",
+        "team1_player1_id",
+        "team1_player2_id",
+        "team2_player1_id",
+        "team2_player2_id",
+        "winning_team",
+        "match_gender_type",
+    ):
+        winner_ids = (team1_player1_id, team1_player2_id) if winning_team == 1 else (
+            team2_player1_id,
+            team2_player2_id,
+        )
+        for scope in PlayerScopeStats.scopes_for_match_gender_type(match_gender_type):
+            for player_id in (team1_player1_id, team1_player2_id, team2_player1_id, team2_player2_id):
+                row = computed.setdefault((group_id, scope, player_id), [0, 0])
+                row[1] += 1
+                if player_id in winner_ids:
+                    row[0] += 1
+    return computed
+
+
+def _rebuild_scope_stats(*, group=None) -> None:
+    """
+    Recomputes every `PlayerScopeStats` row in scope from match history.
+    """
+    matches_qs = Match.objects.all()
+    stats_qs = PlayerScopeStats.objects.all()
+    if group is not None:
+        matches_qs = matches_qs.filter(group=group)
+        stats_qs = stats_qs.filter(group=group)
+
+    if group is not None and settings.RANKING_ENGINE == "sql":
+        from frontend.services.ranking_sql import aggregate_player_scope_stats
+
+        stats_by_scope, _ = aggregate_player_scope_stats(group=group)
+        computed = {
+            (group.pk, scope, player_id): [row["wins"], row["matches"]]
+            for scope, rows in stats_by_scope.items()
+            for player_id, row in rows.items()
+        }
+    else:
+        computed = _scope_stats_from_matches(matches_qs)
+
+    existing = {(stats.group_id, stats.scope, stats.player_id): stats for stats in stats_qs}
+    to_create = []
+    to_update = []
+    for (group_id, scope, player_id), (wins, matches) in computed.items():
+        stats = existing.pop((group_id, scope, player_id), None)
+        if stats is None:
+            to_create.append(
+                PlayerScopeStats(
+                    group_id=group_id,
+                    scope=scope,
+                    player_id=player_id,
+                    wins=wins,
+                    matches=matches,
+                    losses=matches - wins,
+                )
+            )
+        elif (stats.wins, stats.matches) != (wins, matches):
+            stats.wins, stats.matches, stats.losses = wins, matches, matches - wins
+            to_update.append(stats)
+    for stats in existing.values():
+        if stats.matches or stats.wins or stats.losses:
+            stats.wins = stats.matches = stats.losses = 0
+            to_update.append(stats)
+
+    PlayerScopeStats.objects.bulk_create(to_create, batch_size=500)
+    PlayerScopeStats.objects.bulk_update(to_update, ["wins", "matches", "losses"], batch_size=500)
+
+
+def update_player_rankings(*, group=None, delta=None, scopes=None):
+    """
+    Recalculates persisted ranking positions using the canonical ranking policy.
 
-        if player.ranking_position != last_rank:
-            player.ranking_position = last_rank
-            player.save(update_fields=["ranking_position"])
+    Canonical policy is shared with frontend ranking pages:
+    - sort key: wins desc, rounded win rate (2dp) desc, matches asc, name asc
+    - tie key: wins + rounded win rate + matches
+    - position style: competition ranking ("1224")
 
-    for player in unranked_players:
-        if player.ranking_position != 0:
-            player.ranking_position = 0
-            player.save(update_fields=["ranking_position"])
+    Positions and ordinals are persisted per scope in `PlayerScopeStats`; the
+    "all" position is mirrored into `Player.ranking_position`. Players with zero
+    matches in a scope are persisted as unranked (position 0).
+
+    Modes:
+    - full (default): rebuilds every `PlayerScopeStats` row of `group` (every
+      group when omitted) from match history and re-sorts every scope. Player
+      insights snapshots of the group are dropped and rebuilt on next read.
+    - incremental: `delta` maps player ids to `(matches_delta, wins_delta)` for one
+      changed match of `group` and is applied to the stats of `scopes`; only those
+      players are moved.
+    """
+    if delta is not None:
+        if group is None:
+            raise ValueError("Incremental ranking updates require a group.")
+        changes = {player_id: change for player_id, change in delta.items() if change != (0, 0)}
+        if not changes:
+            return
+        scopes = scopes or [PlayerScopeStats.SCOPE_ALL]
+        _apply_scope_stats_delta(group, scopes, changes)
+        for scope in scopes:
+            _apply_scope_positions_delta(group, scope, set(changes))
+        return
+
+    groups = [group] if group is not None else list(Group.objects.all())
+    for ranking_group in groups:
+        rebuild_group_rankings(ranking_group)
+
+
+def rebuild_group_rankings(group, *, drop_insights: bool = True, skip_if_current: bool = False) -> bool:
+    """
+    Full-mode body of `update_player_rankings` for one group, under the group
+    write lock. Background ranking jobs keep the insights snapshots, which
+    matches update incrementally, and pass `skip_if_current` so a job waiting
+    on the lock does nothing when another rebuild already covered its writes.
+    Returns whether the rankings were rebuilt.
+    """
+    with transaction.atomic():
+        versions = _lock_group_data_version(group.pk)
+        if skip_if_current and versions.rankings_version == versions.version:
+            return False
+        _rebuild_group_rankings(group, drop_insights=drop_insights)
+        GroupDataVersion.objects.filter(group_id=group.pk).update(rankings_version=models.F("version"))
+    return True
+
+
+def _rebuild_group_rankings(group, *, drop_insights: bool) -> None:
+    _rebuild_scope_stats(group=group)
+    if drop_insights:
+        PlayerInsights.objects.filter(player__group=group).delete()
+    update_scope_positions(
+        group=group,
+        scopes=[scope for scope, _ in PlayerScopeStats.SCOPE_CHOICES],
+    )
+    ranked_player_ids = PlayerScopeStats.objects.filter(
+        group=group,
+        scope=PlayerScopeStats.SCOPE_ALL,
+        position__gt=0,
+    ).values_list("player_id", flat=True)
+    Player.objects.filter(group=group).exclude(ranking_position=0).exclude(
+        id__in=ranked_player_ids
+    ).update(ranking_position=0)
 
 
 class Player(models.Model):
     group = models.ForeignKey("Group", on_delete=models.CASCADE, related_name="players", default=get_default_group_id)
     name = models.CharField(max_length=100)
     registered_user = models.OneToOneField(User, on_delete=models.SET_NULL, null=True, blank=True)
-    matches = models.ManyToManyField('Match', related_name='players', blank=True)
+    matches = models.ManyToManyField(
+        'Match',
+        through='MatchParticipant',
+        through_fields=('player', 'match'),
+        related_name='players',
+        blank=True,
+    )
     ranking_position = models.PositiveIntegerField(default=0)
+    # Highest match id the registered user has already seen; participations
+    # with a greater match id are the "new matches" of the navbar badge.
+    last_seen_match_id = models.PositiveIntegerField(default=0)
 
     # --- Gender field options and definitions: ---    
     GENDER_MALE = "M"
@@ -174,7 +468,47 @@ class Player(models.Model):
     def save(self, *args, **kwargs):
         if not self.group_id:
             self.group = get_default_group()
-        super().save(*args, **kwargs)
+
+        is_new = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        track_changes = not is_new and (
+            update_fields is None or "gender" in update_fields or "name" in update_fields
+        )
+        previous_name, previous_gender = None, None
+        if track_changes:
+            previous_name, previous_gender = (
+                Player.objects.filter(pk=self.pk).values_list("name", "gender").first() or (None, None)
+            )
+
+        renamed = track_changes and previous_name != self.name
+        with group_write_lock(self.group_id):
+            super().save(*args, **kwargs)
+            scopes = set()
+            if track_changes and previous_gender != self.gender:
+                # Gender defines the male/female ranking populations.
+                scopes.update([PlayerScopeStats.SCOPE_MALE, PlayerScopeStats.SCOPE_FEMALE])
+            if renamed:
+                # Names break ranking ties, so the stored ordinals of every
+                # scope the player is ranked in are re-sorted.
+                scopes.update(
+                    PlayerScopeStats.objects.filter(player=self, matches__gt=0).values_list("scope", flat=True)
+                )
+            if scopes:
+                update_scope_positions(
+                    group=self.group,
+                    scopes=[scope for scope, _ in PlayerScopeStats.SCOPE_CHOICES if scope in scopes],
+                )
+            elif is_new or renamed:
+                # New players join the unranked lists.
+                bump_group_data_version(self.group_id, rewrite=not is_new)
+
+    def delete(self, *args, **kwargs):
+        # Cascaded match deletions bypass `Match.delete`, so rebuild the group counters.
+        group = self.group
+        with group_write_lock(group.pk):
+            result = super().delete(*args, **kwargs)
+            update_player_rankings(group=group)
+        return result
 
     def __str__(self):
         return self.name
@@ -182,27 +516,35 @@ class Player(models.Model):
     # ==== Calculated player stats ====
     @property
     def matches_played(self):
-        return self.matches.count() if self.id else 0
+        return self.participation_totals()["matches"]
 
     @property
     def wins(self):
         # Count matches where this player is in the winning team
-        return Match.objects.filter(
-            models.Q(team1_player1=self, winning_team=1) |
-            models.Q(team1_player2=self, winning_team=1) |
-            models.Q(team2_player1=self, winning_team=2) |
-            models.Q(team2_player2=self, winning_team=2)
-        ).count()
+        return self.participation_totals()["wins"]
+
+    def participation_totals(self) -> dict[str, int]:
+        """
+        Matches played and won, from one aggregate over `MatchParticipant`.
+        """
+        if not self.id:
+            return {"matches": 0, "wins": 0}
+        return self.participations.aggregate(
+            matches=models.Count("id"),
+            wins=models.Count("id", filter=models.Q(is_win=True)),
+        )
 
     @property
     def win_rate(self):
-        if self.matches_played == 0:
+        totals = self.participation_totals()
+        if totals["matches"] == 0:
             return 0.0
-        return (self.wins / self.matches_played) * 100
+        return (totals["wins"] / totals["matches"]) * 100
 
     @property
     def losses(self):
-        return max(0, self.matches_played - self.wins)
+        totals = self.participation_totals()
+        return max(0, totals["matches"] - totals["wins"])
 
     # Data integrity is enforced in views/serializers to avoid partial updates
     # during cascading changes  (e.g., match deletions).
@@ -238,10 +580,46 @@ class Match(models.Model):
         blank=True,  # TEMPORARY
         db_index=True,  # important for ranking filters
     )
+    # Group, date and the two unordered teams (see `build_signature`); the same
+    # match cannot be stored twice.
+    signature = models.CharField(max_length=120, null=True, blank=True, editable=False)
+    # Client-generated key of the submission that created the match, so a
+    # repeated submit finds the stored match instead of writing another one.
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["signature"], name="unique_match_signature"),
+            # Unique among keyed matches only. An expression index because Oracle
+            # treats (group, NULL) pairs as equal: keyless rows index as all-NULL
+            # keys, which never conflict.
+            models.UniqueConstraint(
+                models.Case(models.When(idempotency_key__isnull=False, then=models.F("group"))),
+                models.Case(models.When(idempotency_key__isnull=False, then=models.F("idempotency_key"))),
+                name="unique_match_idempotency_key",
+            ),
+        ]
 
     def __str__(self):
         return f"Match on {self.date_played}"
 
+    @staticmethod
+    def build_signature(group_id, date_played, team1_ids, team2_ids) -> str:
+        """
+        Canonical "group:date:a-b:c-d" key, independent of the player order
+        inside each team and of which team is team 1.
+        """
+        teams = sorted(tuple(sorted(team)) for team in (team1_ids, team2_ids))
+        return f"{group_id}:{date_played}:" + ":".join(f"{first}-{second}" for first, second in teams)
+
+    def compute_signature(self) -> str:
+        return self.build_signature(
+            self.group_id,
+            self.date_played,
+            (self.team1_player1_id, self.team1_player2_id),
+            (self.team2_player1_id, self.team2_player2_id),
+        )
+
     @classmethod
     def editable_date_floor(cls, today=None):
         from datetime import date, timedelta
@@ -282,7 +660,14 @@ class Match(models.Model):
         Computes match gender type from the 4 players.
         Possibilities: Men (all players are M), Women (all players are F) and Mixed (contains both M and F).
         """
-        genders = {p.gender for p in self.all_players if p and p.gender}
+        return self.gender_type_for_genders(p.gender for p in self.all_players if p)
+
+    @staticmethod
+    def gender_type_for_genders(genders) -> str:
+        """
+        Match gender type of players with `genders` (unknown genders ignored).
+        """
+        genders = {gender for gender in genders if gender}
         if genders == {Player.GENDER_MALE}:
             return Match.GENDER_TYPE_MALE
         if genders == {Player.GENDER_FEMALE}:
@@ -299,18 +684,72 @@ class Match(models.Model):
             if self.group_id and self.group_id != group_id:
                 raise ValidationError("El grupo del partido no coincide con el grupo de sus jugadores.")
             self.group_id = group_id
+        self.validate_signature()
+
+    def validate_signature(self) -> None:
+        """
+        Rejects a match whose group, date and teams are already stored as
+        another match, so admin and edit forms get a form error instead of
+        hitting the `unique_match_signature` constraint.
+        """
+        slots = (self.team1_player1_id, self.team1_player2_id, self.team2_player1_id, self.team2_player2_id)
+        if not self.group_id or not self.date_played or None in slots:
+            return
+        signature = self.compute_signature()
+        # Duplicates stored before signatures existed keep their "#<pk>" suffix.
+        if self.signature and self.signature != signature and self.signature.partition("#")[0] == signature:
+            return
+        if Match.objects.filter(signature=signature).exclude(pk=self.pk).exists():
+            raise ValidationError("El partido ya se había creado.")
+
+    def ranking_delta(self, sign: int = 1) -> dict[int, tuple[int, int]]:
+        """
+        Per-player `(matches_delta, wins_delta)` contributed by this match.
+        """
+        delta: dict[int, tuple[int, int]] = {}
+        for team_number, player_id in (
+            (1, self.team1_player1_id),
+            (1, self.team1_player2_id),
+            (2, self.team2_player1_id),
+            (2, self.team2_player2_id),
+        ):
+            matches_delta, wins_delta = delta.get(player_id, (0, 0))
+            delta[player_id] = (
+                matches_delta + sign,
+                wins_delta + (sign if team_number == self.winning_team else 0),
+            )
+        return delta
 
     def apply_match_effects(self):
-        # Add this match to all players' matches
-        for player in self.all_players:
-            player.matches.add(self)
-        update_player_rankings(group=self.group)
+        # Add this match to all players' matches (one row per player, with team and result)
+        MatchParticipant.objects.bulk_create(self.build_participants())
+        PlayerInsights.apply_match(self)
+        # Edits revert the previous state first, so applying is always an append.
+        bump_group_data_version(self.group_id, rewrite=False)
+        self._update_rankings(sign=1)
 
     def revert_match_effects(self):
         # Remove this match from all players' matches
-        for player in self.all_players:
-            player.matches.remove(self)
-        update_player_rankings(group=self.group)
+        MatchParticipant.objects.filter(match=self).delete()
+        PlayerInsights.revert_match(self)
+        bump_group_data_version(self.group_id)
+        self._update_rankings(sign=-1)
+
+    def _update_rankings(self, *, sign: int) -> None:
+        """
+        Applies this match to the persisted rankings now, or enqueues one
+        coalesced group recomputation when background jobs are enabled.
+        """
+        from .jobs import JOB_GROUP_RANKINGS, background_jobs_enabled, enqueue_job
+
+        if background_jobs_enabled():
+            enqueue_job(JOB_GROUP_RANKINGS, self.group_id)
+            return
+        update_player_rankings(
+            group=self.group,
+            delta=self.ranking_delta(sign),
+            scopes=PlayerScopeStats.scopes_for_match_gender_type(self.match_gender_type),
+        )
 
     def save(self, *args, **kwargs):
         is_new = self._state.adding
@@ -321,22 +760,33 @@ class Match(models.Model):
         # Compute match gender type from the (new/current) players
         self.clean()
         self.match_gender_type = self.compute_gender_type()
+        signature = self.compute_signature()
+        # Duplicates stored before signatures existed keep their "#<pk>" suffix.
+        if (self.signature or "").partition("#")[0] != signature:
+            self.signature = signature
 
-        with transaction.atomic():
-            # If editing, revert old effects only after the new state validates.
-            if not is_new:
-                old = Match.objects.get(pk=self.pk)
+        group_ids = [self.group_id]
+        if not is_new:
+            group_ids += Match.objects.filter(pk=self.pk).values_list("group_id", flat=True)
+        with group_write_lock(*group_ids):
+            # Edit effects are applied only after the new state validates.
+            old = None if is_new else Match.objects.get(pk=self.pk)
+            if old is not None and old.group_id != self.group_id:
                 old.revert_match_effects()
+                old = None
 
             super().save(*args, **kwargs)
 
             # Apply effects using current FKs
-            self.apply_match_effects()
-
+            if old is None:
+                self.apply_match_effects()
+            else:
+                self.apply_edit_effects(old)
 
     def delete(self, *args, **kwargs):
-        self.revert_match_effects()
-        super().delete(*args, **kwargs)
+        with group_write_lock(self.group_id):
+            self.revert_match_effects()
+            return super().delete(*args, **kwargs)
 
     def update_match(self, **kwargs):
         """
@@ -345,7 +795,476 @@ class Match(models.Model):
         for field, value in kwargs.items():
             setattr(self, field, value)
         # Let save() handle:
-        # - revert old effects
         # - recompute match_gender_type
-        # - apply new effects
+        # - apply the difference with the stored match (`apply_edit_effects`)
         self.save()
+
+    def effects_key(self) -> tuple:
+        """
+        Everything the participants, insights and rankings derive from.
+        """
+        return (
+            self.date_played,
+            self.winning_team,
+            self.match_gender_type,
+            self.team1_player1_id,
+            self.team1_player2_id,
+            self.team2_player1_id,
+            self.team2_player2_id,
+        )
+
+    def apply_edit_effects(self, old: "Match") -> None:
+        """
+        Moves the effects of `old` (the stored state of this match, same group)
+        to the current state in one pass: only changed participant rows are
+        written, insight snapshots are read and written once, and rankings get
+        the net delta per scope, which is empty when the players, the result
+        and the gender type are unchanged (e.g. a date-only edit).
+        """
+        if old.effects_key() == self.effects_key():
+            return
+        old_rows = {row.player_id: row for row in old.build_participants()}
+        new_rows = {row.player_id: row for row in self.build_participants()}
+        removed_ids = old_rows.keys() - new_rows.keys()
+        if removed_ids:
+            MatchParticipant.objects.filter(match=self, player_id__in=removed_ids).delete()
+        added = [row for player_id, row in new_rows.items() if player_id not in old_rows]
+        if added:
+            MatchParticipant.objects.bulk_create(added)
+        changed_ids: dict[tuple, list[int]] = {}
+        for player_id in old_rows.keys() & new_rows.keys():
+            old_values, new_values = (
+                (row.team, row.is_win, row.date_played, row.match_gender_type)
+                for row in (old_rows[player_id], new_rows[player_id])
+            )
+            if old_values != new_values:
+                changed_ids.setdefault(new_values, []).append(player_id)
+        for (team, is_win, date_played, match_gender_type), player_ids in changed_ids.items():
+            MatchParticipant.objects.filter(match=self, player_id__in=player_ids).update(
+                team=team,
+                is_win=is_win,
+                date_played=date_played,
+                match_gender_type=match_gender_type,
+            )
+        PlayerInsights.replace_match(old, self)
+        bump_group_data_version(self.group_id)
+        self._update_rankings_for_edit(old)
+
+    def _update_rankings_for_edit(self, old: "Match") -> None:
+        from .jobs import JOB_GROUP_RANKINGS, background_jobs_enabled, enqueue_job
+
+        deltas: dict[str, dict[int, tuple[int, int]]] = {}
+        for match, sign in ((old, -1), (self, 1)):
+            for scope in PlayerScopeStats.scopes_for_match_gender_type(match.match_gender_type):
+                scope_delta = deltas.setdefault(scope, {})
+                for player_id, (matches_delta, wins_delta) in match.ranking_delta(sign).items():
+                    matches_total, wins_total = scope_delta.get(player_id, (0, 0))
+                    scope_delta[player_id] = (matches_total + matches_delta, wins_total + wins_delta)
+        # Scopes sharing the same net delta are updated together.
+        scopes_by_delta: dict[tuple, list[str]] = {}
+        for scope, delta in deltas.items():
+            changes = tuple(sorted((player_id, change) for player_id, change in delta.items() if change != (0, 0)))
+            if changes:
+                scopes_by_delta.setdefault(changes, []).append(scope)
+        if not scopes_by_delta:
+            return
+        if background_jobs_enabled():
+            enqueue_job(JOB_GROUP_RANKINGS, self.group_id)
+            return
+        for changes, scopes in scopes_by_delta.items():
+            update_player_rankings(group=self.group, delta=dict(changes), scopes=scopes)
+
+    def build_participants(self) -> list["MatchParticipant"]:
+        """
+        One `MatchParticipant` per distinct player of this match.
+        """
+        winner_ids = {
+            1: {self.team1_player1_id, self.team1_player2_id},
+            2: {self.team2_player1_id, self.team2_player2_id},
+        }.get(self.winning_team, set())
+        participants: dict[int, MatchParticipant] = {}
+        for team_number, player_id in (
+            (1, self.team1_player1_id),
+            (1, self.team1_player2_id),
+            (2, self.team2_player1_id),
+            (2, self.team2_player2_id),
+        ):
+            participants.setdefault(
+                player_id,
+                MatchParticipant(
+                    match=self,
+                    player_id=player_id,
+                    group_id=self.group_id,
+                    team=team_number,
+                    is_win=player_id in winner_ids,
+                    date_played=self.date_played,
+                    match_gender_type=self.match_gender_type,
+                ),
+            )
+        return list(participants.values())
+
+
+class MatchParticipant(models.Model):
+    """
+    Denormalized match participation: one row per (match, player), also the
+    through table of `Player.matches`.
+
+    Kept in sync by `Match.save`/`Match.delete` so per-player history and win
+    lookups are index range scans instead of four-slot OR filters.
+    """
+
+    match = models.ForeignKey("Match", on_delete=models.CASCADE, related_name="participants")
+    player = models.ForeignKey("Player", on_delete=models.CASCADE, related_name="participations")
+    group = models.ForeignKey("Group", on_delete=models.CASCADE, related_name="match_participants")
+    team = models.PositiveSmallIntegerField(choices=[(1, "Team 1"), (2, "Team 2")])
+    is_win = models.BooleanField(default=False)
+    date_played = models.DateField()
+    match_gender_type = models.CharField(max_length=1, choices=Match.GENDER_TYPE_CHOICES, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["match", "player"], name="unique_match_participant"),
+        ]
+        indexes = [
+            models.Index(fields=["player", "date_played"], name="match_participant_history"),
+            models.Index(fields=["player", "is_win"], name="match_participant_wins"),
+            models.Index(fields=["group", "player", "match_gender_type"], name="match_participant_scope"),
+            models.Index(fields=["player", "match"], name="match_participant_player_match"),
+        ]
+
+    def __str__(self):
+        return f"{self.player} in {self.match} (team {self.team})"
+
+
+class PlayerScopeStats(models.Model):
+    """
+    Materialized per-scope ranking counters and positions: one row per
+    (group, scope, player).
+
+    Kept in sync by `Match.save`/`Match.delete` in the same transaction so ranking
+    pages can read wins/matches without scanning match history.
+    """
+
+    SCOPE_ALL = "all"
+    SCOPE_MALE = "male"
+    SCOPE_FEMALE = "female"
+    SCOPE_MIXED = "mixed"
+    SCOPE_CHOICES = [
+        (SCOPE_ALL, "All"),
+        (SCOPE_MALE, "Male"),
+        (SCOPE_FEMALE, "Female"),
+        (SCOPE_MIXED, "Mixed"),
+    ]
+    SCOPE_BY_MATCH_GENDER_TYPE = {
+        Match.GENDER_TYPE_MALE: SCOPE_MALE,
+        Match.GENDER_TYPE_FEMALE: SCOPE_FEMALE,
+        Match.GENDER_TYPE_MIXED: SCOPE_MIXED,
+    }
+
+    group = models.ForeignKey("Group", on_delete=models.CASCADE, related_name="player_scope_stats")
+    player = models.ForeignKey("Player", on_delete=models.CASCADE, related_name="scope_stats")
+    scope = models.CharField(max_length=6, choices=SCOPE_CHOICES)
+    wins = models.PositiveIntegerField(default=0)
+    matches = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    # Competition position ("1224") and 1-based row ordinal; 0 when unranked.
+    position = models.PositiveIntegerField(default=0)
+    ordinal = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["group", "scope", "player"],
+                name="unique_player_scope_stats",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["group", "scope", "position"], name="player_scope_stats_position"),
+        ]
+
+    def __str__(self):
+        return f"{self.player} ({self.scope}): {self.wins}/{self.matches}"
+
+    @classmethod
+    def scopes_for_match_gender_type(cls, match_gender_type) -> list[str]:
+        gender_scope = cls.SCOPE_BY_MATCH_GENDER_TYPE.get(match_gender_type)
+        return [cls.SCOPE_ALL, gender_scope] if gender_scope else [cls.SCOPE_ALL]
+
+
+class GroupDataVersion(models.Model):
+    """
+    Per-group data version, bumped by every change that can alter the group's
+    rankings (matches, player names/genders, rebuilds). Part of ranking cache keys.
+    """
+
+    group = models.OneToOneField("Group", on_delete=models.CASCADE, primary_key=True, related_name="data_version")
+    version = models.PositiveIntegerField(default=0)
+    # Bumped only by changes that are not pure appends (edits, deletes, renames).
+    history_version = models.PositiveIntegerField(default=0)
+    # Time of the last bump (HTTP Last-Modified of the group's public pages).
+    updated_at = models.DateTimeField(default=timezone.now)
+    # `version` the persisted rankings (PlayerScopeStats positions) reflect.
+    rankings_version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.group}: v{self.version}"
+
+
+class PlayerInsights(models.Model):
+    """
+    Persisted per-player insights snapshot: rival-pair aggregates with last
+    dates, per-gender-type totals and the latest `RECENT_LIMIT` results per
+    match gender type. Partner and opponent stats come from the group-wide
+    head-to-head matrices (`frontend.services.head_to_head`).
+
+    `Match.save`/`Match.delete` update existing snapshots incrementally. When a
+    removal makes a snapshot undecidable (a last date or a full recent list
+    loses its entry) the row is dropped and rebuilt from history on next read.
+    """
+
+    RECENT_LIMIT = 20
+
+    player = models.OneToOneField("Player", on_delete=models.CASCADE, primary_key=True, related_name="insights")
+    data = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"Insights of {self.player}"
+
+    @staticmethod
+    def empty_data() -> dict:
+        return {"rival_pairs": {}, "totals": {}, "recent": {}}
+
+    @staticmethod
+    def _match_perspective(player_id, slots, winning_team):
+        """
+        `(rival_ids, is_win)` of `player_id` in a match given its four slot
+        player ids (team 1 first).
+        """
+        if player_id in slots[:2]:
+            return slots[2:], winning_team == 1
+        return slots[:2], winning_team == 2
+
+    @classmethod
+    def _add_match(cls, data, player_id, match_id, date_played, winning_team, match_gender_type, slots) -> None:
+        rival_ids, is_win = cls._match_perspective(player_id, slots, winning_team)
+        win = 1 if is_win else 0
+        played_on = date_played.isoformat()
+
+        rival_pair = data["rival_pairs"].setdefault(
+            ",".join(str(rival_id) for rival_id in sorted(rival_ids)),
+            [0, 0, played_on],
+        )
+        rival_pair[0] += 1
+        rival_pair[1] += win
+        rival_pair[2] = max(rival_pair[2], played_on)
+
+        gender_key = match_gender_type or ""
+        totals = data["totals"].setdefault(gender_key, [0, 0])
+        totals[0] += 1
+        totals[1] += win
+        recent = data["recent"].setdefault(gender_key, [])
+        recent.append([played_on, match_id, is_win])
+        recent.sort(reverse=True)
+        del recent[cls.RECENT_LIMIT:]
+
+    @classmethod
+    def _remove_match(cls, data, player_id, match_id, date_played, winning_team, match_gender_type, slots) -> bool:
+        """
+        Removes a match from `data`; False when the snapshot must be rebuilt.
+        """
+        rival_ids, is_win = cls._match_perspective(player_id, slots, winning_team)
+        win = 1 if is_win else 0
+        played_on = date_played.isoformat()
+
+        pair_key = ",".join(str(rival_id) for rival_id in sorted(rival_ids))
+        rival_pair = data["rival_pairs"].get(pair_key)
+        if rival_pair is None:
+            return False
+        rival_pair[0] -= 1
+        rival_pair[1] -= win
+        if rival_pair[0] <= 0:
+            del data["rival_pairs"][pair_key]
+            decidable = True
+        else:
+            decidable = rival_pair[2] != played_on
+
+        gender_key = match_gender_type or ""
+        totals = data["totals"].get(gender_key)
+        if totals is None:
+            return False
+        totals[0] -= 1
+        totals[1] -= win
+        recent = data["recent"].get(gender_key, [])
+        remaining = [entry for entry in recent if entry[1] != match_id]
+        if len(remaining) < len(recent) and len(recent) >= cls.RECENT_LIMIT and totals[0] >= cls.RECENT_LIMIT:
+            # The next older result is not in the snapshot.
+            decidable = False
+        if totals[0] <= 0:
+            del data["totals"][gender_key]
+            data["recent"].pop(gender_key, None)
+        else:
+            data["recent"][gender_key] = remaining
+        return decidable
+
+    @staticmethod
+    def _match_args(match) -> tuple:
+        slots = (match.team1_player1_id, match.team1_player2_id, match.team2_player1_id, match.team2_player2_id)
+        return match.pk, match.date_played, match.winning_team, match.match_gender_type, slots
+
+    @classmethod
+    def _update_for_match(cls, *, removed=None, added=None) -> None:
+        removed_args = cls._match_args(removed) if removed is not None else None
+        added_args = cls._match_args(added) if added is not None else None
+        player_ids = set(removed_args[-1] if removed_args else ()) | set(added_args[-1] if added_args else ())
+        snapshots = list(cls.objects.filter(player_id__in=player_ids))
+        if not snapshots:
+            return
+        changed, undecidable = [], []
+        for snapshot in snapshots:
+            if removed_args and snapshot.player_id in removed_args[-1]:
+                if not cls._remove_match(snapshot.data, snapshot.player_id, *removed_args):
+                    undecidable.append(snapshot.player_id)
+                    continue
+            if added_args and snapshot.player_id in added_args[-1]:
+                cls._add_match(snapshot.data, snapshot.player_id, *added_args)
+            changed.append(snapshot)
+        if changed:
+            cls.objects.bulk_update(changed, ["data"])
+        if undecidable:
+            cls.objects.filter(player_id__in=undecidable).delete()
+
+    @classmethod
+    def apply_match(cls, match) -> None:
+        cls._update_for_match(added=match)
+
+    @classmethod
+    def revert_match(cls, match) -> None:
+        cls._update_for_match(removed=match)
+
+    @classmethod
+    def replace_match(cls, old, new) -> None:
+        """
+        `revert_match(old)` then `apply_match(new)` with one read and one write.
+        """
+        cls._update_for_match(removed=old, added=new)
+
+    @classmethod
+    def build_data(cls, player) -> dict:
+        """
+        Snapshot data of `player` from one values-only scan of its match history.
+        """
+        data = cls.empty_data()
+        history = Match.objects.filter(participants__player=player).values_list(
+            "pk",
+            "date_played",
+            "winning_team",
+            "match_gender_type",
+            "team1_player1_id",
+            "team1_player2_id",
+            "team2_player1_id",
+            "team2_player2_id",
+        )
+        for match_id, date_played, winning_team, match_gender_type, *slots in history.iterator():
+            cls._add_match(data, player.id, match_id, date_played, winning_team, match_gender_type, tuple(slots))
+        return data
+
+    @classmethod
+    def for_player(cls, player) -> "PlayerInsights":
+        """
+        Stored snapshot of `player`, built from history when missing.
+        """
+        snapshot = cls.objects.filter(player=player).first()
+        if snapshot is not None:
+            return snapshot
+        snapshot = cls(player=player, data=cls.build_data(player))
+        try:
+            with transaction.atomic():
+                snapshot.save(force_insert=True)
+        except IntegrityError:
+            # Built concurrently by another request; both snapshots are equal.
+            pass
+        return snapshot
+
+
+class Job(models.Model):
+    """
+    Background job row of the database-backed queue (`games.jobs`).
+
+    Pending jobs with the same (kind, key) are coalesced at enqueue time, so a
+    burst of match writes in one group leaves a single recomputation. Finished
+    jobs are deleted; jobs that keep failing stay as `failed` for inspection.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    key = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_status_run_after"),
+            models.Index(fields=["kind", "key", "status"], name="job_kind_key_status"),
+        ]
+        constraints = [
+            # At most one pending job per (kind, key). Written as an expression
+            # index rather than `condition=` because Oracle has no partial
+            # indexes: rows that are not pending index as all-NULL keys, which
+            # never conflict.
+            models.UniqueConstraint(
+                models.Case(models.When(status="pending", then=models.F("kind"))),
+                models.Case(models.When(status="pending", then=models.F("key"))),
+                name="unique_pending_job",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.key} ({self.status})"
+
+
+class CacheLock(models.Model):
+    """
+    Cross-process lock row for cache single-flight (`frontend.services.ranking_cache`)
+    when the cache backend has no atomic `add` (e.g. `FileBasedCache`).
+
+    The unique key makes acquiring atomic; locks of crashed owners are taken
+    over once expired and purged on release.
+    """
+
+    key = models.CharField(max_length=250, unique=True)
+    token = models.CharField(max_length=32)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+    @classmethod
+    def acquire(cls, key: str, token: str, timeout: int) -> bool:
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=timeout)
+        if cls.objects.filter(key=key, expires_at__lt=now).update(token=token, expires_at=expires_at):
+            return True
+        try:
+            with transaction.atomic():
+                cls.objects.create(key=key, token=token, expires_at=expires_at)
+        except IntegrityError:
+            # Held by another process.
+            return False
+        return True
+
+    @classmethod
+    def release(cls, key: str, token: str) -> None:
+        cls.objects.filter(models.Q(key=key, token=token) | models.Q(expires_at__lt=timezone.now())).delete()
@@ -0,0 +1,160 @@
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from games import models as games_models
+from games.management.commands import import_matches
+from games.models import Group, GroupDataVersion, Match, MatchParticipant, Player, PlayerScopeStats
+
+
+pytestmark = pytest.mark.django_db
+
+CSV_ROWS = """date_played,team1_player1,team1_player2,team2_player1,team2_player2,winning_team
+2024-01-05,ana,Bea,CARLA,Dora,1
+2024-01-06,Ana,Carla,Bea,Eva,2
+2024-01-06,Bea,Eva,Carla,Ana,1
+2024-01-07,Ana,Bea,Nadie,Dora,1
+2024-01-08,Ana,Bea,Carla,Dora,3
+2024-01-09,Dora,Eva,Ana,Bea,2
+"""
+
+
+@pytest.fixture
+def group():
+    group = Group.objects.create(name="Importados")
+    for name in ("Ana", "Bea", "Carla", "Dora", "Eva"):
+        Player.objects.create(name=name, gender=Player.GENDER_FEMALE, group=group)
+    return group
+
+
+def run_import(tmp_path, content, *args, name="matches.csv"):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    out, err = StringIO(), StringIO()
+    call_command("import_matches", str(path), "--group", "importados", *args, stdout=out, stderr=err)
+    return out.getvalue(), err.getvalue()
+
+
+def scope_rows(group):
+    return sorted(
+        PlayerScopeStats.objects.filter(group=group).values_list("scope", "player_id", "matches", "wins", "position")
+    )
+
+
+def test_import_matches_bulk_inserts_and_reranks_once(tmp_path, group, monkeypatch):
+    rebuilds = []
+    rebuild = games_models._rebuild_group_rankings
+    monkeypatch.setattr(games_models, "_rebuild_group_rankings", lambda *a, **kw: rebuilds.append(1) or rebuild(*a, **kw))
+    monkeypatch.setattr(Match, "save", lambda *a, **kw: pytest.fail("imports must not save matches one by one"))
+
+    out, err = run_import(tmp_path, CSV_ROWS, "--batch-size", "2")
+
+    assert rebuilds == [1]
+    # The repeated 2024-01-06 match is a duplicate; "Nadie" and team 3 are invalid.
+    assert "3 imported, 1 duplicates, 2 invalid" in out
+    assert "row 4: unknown player 'Nadie'" in err
+    assert "row 5: winning_team must be 1 or 2" in err
+    assert Match.objects.filter(group=group).count() == 3
+    assert MatchParticipant.objects.filter(group=group).count() == 12
+    assert set(Match.objects.values_list("match_gender_type", flat=True)) == {Match.GENDER_TYPE_FEMALE}
+
+    imported = scope_rows(group)
+    games_models.update_player_rankings(group=group)
+    assert imported == scope_rows(group)
+    versions = GroupDataVersion.objects.get(group=group)
+    assert versions.rankings_version == versions.version
+
+    out, _ = run_import(tmp_path, CSV_ROWS)
+    assert "0 imported, 4 duplicates" in out
+
+
+def test_import_matches_dry_run_writes_nothing(tmp_path, group):
+    out, _ = run_import(tmp_path, CSV_ROWS, "--dry-run")
+
+    assert "3 matches would be imported" in out
+    assert not Match.objects.exists()
+    assert not PlayerScopeStats.objects.exists()
+
+
+def test_import_matches_resumes_from_its_checkpoint(tmp_path, group, monkeypatch):
+    lines = [
+        {"date_played": f"2024-02-{day:02d}", "team1_player1": "Ana", "team1_player2": "Bea",
+         "team2_player1": "Carla", "team2_player2": "Dora", "winning_team": 1 + day % 2}
+        for day in range(1, 6)
+    ]
+    content = "".join(json.dumps(line) + "\n" for line in lines)
+    checkpoint = tmp_path / "import.checkpoint"
+    save_matches = import_matches.Command._save_matches
+    calls = []
+
+    def crash_on_second_chunk(self, group, matches):
+        calls.append(len(matches))
+        if len(calls) == 2:
+            raise RuntimeError("killed")
+        return save_matches(self, group, matches)
+
+    monkeypatch.setattr(import_matches.Command, "_save_matches", crash_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        run_import(tmp_path, content, "--batch-size", "2", "--checkpoint", str(checkpoint), name="m.ndjson")
+    assert json.loads(checkpoint.read_text())["rows"] == 2
+    assert Match.objects.count() == 2
+
+    monkeypatch.undo()
+    out, _ = run_import(tmp_path, content, "--batch-size", "2", "--checkpoint", str(checkpoint), name="m.ndjson")
+
+    assert "Resuming after row 2" in out
+    assert sorted(Match.objects.values_list("date_played", flat=True)) == [date(2024, 2, day) for day in range(1, 6)]
+    assert not checkpoint.exists()
+    assert PlayerScopeStats.objects.get(player__name="Ana", scope=PlayerScopeStats.SCOPE_ALL).matches == 5
+
+
+def test_import_matches_counts_matches_stored_meanwhile_as_duplicates(tmp_path, group, monkeypatch):
+    build_matches = import_matches.Command._build_matches
+
+    def racing_writer(self, group, chunk, first_row, totals):
+        matches = build_matches(self, group, chunk, first_row, totals)
+        # Another writer stores the first match between the check and the insert.
+        first = matches[0]
+        Match.objects.create(
+            group=group,
+            team1_player1_id=first.team1_player1_id,
+            team1_player2_id=first.team1_player2_id,
+            team2_player1_id=first.team2_player1_id,
+            team2_player2_id=first.team2_player2_id,
+            winning_team=first.winning_team,
+            date_played=first.date_played,
+        )
+        return matches
+
+    monkeypatch.setattr(import_matches.Command, "_build_matches", racing_writer)
+    # Like Oracle.
+    monkeypatch.setattr(connection.features, "supports_ignore_conflicts", False)
+    out, _ = run_import(tmp_path, CSV_ROWS)
+
+    assert "2 imported, 2 duplicates, 2 invalid" in out
+    assert Match.objects.filter(group=group).count() == 3
+    assert MatchParticipant.objects.filter(group=group).count() == 12
+
+
+def test_import_matches_can_create_missing_players(tmp_path, group):
+    content = (
+        "date_played,team1_player1,team1_player2,team2_player1,team2_player2,winning_team,team2_player1_gender\n"
+        "2024-03-01,Ana,Bea,Nadie,Otra,1,M\n"
+    )
+
+    out, err = run_import(tmp_path, content, "--dry-run", "--create-players")
+    assert "1 matches would be imported" in out
+    assert not Player.objects.filter(name__in=["Nadie", "Otra"]).exists()
+
+    out, err = run_import(tmp_path, content, "--create-players", "--default-gender", "F")
+
+    assert "1 imported, 0 duplicates, 0 invalid" in out
+    assert dict(Player.objects.filter(group=group, name__in=["Nadie", "Otra"]).values_list("name", "gender")) == {
+        "Nadie": Player.GENDER_MALE,
+        "Otra": Player.GENDER_FEMALE,
+    }
+    assert Match.objects.get().match_gender_type == Match.GENDER_TYPE_MIXED
@@ -0,0 +1,185 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from americano.models import AmericanoPlayerStats, AmericanoTournament
+from americano.jobs import JOB_AMERICANO_STANDINGS, schedule_americano_standings
+from games import jobs
+from games import models as games_models
+from games.models import GroupDataVersion, Job, Match, Player, PlayerScopeStats, update_player_rankings
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def background_jobs(settings):
+    settings.BACKGROUND_JOBS_ENABLED = True
+    settings.JOBS_MAX_ATTEMPTS = 3
+    settings.JOBS_RETRY_DELAY = 10
+    settings.JOBS_LOCK_TIMEOUT = 300
+    return settings
+
+
+@pytest.fixture
+def players():
+    return [Player.objects.create(name=f"J{idx}", gender=Player.GENDER_MALE) for idx in range(4)]
+
+
+def play(players, winning_team, day=1):
+    a, b, c, d = players
+    return Match.objects.create(
+        team1_player1=a,
+        team1_player2=b,
+        team2_player1=c,
+        team2_player2=d,
+        winning_team=winning_team,
+        date_played=date(2026, 4, day),
+    )
+
+
+def positions(group):
+    return dict(
+        PlayerScopeStats.objects.filter(group=group, scope=PlayerScopeStats.SCOPE_ALL).values_list(
+            "player_id", "position"
+        )
+    )
+
+
+def test_match_writes_coalesce_into_one_pending_ranking_job(background_jobs, players):
+    for day in range(1, 11):
+        play(players, 1, day)
+
+    job = Job.objects.get()
+    assert (job.kind, job.key, job.status) == (jobs.JOB_GROUP_RANKINGS, str(players[0].group_id), Job.STATUS_PENDING)
+    # Rankings are left to the worker.
+    assert not PlayerScopeStats.objects.filter(group=players[0].group).exists()
+
+
+def test_worker_brings_rankings_to_the_synchronous_result(background_jobs, players):
+    group = players[0].group
+    play(players, 1, 1)
+    play(players, 1, 2)
+    play(players, 2, 3)
+
+    assert jobs.run_pending_jobs("test") == 1
+    assert not Job.objects.exists()
+    queued = positions(group)
+    update_player_rankings(group=group)
+    assert queued == positions(group) == {players[0].pk: 1, players[1].pk: 1, players[2].pk: 3, players[3].pk: 3}
+    assert Player.objects.get(pk=players[0].pk).ranking_position == 1
+
+
+def test_ranking_job_skips_a_rebuild_already_covered_by_another_writer(background_jobs, players, monkeypatch):
+    group = players[0].group
+    play(players, 1, 1)
+    play(players, 2, 2)
+    versions = GroupDataVersion.objects.get(group=group)
+    assert versions.rankings_version < versions.version
+
+    rebuilds = []
+    rebuild = games_models._rebuild_group_rankings
+    monkeypatch.setattr(games_models, "_rebuild_group_rankings", lambda *a, **kw: rebuilds.append(1) or rebuild(*a, **kw))
+    jobs.run_pending_jobs("first")
+    # A second job for writes the first rebuild already saw (e.g. enqueued while it ran).
+    jobs.enqueue_job(jobs.JOB_GROUP_RANKINGS, group.pk)
+    jobs.run_pending_jobs("second")
+
+    assert rebuilds == [1]
+    versions.refresh_from_db()
+    assert versions.rankings_version == versions.version
+
+
+def test_failing_job_backs_off_then_stays_failed(background_jobs, monkeypatch):
+    calls = []
+
+    def boom(key):
+        calls.append(key)
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs._handlers, "boom", boom)
+    job = jobs.enqueue_job("boom", 1)
+
+    assert jobs.run_pending_jobs("test") == 1
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.STATUS_PENDING, 1)
+    assert job.run_after > timezone.now() + timedelta(seconds=9)
+    assert "RuntimeError: boom" in job.last_error
+    # Not due yet.
+    assert jobs.run_pending_jobs("test") == 0
+
+    for attempt in (2, 3):
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        jobs.run_pending_jobs("test")
+        job.refresh_from_db()
+        assert job.attempts == attempt
+        assert job.run_after > timezone.now() + timedelta(seconds=10 * 2 ** (attempt - 1) - 1)
+
+    assert job.status == Job.STATUS_FAILED
+    assert calls == ["1", "1", "1"]
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    assert jobs.run_pending_jobs("test") == 0
+
+
+def test_jobs_of_a_crashed_worker_are_requeued(background_jobs, monkeypatch):
+    calls = []
+    monkeypatch.setitem(jobs._handlers, "noop", calls.append)
+    job = jobs.enqueue_job("noop", 7)
+    assert jobs.claim_job("crashed") is not None
+
+    # Another job of the same key waits while the first one is running.
+    jobs.enqueue_job("noop", 7)
+    assert jobs.claim_job("other") is None
+
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=301))
+    # The crashed job folds into the pending one instead of running twice.
+    assert jobs.run_pending_jobs("other") == 1
+    assert calls == ["7"]
+    assert not Job.objects.exists()
+
+    jobs.enqueue_job("noop", 8)
+    assert jobs.run_pending_jobs("other") == 1
+    Job.objects.create(kind="noop", key="8", status=Job.STATUS_RUNNING, locked_at=timezone.now() - timedelta(seconds=301))
+    assert jobs.run_pending_jobs("other") == 1
+    assert calls == ["7", "8", "8"]
+
+
+def test_only_one_job_per_kind_and_key_can_be_pending(background_jobs, monkeypatch):
+    job = jobs.enqueue_job("noop", 1)
+    assert jobs.enqueue_job("noop", "1") == job
+
+    # Concurrent enqueuers both miss the pending row; the constraint stops the second insert.
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Job.objects.create(kind="noop", key="1")
+    Job.objects.create(kind="noop", key="1", status=Job.STATUS_FAILED)
+    Job.objects.create(kind="noop", key="2")
+    assert Job.objects.filter(status=Job.STATUS_PENDING).count() == 2
+
+    # A failing retry is dropped when a newer job of its key is already pending.
+    monkeypatch.setitem(jobs._handlers, "noop", lambda key: 1 / 0)
+    claimed = jobs.claim_job("test")
+    jobs.enqueue_job("noop", claimed.key)
+    assert not jobs.run_job(claimed)
+    assert not Job.objects.filter(pk=claimed.pk).exists()
+    assert Job.objects.filter(kind="noop", key=claimed.key, status=Job.STATUS_PENDING).count() == 1
+
+
+def test_americano_standings_are_enqueued_and_run_by_the_worker(background_jobs, players):
+    creator = User.objects.create_user(username="jobs", password="pass1234")
+    tournament = AmericanoTournament.objects.create(name="Jobs", created_by=creator, num_players=4)
+    tournament.players.set(players)
+
+    schedule_americano_standings(tournament)
+    schedule_americano_standings(tournament)
+
+    assert list(Job.objects.values_list("kind", "key")) == [(JOB_AMERICANO_STANDINGS, str(tournament.pk))]
+    assert not AmericanoPlayerStats.objects.filter(tournament=tournament).exists()
+
+    call_command("run_jobs", once=True, worker_id="test")
+
+    assert AmericanoPlayerStats.objects.filter(tournament=tournament).count() == 4
+    assert not Job.objects.exists()
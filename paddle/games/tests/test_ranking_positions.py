@@ -2,8 +2,10 @@ from datetime import date
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 
-from games.models import Group, Match, Player
+from games.models import Group, GroupDataVersion, Match, MatchParticipant, Player, PlayerScopeStats, update_player_rankings
 
 
 pytestmark = pytest.mark.django_db
@@ -102,3 +104,400 @@ def test_invalid_match_update_preserves_existing_effects():
     assert b.ranking_position == 1
     assert c.ranking_position == 3
     assert d.ranking_position == 3
+
+
+def _ranking_snapshot(group):
+    positions = dict(Player.objects.filter(group=group).values_list("id", "ranking_position"))
+    stats = {
+        (stats.scope, stats.player_id): (stats.wins, stats.matches, stats.losses)
+        for stats in PlayerScopeStats.objects.filter(group=group, matches__gt=0)
+    }
+    return positions, stats
+
+
+def _scope_stats(player, scope):
+    stats = PlayerScopeStats.objects.filter(player=player, scope=scope).first()
+    return (stats.wins, stats.matches, stats.losses) if stats else (0, 0, 0)
+
+
+def _create_match(players, winning_team, day, group):
+    return Match.objects.create(
+        group=group,
+        team1_player1=players[0],
+        team1_player2=players[1],
+        team2_player1=players[2],
+        team2_player2=players[3],
+        winning_team=winning_team,
+        date_played=date(2026, 3, day),
+    )
+
+
+def test_incremental_ranking_updates_match_full_rebuild_after_create_edit_and_delete():
+    group = Group.objects.create(name="Grupo Delta")
+    players = [
+        Player.objects.create(name=f"P{index}", gender=Player.GENDER_MALE, group=group)
+        for index in range(6)
+    ]
+    a, b, c, d, e, f = players
+
+    _create_match([a, b, c, d], 1, 1, group)
+    second = _create_match([e, f, a, c], 1, 2, group)
+    third = _create_match([b, d, e, f], 2, 3, group)
+
+    second.update_match(winning_team=2, team1_player2=d)
+    third.delete()
+
+    incremental = _ranking_snapshot(group)
+    update_player_rankings(group=group)
+
+    assert _ranking_snapshot(group) == incremental
+    assert _scope_stats(e, PlayerScopeStats.SCOPE_ALL) == (0, 1, 1)
+    assert _scope_stats(e, PlayerScopeStats.SCOPE_MALE) == (0, 1, 1)
+    assert _scope_stats(e, PlayerScopeStats.SCOPE_MIXED) == (0, 0, 0)
+
+
+def test_incremental_ranking_query_count_does_not_grow_with_match_history():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    group = Group.objects.create(name="Grupo Historia")
+    players = [
+        Player.objects.create(name=f"H{index}", gender=Player.GENDER_MALE, group=group)
+        for index in range(4)
+    ]
+
+    with CaptureQueriesContext(connection) as first_match:
+        _create_match(players, 1, 1, group)
+    for day in range(2, 22):
+        _create_match(players, 1 + day % 2, day, group)
+    with CaptureQueriesContext(connection) as later_match:
+        _create_match(players, 1, 25, group)
+
+    assert len(later_match.captured_queries) <= len(first_match.captured_queries)
+
+
+def _position_shifting_match_queries(group_name, foursomes):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    group = Group.objects.create(name=group_name)
+    players = [
+        Player.objects.create(name=f"{group_name}{index:02d}", gender=Player.GENDER_MALE, group=group)
+        for index in range(4 * foursomes)
+    ]
+    for index in range(foursomes):
+        _create_match(players[4 * index:4 * index + 4], 1, 1 + index % 20, group)
+
+    # Two of the tied leaders win again: every other ranked player moves down.
+    with CaptureQueriesContext(connection) as queries:
+        _create_match([players[0], players[1], players[2], players[3]], 1, 25, group)
+
+    moved = Player.objects.filter(group=group, ranking_position=3).count()
+    return [query["sql"] for query in queries.captured_queries], moved
+
+
+def test_position_writes_are_batched_regardless_of_how_many_players_move():
+    small_queries, small_moved = _position_shifting_match_queries("Pocos", 3)
+    large_queries, large_moved = _position_shifting_match_queries("Muchos", 12)
+
+    assert (small_moved, large_moved) == (4, 22)
+    assert len(large_queries) == len(small_queries)
+    player_writes = [sql for sql in large_queries if sql.startswith('UPDATE "games_player" ')]
+    assert len(player_writes) == 1
+    assert "CASE" in player_writes[0]
+
+
+def test_full_rebuild_resets_unranked_players_with_one_update():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    group = Group.objects.create(name="Grupo Reset")
+    for index in range(6):
+        Player.objects.create(name=f"U{index}", gender=Player.GENDER_MALE, group=group)
+    Player.objects.filter(group=group).update(ranking_position=7)
+
+    with CaptureQueriesContext(connection) as queries:
+        update_player_rankings(group=group)
+
+    assert {player.ranking_position for player in Player.objects.filter(group=group)} == {0}
+    resets = [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].startswith('UPDATE "games_player" ') and "ranking_position" in query["sql"]
+    ]
+    assert len(resets) == 1
+
+
+def test_player_delete_rebuilds_counters_of_remaining_players():
+    group = Group.objects.create(name="Grupo Borrado")
+    a, b, c, d = [
+        Player.objects.create(name=f"D{index}", gender=Player.GENDER_MALE, group=group)
+        for index in range(4)
+    ]
+    _create_match([a, b, c, d], 1, 1, group)
+
+    d.delete()
+
+    a.refresh_from_db()
+    c.refresh_from_db()
+    assert a.ranking_position == 0
+    assert c.ranking_position == 0
+    assert _scope_stats(a, PlayerScopeStats.SCOPE_ALL) == (0, 0, 0)
+    assert _scope_stats(c, PlayerScopeStats.SCOPE_ALL) == (0, 0, 0)
+
+
+def test_scope_stats_follow_match_gender_type_on_create_and_delete():
+    group = Group.objects.create(name="Grupo Mixto")
+    m1 = Player.objects.create(name="M1", gender=Player.GENDER_MALE, group=group)
+    m2 = Player.objects.create(name="M2", gender=Player.GENDER_MALE, group=group)
+    f1 = Player.objects.create(name="F1", gender=Player.GENDER_FEMALE, group=group)
+    f2 = Player.objects.create(name="F2", gender=Player.GENDER_FEMALE, group=group)
+
+    mixed = _create_match([m1, f1, m2, f2], 2, 1, group)
+
+    assert _scope_stats(m1, PlayerScopeStats.SCOPE_ALL) == (0, 1, 1)
+    assert _scope_stats(f2, PlayerScopeStats.SCOPE_MIXED) == (1, 1, 0)
+    assert not PlayerScopeStats.objects.filter(scope=PlayerScopeStats.SCOPE_MALE).exists()
+
+    mixed.delete()
+
+    assert _scope_stats(f2, PlayerScopeStats.SCOPE_ALL) == (0, 0, 0)
+    assert _scope_stats(f2, PlayerScopeStats.SCOPE_MIXED) == (0, 0, 0)
+
+
+def test_match_participants_follow_match_create_edit_and_delete():
+    group = Group.objects.create(name="Grupo Participantes")
+    players = [
+        Player.objects.create(name=f"MP{index}", gender=Player.GENDER_MALE, group=group)
+        for index in range(5)
+    ]
+
+    def participants(match):
+        return sorted(
+            MatchParticipant.objects.filter(match=match).values_list(
+                "player_id", "team", "is_win", "date_played", "match_gender_type"
+            )
+        )
+
+    match = _create_match(players[:4], 1, 1, group)
+    assert participants(match) == sorted(
+        (player.id, 1 if index < 2 else 2, index < 2, date(2026, 3, 1), Match.GENDER_TYPE_MALE)
+        for index, player in enumerate(players[:4])
+    )
+
+    match.update_match(team2_player2=players[4], winning_team=2, date_played=date(2026, 3, 2))
+    assert participants(match) == sorted(
+        (player.id, 1 if index < 2 else 2, index >= 2, date(2026, 3, 2), Match.GENDER_TYPE_MALE)
+        for index, player in enumerate([*players[:3], players[4]])
+    )
+    assert players[4].wins == 1
+    assert players[4].matches_played == 1
+    assert players[3].matches_played == 0
+
+    match.delete()
+    assert not MatchParticipant.objects.filter(player__group=group).exists()
+
+
+def test_player_matches_through_table_is_written_with_single_bulk_queries():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    group = Group.objects.create(name="Grupo Through")
+    players = [
+        Player.objects.create(name=f"TP{index}", gender=Player.GENDER_FEMALE, group=group)
+        for index in range(4)
+    ]
+
+    with CaptureQueriesContext(connection) as queries:
+        match = _create_match(players, 2, 1, group)
+    participant_writes = [
+        query["sql"] for query in queries.captured_queries if '"games_matchparticipant"' in query["sql"]
+    ]
+    assert len(participant_writes) == 1
+    assert participant_writes[0].startswith("INSERT")
+
+    assert list(players[2].matches.all()) == [match]
+    assert set(match.players.all()) == set(players)
+    assert players[2].participation_totals() == {"matches": 1, "wins": 1}
+    assert players[0].participation_totals() == {"matches": 1, "wins": 0}
+
+    with CaptureQueriesContext(connection) as queries:
+        match.update_match(winning_team=1)
+    participant_writes = [
+        query["sql"].split(" ", 1)[0]
+        for query in queries.captured_queries
+        if '"games_matchparticipant"' in query["sql"]
+    ]
+    # The players stay, so only the result of each team's rows changes.
+    assert participant_writes == ["UPDATE", "UPDATE"]
+    assert players[0].participation_totals() == {"matches": 1, "wins": 1}
+
+    match.delete()
+    assert players[2].matches.count() == 0
+
+
+def test_match_writes_take_the_group_lock_and_keep_rankings_current():
+    a, b, c, d = (Player.objects.create(name=name, gender=Player.GENDER_MALE) for name in "ABCD")
+
+    with CaptureQueriesContext(connection) as ctx:
+        match = Match.objects.create(
+            team1_player1=a,
+            team1_player2=b,
+            team2_player1=c,
+            team2_player2=d,
+            winning_team=1,
+            date_played=date(2026, 3, 1),
+        )
+    sqls = [query["sql"] for query in ctx.captured_queries]
+    lock_index = next(i for i, sql in enumerate(sqls) if sql.startswith("SELECT") and "games_groupdataversion" in sql)
+    insert_index = next(i for i, sql in enumerate(sqls) if sql.startswith('INSERT INTO "games_match"'))
+    assert lock_index < insert_index
+
+    match.update_match(winning_team=2)
+    match.delete()
+    versions = GroupDataVersion.objects.get(group=a.group)
+    assert versions.rankings_version == versions.version
+
+
+def test_match_signature_ignores_player_and_team_order_and_rejects_duplicates():
+    a, b, c, d = (Player.objects.create(name=f"Sig{name}", gender=Player.GENDER_MALE) for name in "ABCD")
+    match = Match.objects.create(
+        team1_player1=a,
+        team1_player2=b,
+        team2_player1=c,
+        team2_player2=d,
+        winning_team=1,
+        date_played=date(2026, 3, 1),
+    )
+    assert match.signature == Match.build_signature(a.group_id, date(2026, 3, 1), (d.id, c.id), (b.id, a.id))
+
+    duplicate = dict(team1_player1=d, team1_player2=c, team2_player1=b, team2_player2=a, winning_team=2)
+    with pytest.raises(ValidationError):
+        Match.objects.create(date_played=date(2026, 3, 1), **duplicate)
+    # Writes that skip validation still hit the constraint.
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Match.objects.bulk_create([Match(group=a.group, date_played=date(2026, 3, 1), signature=match.signature, **duplicate)])
+    assert Match.objects.count() == 1
+    assert PlayerScopeStats.objects.get(player=a, scope=PlayerScopeStats.SCOPE_ALL).matches == 1
+
+    # Admin forms (`full_clean`) and edits get a validation error instead of a 500.
+    other = Match.objects.create(date_played=date(2026, 3, 2), **duplicate)
+    other.date_played = date(2026, 3, 1)
+    with pytest.raises(ValidationError):
+        other.full_clean()
+    with pytest.raises(ValidationError):
+        other.update_match(date_played=date(2026, 3, 1))
+    other.refresh_from_db()
+    assert other.date_played == date(2026, 3, 2)
+    assert PlayerScopeStats.objects.get(player=a, scope=PlayerScopeStats.SCOPE_ALL).matches == 2
+
+    # Duplicates kept from before signatures existed can still be edited.
+    Match.objects.filter(pk=match.pk).update(signature=f"{match.signature}#{match.pk}")
+    match.refresh_from_db()
+    match.update_match(winning_team=2)
+    match.refresh_from_db()
+    assert match.signature.endswith(f"#{match.pk}")
+
+
+def test_idempotency_keys_are_unique_per_group_and_keyless_matches_never_conflict():
+    a, b, c, d = (Player.objects.create(name=f"Key{name}", gender=Player.GENDER_MALE) for name in "ABCD")
+    teams = dict(team1_player1=a, team1_player2=b, team2_player1=c, team2_player2=d, winning_team=1)
+
+    Match.objects.create(date_played=date(2026, 3, 1), **teams)
+    Match.objects.create(date_played=date(2026, 3, 2), **teams)
+    Match.objects.create(date_played=date(2026, 3, 3), idempotency_key="submit-1", **teams)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Match.objects.create(date_played=date(2026, 3, 4), idempotency_key="submit-1", **teams)
+
+    assert Match.objects.filter(group=a.group, idempotency_key__isnull=True).count() == 2
+    assert Match.objects.count() == 3
+
+
+def _scope_rows(group):
+    return sorted(
+        PlayerScopeStats.objects.filter(group=group).values_list("scope", "player_id", "matches", "wins", "position")
+    )
+
+
+def test_match_edits_write_only_the_difference_and_match_a_full_rebuild():
+    group = Group.objects.create(name="Grupo Edit")
+    men = [Player.objects.create(name=f"EM{index}", gender=Player.GENDER_MALE, group=group) for index in range(5)]
+    woman = Player.objects.create(name="EW", gender=Player.GENDER_FEMALE, group=group)
+    match = _create_match(men[:4], 1, 1, group)
+    _create_match([men[0], men[2], men[1], men[4]], 2, 2, group)
+
+    with CaptureQueriesContext(connection) as ctx:
+        match.update_match(date_played=date(2026, 3, 3))
+    writes = [query["sql"].split(" ", 1)[0] + " " + query["sql"].split('"')[1] for query in ctx.captured_queries]
+    assert "UPDATE games_matchparticipant" in writes
+    assert not any("playerscopestats" in write or write.startswith("UPDATE games_player") for write in writes)
+
+    # Swapping in a woman moves the match from the male to the mixed scope.
+    with CaptureQueriesContext(connection) as ctx:
+        match.update_match(team2_player2=woman)
+    participant_writes = [
+        query["sql"].split(" ", 1)[0] for query in ctx.captured_queries if '"games_matchparticipant"' in query["sql"]
+    ]
+    # One row leaves, one joins, and each team's remaining rows get the new gender type.
+    assert sorted(participant_writes) == ["DELETE", "INSERT", "UPDATE", "UPDATE"]
+    assert MatchParticipant.objects.get(match=match, player=woman).match_gender_type == Match.GENDER_TYPE_MIXED
+
+    incremental = _scope_rows(group)
+    update_player_rankings(group=group)
+    assert incremental == _scope_rows(group)
+
+
+def test_renaming_a_player_re_sorts_the_stored_ordinals_of_its_tie():
+    from frontend.services.ranking import compute_ranking
+
+    group = Group.objects.create(name="Grupo Rename")
+    aa, bb, cc, dd = (
+        Player.objects.create(name=name, gender=Player.GENDER_MALE, group=group) for name in ("Aa", "Bb", "Cc", "Dd")
+    )
+    _create_match([aa, bb, cc, dd], 1, 1, group)
+
+    aa.name = "Zz"
+    aa.save()
+
+    for scope in (PlayerScopeStats.SCOPE_ALL, PlayerScopeStats.SCOPE_MALE):
+        stored = list(
+            PlayerScopeStats.objects.filter(group=group, scope=scope, position__gt=0)
+            .order_by("ordinal")
+            .values_list("player__name", flat=True)
+        )
+        live = [row.name for row in compute_ranking(scope, group=group)[0]]
+        assert stored == live == ["Bb", "Zz", "Cc", "Dd"]
+    versions = GroupDataVersion.objects.get(group=group)
+    assert versions.rankings_version == versions.version
+
+
+def test_admin_gender_action_re_sorts_positions_under_the_group_write_lock(monkeypatch):
+    from django.contrib import admin as django_admin
+
+    from games import admin as games_admin
+
+    a, b, c, d = (Player.objects.create(name=f"Adm{name}", gender=Player.GENDER_MALE) for name in "ABCD")
+    Match.objects.create(
+        team1_player1=a, team1_player2=b, team2_player1=c, team2_player2=d, winning_team=1, date_played=date(2026, 3, 1)
+    )
+    group = a.group
+    version = GroupDataVersion.objects.get(group=group).version
+
+    locked = []
+    group_write_lock = games_admin.group_write_lock
+
+    def recording_lock(*group_ids, **kwargs):
+        locked.append(set(group_ids))
+        return group_write_lock(*group_ids, **kwargs)
+
+    monkeypatch.setattr(games_admin, "group_write_lock", recording_lock)
+    model_admin = games_admin.PlayerAdmin(Player, django_admin.site)
+    model_admin.set_gender_female(None, Player.objects.filter(pk__in=[a.pk, c.pk]))
+
+    assert locked == [{group.pk}]
+    assert GroupDataVersion.objects.get(group=group).version > version
+    # The new female players leave the male ranking.
+    male = dict(
+        PlayerScopeStats.objects.filter(group=group, scope=PlayerScopeStats.SCOPE_MALE).values_list("player_id", "position")
+    )
+    assert male == {a.pk: 0, b.pk: 1, c.pk: 0, d.pk: 2}